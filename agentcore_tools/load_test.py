@@ -0,0 +1,329 @@
+"""
+Load test - replay a prompt corpus against /invocations at controlled concurrency
+
+Targets the local FastAPI server or the deployed AgentCore runtime. Every
+simulated attendee keeps one session id for the whole run (sticky
+sessions, like a real attendee's chat), and all requests share one
+pooled HTTP client / one boto3 client.
+
+Arrival models:
+    closed  --attendees users each send a prompt, wait for the answer,
+            think for --think-seconds (exponential) and send the next one
+    open    prompts arrive as a Poisson process at --rate per second
+            regardless of how fast the target answers; arrivals beyond
+            --max-in-flight are counted as dropped
+
+Corpus: JSONL, one conversation per line. A line is {"prompt": "..."},
+{"input": {"prompt": "..."}}, {"turns": ["...", "..."]} or a backlog-style
+{"title": ..., "body": ...} entry (the body is sent).
+
+Usage:
+    python -m agentcore_tools.load_test prompts.jsonl --target local --url http://localhost:8080 --mode closed --attendees 50 --duration 300
+    python -m agentcore_tools.load_test prompts.jsonl --target agentcore --mode open --rate 5 --duration 600 --results results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import boto3
+import httpx
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+from config.bedrock_config import AWS_REGION, AGENTCORE_RUNTIME_ARN
+
+SESSION_HEADER = "X-Amzn-Bedrock-AgentCore-Runtime-Session-Id"
+# 服务端异常时返回的兜底回复，计为 agent_error
+ERROR_REPLY_PREFIX = "十分抱歉，系统暂时繁忙"
+HISTOGRAM_BOUNDS_MS = [100, 250, 500, 1000, 2000, 3000, 5000, 8000, 13000, 20000, 30000, 60000, math.inf]
+
+
+class Result(NamedTuple):
+    attendee: int
+    session_id: str
+    started: float  # seconds since the start of the run
+    latency_ms: float
+    status: str  # "ok", "agent_error", "dropped", "timeout", "http_<code>" or an error name
+
+
+def load_corpus(path: str) -> List[List[str]]:
+    conversations = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                turns = [item]
+            elif "turns" in item:
+                turns = list(item["turns"])
+            elif "prompt" in item:
+                turns = [item["prompt"]]
+            elif "input" in item:
+                turns = [item["input"]["prompt"]]
+            else:
+                turns = [item.get("body") or item.get("title", "")]
+            turns = [t for t in turns if t]
+            if turns:
+                conversations.append(turns)
+    if not conversations:
+        raise ValueError(f"No prompts found in {path}")
+    return conversations
+
+
+def classify(payload: Dict[str, Any]) -> str:
+    messages = payload.get("output", {}).get("message", {}).get("messages") or []
+    if messages and str(messages[-1].get("content", "")).startswith(ERROR_REPLY_PREFIX):
+        return "agent_error"
+    return "ok"
+
+
+class LocalTarget:
+    """The FastAPI server, through one pooled keep-alive client."""
+
+    def __init__(self, url: str, pool_size: int, timeout: float):
+        self._client = httpx.AsyncClient(
+            base_url=url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def invoke(self, session_id: str, prompt: str) -> str:
+        response = await self._client.post(
+            "/invocations",
+            json={"input": {"prompt": prompt}},
+            headers={SESSION_HEADER: session_id},
+        )
+        if response.status_code != 200:
+            return f"http_{response.status_code}"
+        return classify(response.json())
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class AgentCoreTarget:
+    """The AgentCore runtime, through one boto3 client shared by a thread pool."""
+
+    def __init__(self, runtime_arn: str, region: str, pool_size: int, timeout: float):
+        self._runtime_arn = runtime_arn
+        # 不让 botocore 自动重试，限流和错误都如实计入结果
+        self._client = boto3.client(
+            "bedrock-agentcore",
+            region_name=region,
+            config=Config(
+                max_pool_connections=pool_size,
+                read_timeout=timeout,
+                retries={"max_attempts": 1, "mode": "standard"},
+            ),
+        )
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+
+    def _invoke(self, session_id: str, prompt: str) -> str:
+        try:
+            response = self._client.invoke_agent_runtime(
+                agentRuntimeArn=self._runtime_arn,
+                runtimeSessionId=session_id,
+                payload=json.dumps({"input": {"prompt": prompt}}),
+                qualifier="DEFAULT",
+            )
+            return classify(json.loads(response["response"].read()))
+        except ClientError as e:
+            return e.response.get("Error", {}).get("Code", "ClientError")
+
+    async def invoke(self, session_id: str, prompt: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._invoke, session_id, prompt)
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class Attendee:
+    """A simulated attendee: one sticky session, walking the corpus from its own offset."""
+
+    def __init__(self, index: int, run_id: str, conversations: List[List[str]], rng: random.Random):
+        self.index = index
+        # AgentCore 要求 runtimeSessionId 至少 33 个字符
+        self.session_id = f"loadtest-{run_id}-{index:05d}-{uuid.uuid4().hex}"
+        self._conversations = conversations
+        self._conversation = rng.randrange(len(conversations))
+        self._turn = 0
+
+    def next_prompt(self) -> str:
+        turns = self._conversations[self._conversation]
+        prompt = turns[self._turn]
+        self._turn += 1
+        if self._turn == len(turns):
+            self._conversation = (self._conversation + 1) % len(self._conversations)
+            self._turn = 0
+        return prompt
+
+
+class LoadTest:
+    def __init__(self, target, attendees: List[Attendee], duration: float, max_requests: Optional[int]):
+        self._target = target
+        self._attendees = attendees
+        self._duration = duration
+        self._max_requests = max_requests
+        self._sent = 0
+        self._start = 0.0
+        self.results: List[Result] = []
+
+    def _budget_left(self) -> bool:
+        if self._max_requests is not None and self._sent >= self._max_requests:
+            return False
+        return time.monotonic() - self._start < self._duration
+
+    async def _send(self, attendee: Attendee) -> None:
+        prompt = attendee.next_prompt()
+        started = time.monotonic()
+        try:
+            status = await self._target.invoke(attendee.session_id, prompt)
+        except httpx.TimeoutException:
+            status = "timeout"
+        except (httpx.HTTPError, BotoCoreError) as e:
+            status = type(e).__name__
+        latency_ms = (time.monotonic() - started) * 1000
+        self.results.append(
+            Result(attendee.index, attendee.session_id, started - self._start, latency_ms, status)
+        )
+
+    async def run_closed(self, think_seconds: float, rng: random.Random) -> None:
+        async def user(attendee: Attendee) -> None:
+            # 错开启动，避免所有用户在同一时刻发出第一个请求
+            await asyncio.sleep(rng.uniform(0, think_seconds))
+            while self._budget_left():
+                self._sent += 1
+                await self._send(attendee)
+                if think_seconds:
+                    await asyncio.sleep(rng.expovariate(1 / think_seconds))
+
+        self._start = time.monotonic()
+        await asyncio.gather(*(user(a) for a in self._attendees))
+
+    async def run_open(self, rate: float, max_in_flight: int, rng: random.Random) -> None:
+        in_flight = set()
+        self._start = time.monotonic()
+        while True:
+            await asyncio.sleep(rng.expovariate(rate))
+            if not self._budget_left():
+                break
+            self._sent += 1
+            attendee = rng.choice(self._attendees)
+            if len(in_flight) >= max_in_flight:
+                self.results.append(
+                    Result(attendee.index, attendee.session_id, time.monotonic() - self._start, 0.0, "dropped")
+                )
+                continue
+            task = asyncio.create_task(self._send(attendee))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)]
+
+
+def print_report(results: List[Result], elapsed: float) -> None:
+    completed = [r for r in results if r.status != "dropped"]
+    ok = sorted(r.latency_ms for r in completed if r.status == "ok")
+    statuses: Dict[str, int] = {}
+    for r in results:
+        statuses[r.status] = statuses.get(r.status, 0) + 1
+
+    errors = len(results) - statuses.get("ok", 0)
+    print(f"\nrequests: {len(results)} in {elapsed:.1f} s, {len(completed) / elapsed:.2f} completed/s")
+    print(f"error rate: {errors / max(1, len(results)):.2%}  " + "  ".join(f"{k}={v}" for k, v in sorted(statuses.items())))
+    if not ok:
+        return
+    print(
+        "latency ms (ok): "
+        + "  ".join(
+            f"{name}={percentile(ok, q):.0f}"
+            for name, q in (("p50", 0.5), ("p90", 0.9), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+        )
+        + f"  mean={statistics.fmean(ok):.0f}"
+    )
+
+    counts = [0] * len(HISTOGRAM_BOUNDS_MS)
+    for latency in ok:
+        counts[next(i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if latency <= bound)] += 1
+    widest = max(counts)
+    last = max(i for i, count in enumerate(counts) if count)
+    lower = 0
+    for bound, count in zip(HISTOGRAM_BOUNDS_MS[: last + 1], counts):
+        label = f"{lower:>6}-{'inf' if bound == math.inf else bound:<6}"
+        print(f"  {label} {count:>7} {'#' * round(40 * count / widest)}")
+        lower = bound
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    conversations = load_corpus(args.corpus)
+    run_id = uuid.uuid4().hex[:8]
+    attendees = [Attendee(i, run_id, conversations, rng) for i in range(args.attendees)]
+    pool_size = args.attendees if args.mode == "closed" else args.max_in_flight
+    if args.target == "local":
+        target = LocalTarget(args.url, pool_size, args.timeout)
+    else:
+        target = AgentCoreTarget(args.runtime_arn, args.region, pool_size, args.timeout)
+
+    print(
+        f"run {run_id}: {args.mode} loop against {args.target}, {len(attendees)} attendees, "
+        f"{sum(len(c) for c in conversations)} prompts in {len(conversations)} conversations"
+    )
+    test = LoadTest(target, attendees, args.duration, args.requests)
+    start = time.monotonic()
+    try:
+        if args.mode == "closed":
+            await test.run_closed(args.think_seconds, rng)
+        else:
+            await test.run_open(args.rate, args.max_in_flight, rng)
+    finally:
+        await target.aclose()
+    print_report(test.results, time.monotonic() - start)
+
+    if args.results:
+        with open(args.results, "w", encoding="utf-8") as f:
+            for r in test.results:
+                f.write(json.dumps(r._asdict()) + "\n")
+        print(f"per-request results written to {args.results}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="JSONL prompt corpus")
+    parser.add_argument("--target", choices=["local", "agentcore"], default="local")
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--runtime-arn", default=AGENTCORE_RUNTIME_ARN)
+    parser.add_argument("--region", default=AWS_REGION)
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--attendees", type=int, default=20, help="Simulated attendees (sticky sessions)")
+    parser.add_argument("--think-seconds", type=float, default=5.0, help="Closed loop: mean think time")
+    parser.add_argument("--rate", type=float, default=2.0, help="Open loop: arrivals per second")
+    parser.add_argument("--max-in-flight", type=int, default=200, help="Open loop: drop arrivals beyond this")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to generate load")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--results", default=None, help="Write per-request results as JSONL")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
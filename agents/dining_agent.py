@@ -3,80 +3,51 @@ Dining Agent - Provides restaurant and food recommendations for any location
 """
 
 from strands import Agent, tool
-from strands.models import BedrockModel
-from strands_tools import retrieve
 from agents.prompt_templates import dining_agent_system_prompt
 from config.bedrock_config import (
-    BEDROCK_MODEL_ID,
-    DEFAULT_KNOWLEDGE_BASE_ID,
-    MAX_RAG_RESULTS,
-    MIN_RELEVANCE_SCORE,
-    AWS_REGION,
+    SPECIALIST_POOL_MAX_IDLE,
+    POI_EXTRACT_PATH,
+    POI_INDEX_BBOX,
+    POI_GRID_CELL_DEG,
+    POI_REFRESH_INTERVAL_SECONDS,
+    POI_FULL_RELOAD_SECONDS,
 )
-import uuid
 import requests
-from tools.logger_config import get_logger
+from tools.logger_config import get_logger, log_payload
+from tools.agent_pool import AgentPool
+from tools.model_registry import model_registry
+from tools.metrics import MetricsHook
+from tools.kb_retrieval import retrieve_kb
+from tools.geocoding import geocode_city, get_city_coordinates
+from tools.http_client import http_post
+from tools.poi_index import POIIndex, POIRefresher
+from tools.attendee_directory import attendee_directory
 
 logger = get_logger(__name__)
 
-bedrock_model = BedrockModel(
-    model_id=BEDROCK_MODEL_ID,
-    temperature=0.3,
-    top_p=0.3,
+# 会场周边餐厅的本地空间索引，后台定期从 Overpass 增量刷新
+poi_index = POIIndex(bbox=POI_INDEX_BBOX, cell_deg=POI_GRID_CELL_DEG)
+poi_refresher = POIRefresher(
+    poi_index,
+    extract_path=POI_EXTRACT_PATH,
+    interval_seconds=POI_REFRESH_INTERVAL_SECONDS,
+    full_reload_seconds=POI_FULL_RELOAD_SECONDS,
 )
 
 
-@tool
-def get_city_coordinates(city: str) -> dict:
-    """
-    Get coordinates for a city using Open-Meteo Geocoding API (free, no API key required).
-    Prioritizes results with higher population to avoid small towns with same names.
-
-    Args:
-        city: City name to search for
-
-    Returns:
-        Dictionary containing latitude, longitude, and full location name
-    """
-    try:
-        geocoding_url = "https://geocoding-api.open-meteo.com/v1/search"
-        params = {
-            "name": city,
-            "count": 5,  # Get multiple results to choose the best one
-            "language": "zh",
-            "format": "json"
-        }
-        
-        response = requests.get(geocoding_url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get("results"):
-            return {
-                "status": "error",
-                "message": f"未找到城市: {city}"
-            }
-        
-        # Sort by population (if available) to get major cities first
-        results = data["results"]
-        results.sort(key=lambda x: x.get("population", 0), reverse=True)
-        
-        result = results[0]
-        return {
-            "status": "success",
-            "latitude": result["latitude"],
-            "longitude": result["longitude"],
-            "name": result["name"],
-            "country": result.get("country", ""),
-            "admin1": result.get("admin1", ""),
-            "population": result.get("population", 0)
-        }
-    except Exception as e:
-        logger.error(f"Error geocoding city {city}: {str(e)}")
-        return {
-            "status": "error",
-            "message": f"获取城市坐标失败: {str(e)}"
-        }
+def _format_restaurant(element: dict) -> dict:
+    tags = element.get("tags", {})
+    return {
+        "name": tags.get("name", "未命名餐厅"),
+        "type": tags.get("amenity", "restaurant"),
+        "cuisine": tags.get("cuisine", "未指定"),
+        "address": tags.get("addr:street", ""),
+        "phone": tags.get("phone", ""),
+        "website": tags.get("website", ""),
+        "opening_hours": tags.get("opening_hours", ""),
+        "latitude": element.get("lat"),
+        "longitude": element.get("lon")
+    }
 
 
 @tool
@@ -94,14 +65,30 @@ def search_nearby_restaurants(city: str, cuisine_type: str = None, radius_km: fl
     """
     try:
         # First get city coordinates
-        coord_result = get_city_coordinates(city)
+        coord_result = geocode_city(city)
         if coord_result["status"] == "error":
             return coord_result
         
         lat = coord_result["latitude"]
         lon = coord_result["longitude"]
         location_name = f"{coord_result['name']}, {coord_result.get('admin1', coord_result.get('country', ''))}"
-        
+
+        # 会场周边的查询直接走本地索引，毫秒级返回
+        if poi_index.covers(lat, lon, radius_km):
+            matches = poi_index.query(lat, lon, radius_km, cuisine_type)
+            restaurants = []
+            for element, distance_km in matches[:20]:
+                restaurant_info = _format_restaurant(element)
+                restaurant_info["distance_km"] = round(distance_km, 2)
+                restaurants.append(restaurant_info)
+            return {
+                "status": "success",
+                "location": location_name,
+                "search_radius_km": radius_km,
+                "total_found": len(matches),
+                "restaurants": restaurants,
+            }
+
         # Convert km to meters for Overpass API
         radius_m = int(radius_km * 1000)
         
@@ -119,14 +106,13 @@ def search_nearby_restaurants(city: str, cuisine_type: str = None, radius_km: fl
         out body 50;
         """
         
-        response = requests.post(overpass_url, data={"data": query}, timeout=30)
+        response = http_post(overpass_url, data={"data": query}, timeout=30)
         response.raise_for_status()
         data = response.json()
         
         restaurants = []
         for element in data.get("elements", []):
             tags = element.get("tags", {})
-            name = tags.get("name", "未命名餐厅")
             
             # Filter by cuisine type if specified
             if cuisine_type:
@@ -134,18 +120,7 @@ def search_nearby_restaurants(city: str, cuisine_type: str = None, radius_km: fl
                 if cuisine_type.lower() not in element_cuisine:
                     continue
             
-            restaurant_info = {
-                "name": name,
-                "type": tags.get("amenity", "restaurant"),
-                "cuisine": tags.get("cuisine", "未指定"),
-                "address": tags.get("addr:street", ""),
-                "phone": tags.get("phone", ""),
-                "website": tags.get("website", ""),
-                "opening_hours": tags.get("opening_hours", ""),
-                "latitude": element.get("lat"),
-                "longitude": element.get("lon")
-            }
-            restaurants.append(restaurant_info)
+            restaurants.append(_format_restaurant(element))
         
         return {
             "status": "success",
@@ -156,13 +131,13 @@ def search_nearby_restaurants(city: str, cuisine_type: str = None, radius_km: fl
         }
         
     except requests.exceptions.Timeout:
-        logger.error(f"Timeout searching restaurants in {city}")
+        logger.error("Timeout searching restaurants in %s", city)
         return {
             "status": "error",
             "message": "搜索餐厅超时，请稍后重试"
         }
     except Exception as e:
-        logger.error(f"Error searching restaurants in {city}: {str(e)}")
+        logger.error("Error searching restaurants in %s: %s", city, e)
         return {
             "status": "error",
             "message": f"搜索餐厅失败: {str(e)}"
@@ -181,37 +156,31 @@ def retrieve_dining_info(query: str) -> dict:
         Dictionary containing restaurant information
     """
     try:
-        retrieve_response = retrieve.retrieve(
-            {
-                "toolUseId": str(uuid.uuid4()),
-                "input": {
-                    "text": query,
-                    "score": MIN_RELEVANCE_SCORE,
-                    "numberOfResults": MAX_RAG_RESULTS,
-                    "knowledgeBaseId": DEFAULT_KNOWLEDGE_BASE_ID,
-                    "region": AWS_REGION,
-                },
-            }
-        )
-        logger.info(f"Dining retrieve_response: {retrieve_response}")
+        retrieve_response = retrieve_kb(query)
+        log_payload(logger, "Dining retrieve_response", retrieve_response)
         return retrieve_response
     except Exception as e:
-        logger.error(f"Error retrieving dining info: {str(e)}")
+        logger.error("Error retrieving dining info: %s", e)
         return {
             "status": "error",
             "message": f"Error retrieving dining information: {str(e)}",
         }
 
 
-def init_agent(agent_name: str) -> Agent:
+def init_agent(agent_name: str, tier: str) -> Agent:
     return Agent(
         name=agent_name,
         system_prompt=dining_agent_system_prompt,
-        model=bedrock_model,
+        model=model_registry.get(tier, "dining"),
         tools=[get_city_coordinates, search_nearby_restaurants, retrieve_dining_info],
+        hooks=[MetricsHook("dining")],
     )
 
 
+# 复用预热好的 Agent 实例，避免每次委托都重新构建
+agent_pool = AgentPool(init_agent, max_idle_per_key=SPECIALIST_POOL_MAX_IDLE)
+
+
 @tool
 def get_dining_recommendations(query: str, user_id: str = None) -> str:
     """
@@ -235,11 +204,15 @@ def get_dining_recommendations(query: str, user_id: str = None) -> str:
 6. 提供餐厅名称、类型、菜系、地址等信息
 7. 如果有特殊需求（素食、清真等），在推荐时考虑这些因素
 """
+    attendee = attendee_directory.get(user_id)
+    if attendee is not None and attendee.has_dietary_requirement:
+        formatted_query += f"8. 该参会者的饮食偏好是「{attendee.dietary_preference}」，推荐时必须满足\n"
 
     try:
-        logger.info("Routed to Dining Agent")
-        agent = init_agent("Dining Agent")
-        agent_response = agent(formatted_query)
+        logger.debug("Routed to Dining Agent")
+        tier = model_registry.tier_for("dining")
+        with agent_pool.lease("Dining Agent", tier) as agent:
+            agent_response = model_registry.invoke(agent, formatted_query, tier, "dining")
         text_response = str(agent_response)
 
         if len(text_response) > 0:
@@ -247,5 +220,5 @@ def get_dining_recommendations(query: str, user_id: str = None) -> str:
 
         return "很抱歉，暂时无法提供餐厅推荐。请稍后再试。"
     except Exception as e:
-        logger.error(f"Error in dining agent: {str(e)}")
+        logger.error("Error in dining agent: %s", e)
         return f"处理餐厅推荐时出错：{str(e)}"
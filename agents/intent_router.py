@@ -0,0 +1,252 @@
+"""
+Intent Router - rule-based pre-router in front of the supervisor LLM
+
+Classifies a prompt with a Chinese/English keyword lexicon. Confident,
+single-domain prompts are dispatched straight to the specialist tool,
+multi-domain prompts fan out to several specialists concurrently, and
+ambiguous or context-dependent prompts fall back to the supervisor LLM.
+"""
+
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple, Union
+
+from strands.hooks import HookProvider, HookRegistry
+from strands.hooks.events import BeforeToolCallEvent
+
+from config.bedrock_config import INTENT_ROUTER_MIN_CONFIDENCE, INTENT_ROUTER_MIN_DOMAIN_SCORE
+
+WEATHER = "weather"
+DINING = "dining"
+SESSION = "session"
+OFF_TOPIC = "off_topic"
+DOMAIN_INTENTS = (WEATHER, DINING, SESSION)
+
+# 专业 Agent 工具名 → 意图，用于和 LLM 的实际路由结果比对
+TOOL_INTENTS = {
+    "get_weather_info": WEATHER,
+    "get_dining_recommendations": DINING,
+    "get_session_planning": SESSION,
+}
+
+OFF_TOPIC_REPLY = "我是 re:Invent 参会助手，专注于为您提供参会相关的服务，包括天气、美食和议程规划。"
+
+# (pattern, weight)：强关键词权重 2，弱关键词权重 1，单个弱关键词不足以直接路由
+# 负权重抵消只作为地点出现的关键词（"near the keynote"），避免把问天气、问吃饭的问题拆到议程
+# 字符串模式忽略大小写；需要区分大小写的模式预先编译
+LEXICON: Dict[str, List[Tuple[Union[str, Pattern], float]]] = {
+    WEATHER: [
+        (r"天气|气温|温度|天气预报|降雨|下雨|下雪|刮风|风力|湿度|紫外线", 2),
+        (r"穿什么|穿衣|带.{0,4}外套|带伞|雨伞", 2),
+        (r"冷不冷|热不热|冷吗|热吗|晴|阴天", 1),
+        (r"\bweather\b|\btemperature\b|\bforecast\b|\bwhat to wear\b|\bumbrella\b", 2),
+        (r"\brain(y|ing)?\b|\bwindy?\b|\bsnow\b|\bjacket\b|\bcold\b|\bhot\b|\bsunny\b", 1),
+    ],
+    DINING: [
+        (r"餐厅|饭店|美食|吃饭|吃什么|早餐|早饭|午餐|午饭|晚餐|晚饭|宵夜|自助餐|订位|订餐", 2),
+        (r"素食|清真|牛排|火锅|中餐|日料|寿司|拉面|烧烤|海鲜|咖啡|酒吧|好吃|菜系", 1),
+        (r"\brestaurants?\b|\bdining\b|\bdinner\b|\blunch\b|\bbreakfast\b|\bbrunch\b|\bbuffet\b|\bmeals?\b", 2),
+        (r"\beat(ing)?\b|\bfood\b|\bgrab a bite\b|\bsnacks?\b", 2),
+        (r"\bcuisine\b|\bsteak\b|\bsushi\b|\bramen\b|\bcoffee\b|\bvegan\b|\bvegetarian\b|\bhalal\b|\bbar\b", 1),
+    ],
+    SESSION: [
+        (r"议程|日程|主题演讲|演讲|讲座|分会场|工作坊|动手实验|专场|报名|选课", 2),
+        (r"参会路线|时间冲突|展位|展区|嘉宾|讲者", 1),
+        (r"\bsessions?\b|\bkeynotes?\b|\bagenda\b|\bworkshops?\b|\bchalk talks?\b|\bbreakouts?\b|\bhands-on labs?\b", 2),
+        (r"\bschedule\b|\bspeakers?\b|\btalks?\b|\btracks?\b|\bexpo\b|\bbooth\b", 1),
+        (re.compile(r"\b[A-Z]{3}\d{3}\b"), 2),  # session code, e.g. AIM301; upper case only
+        (r"(主题演讲|分会场|工作坊|展区|keynote)\s*的?(会场|场馆|大厅|房间|场地)?\s*(附近|旁边|周边|周围|外面|那边)", -2),
+        (r"\b(near|around|outside|next to|close to|by) the (keynotes?|sessions?|workshops?|expo)\b", -2),
+        (r"\b(keynote|session|workshop|expo) (rooms?|halls?|venues?|stages?|area)\b", -2),
+    ],
+    OFF_TOPIC: [
+        (r"笑话|股票|股价|彩票|星座|算命|做作业|写代码", 2),
+        (r"写.{0,8}(诗|歌词|故事|小说|作文)|(编|讲).{0,4}故事|作.{0,4}诗", 2),
+        (r"\bjokes?\b|\bpoems?\b|\bpoetry\b|\bstock price\b|\blottery\b|\bhoroscope\b", 2),
+        (r"\b(write|compose|tell)( me)? (a|an|some)( \w+){0,3} (story|song|lyrics|haiku|limerick)\b", 2),
+    ],
+}
+
+# 需要会话上下文或记忆的问题必须交给 LLM：提供 user id、回顾历史、承接上一轮的追问
+FALLBACK_PATTERNS = [
+    r"user\s*_?id|用户\s*id|我的\s*id|\bid\b\s*[:：是为]?\s*\d+",
+    r"记得|记住|上次|之前|刚才|历史|我说过",
+    r"\bremember\b|\blast time\b|\bearlier\b|\bi told you\b",
+    r"^\s*(那|那么|还有|另外|然后)",
+    r"^\s*(what|how) about\b|^\s*and\b",
+]
+
+
+class RouteDecision(NamedTuple):
+    intent: Optional[str]  # best guess, None when nothing matched
+    confidence: float
+    domains: Tuple[str, ...]  # every domain intent that reached min_domain_score
+    fallback_reason: Optional[str]  # set when the prompt must go to the LLM
+
+    @property
+    def confident(self) -> bool:
+        return self.fallback_reason is None
+
+
+class IntentRouter:
+    """
+    Keyword/regex intent classifier for the supervisor fast path.
+
+    Each intent scores the sum of the weights of its matching patterns.
+    The confidence of the top intent is its share of the total score,
+    scaled down until it reaches 2 (one strong or two weak keywords).
+    A prompt fans out only when every domain involved scores at least
+    min_domain_score on its own.
+
+    Args:
+        lexicon: Intent → [(regex, weight)]
+        fallback_patterns: Regexes that always send the prompt to the LLM
+        min_confidence: Minimum confidence of a direct dispatch
+        min_domain_score: Minimum score of each domain of a multi-domain fan-out
+    """
+
+    def __init__(
+        self,
+        lexicon: Dict[str, List[Tuple[Union[str, Pattern], float]]] = LEXICON,
+        fallback_patterns: List[str] = FALLBACK_PATTERNS,
+        min_confidence: float = INTENT_ROUTER_MIN_CONFIDENCE,
+        min_domain_score: float = INTENT_ROUTER_MIN_DOMAIN_SCORE,
+    ):
+        self._lexicon: Dict[str, List[Tuple[Pattern, float]]] = {
+            intent: [
+                (p if isinstance(p, Pattern) else re.compile(p, re.IGNORECASE), w)
+                for p, w in patterns
+            ]
+            for intent, patterns in lexicon.items()
+        }
+        self._fallback = re.compile("|".join(f"(?:{p})" for p in fallback_patterns), re.IGNORECASE)
+        self.min_confidence = min_confidence
+        self.min_domain_score = min_domain_score
+
+    def scores(self, message: str) -> Dict[str, float]:
+        result = {}
+        for intent, patterns in self._lexicon.items():
+            score = sum(weight for pattern, weight in patterns if pattern.search(message))
+            if score > 0:
+                result[intent] = score
+        return result
+
+    def route(self, message: str) -> RouteDecision:
+        scores = self.scores(message)
+        if not scores:
+            return RouteDecision(None, 0.0, (), "no_match")
+
+        total = sum(scores.values())
+        confidences = {
+            intent: (score / total) * min(1.0, score / 2) for intent, score in scores.items()
+        }
+        intent = max(confidences, key=confidences.get)
+        # 多领域判断只看各自的得分是否足够，不受其他领域分摊；每个领域都要有强证据
+        domains = tuple(d for d in DOMAIN_INTENTS if scores.get(d, 0) >= self.min_domain_score)
+
+        if self._fallback.search(message):
+            reason = "context"
+        elif len(domains) > 1:
+            reason = "multi_domain"
+        elif confidences[intent] < self.min_confidence:
+            reason = "low_confidence"
+        else:
+            reason = None
+        return RouteDecision(intent, confidences[intent], domains, reason)
+
+
+class RouterMetrics:
+    """
+    Routing accuracy and latency-saved counters.
+
+    Accuracy compares the router's best guess with the specialist the
+    supervisor LLM actually called on LLM-routed turns (all turns in
+    shadow mode). Latency saved is estimated per fast-path turn against
+    a moving average of LLM-routed turn latency.
+    """
+
+    def __init__(self, ewma_alpha: float = 0.1):
+        self._lock = threading.Lock()
+        self._alpha = ewma_alpha
+        self.llm_latency_ms: Optional[float] = None
+        self.fast_path = 0
+        self.fallback = 0
+        self.fallback_reasons: Dict[str, int] = {}
+        self.by_intent: Dict[str, int] = {}
+        self.evaluated = 0
+        self.agreed = 0
+        self.confident_evaluated = 0
+        self.confident_agreed = 0
+        self.fast_path_ms = 0.0
+        self.saved_ms = 0.0
+
+    def record_fast_path(self, intent: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.fast_path += 1
+            self.by_intent[intent] = self.by_intent.get(intent, 0) + 1
+            self.fast_path_ms += elapsed_ms
+            if self.llm_latency_ms is not None:
+                self.saved_ms += max(0.0, self.llm_latency_ms - elapsed_ms)
+
+    def record_llm_turn(
+        self, decision: RouteDecision, tool_names: List[str], elapsed_ms: float
+    ) -> None:
+        llm_intent = next((TOOL_INTENTS[n] for n in tool_names if n in TOOL_INTENTS), None)
+        with self._lock:
+            if decision.fallback_reason is not None:
+                self.fallback += 1
+                reason = decision.fallback_reason
+                self.fallback_reasons[reason] = self.fallback_reasons.get(reason, 0) + 1
+            if self.llm_latency_ms is None:
+                self.llm_latency_ms = elapsed_ms
+            else:
+                self.llm_latency_ms += self._alpha * (elapsed_ms - self.llm_latency_ms)
+
+            # 路由器和 LLM 都没有判断出领域（如提供 user id）时不计入准确率
+            if decision.intent is None and llm_intent is None:
+                return
+            # LLM 不调用专业工具时视为闲聊或澄清，与 off_topic 的判断一致
+            agree = decision.intent == llm_intent or (
+                decision.intent == OFF_TOPIC and llm_intent is None
+            )
+            self.evaluated += 1
+            self.agreed += agree
+            if decision.confident:
+                self.confident_evaluated += 1
+                self.confident_agreed += agree
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "fast_path": self.fast_path,
+                "fallback": self.fallback,
+                "fallback_reasons": dict(self.fallback_reasons),
+                "fast_path_by_intent": dict(self.by_intent),
+                "accuracy": self.agreed / self.evaluated if self.evaluated else None,
+                "confident_accuracy": (
+                    self.confident_agreed / self.confident_evaluated
+                    if self.confident_evaluated
+                    else None
+                ),
+                "evaluated": self.evaluated,
+                "llm_turn_avg_ms": self.llm_latency_ms,
+                "fast_path_avg_ms": self.fast_path_ms / self.fast_path if self.fast_path else None,
+                "latency_saved_ms": self.saved_ms,
+            }
+
+
+class ToolCallRecorder(HookProvider):
+    """Record the names of tools the agent calls during the current turn."""
+
+    def __init__(self):
+        self.tool_names: List[str] = []
+
+    def on_before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        self.tool_names.append(event.tool_use["name"])
+
+    def register_hooks(self, registry: HookRegistry) -> None:
+        registry.add_callback(BeforeToolCallEvent, self.on_before_tool_call)
+
+
+intent_router = IntentRouter()
+router_metrics = RouterMetrics()
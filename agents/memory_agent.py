@@ -3,26 +3,22 @@ Memory Agent - Manages attendee information and conversation history
 """
 
 from strands import Agent, tool
-from strands.models import BedrockModel
 from agents.prompt_templates import memory_agent_system_prompt
 from strands_tools.agent_core_memory import AgentCoreMemoryToolProvider
 from config.bedrock_config import (
-    BEDROCK_MODEL_ID,
     BEDROCK_AGENTCORE_MEMORY_ID,
     AWS_REGION,
+    SPECIALIST_POOL_MAX_IDLE,
 )
-from tools.logger_config import get_logger
+from tools.logger_config import get_logger, log_payload
+from tools.agent_pool import AgentPool
+from tools.model_registry import model_registry
+from tools.metrics import MetricsHook
 
 logger = get_logger(__name__)
 
-bedrock_model = BedrockModel(
-    model_id=BEDROCK_MODEL_ID,
-    temperature=0.3,
-    top_p=0.3,
-)
-
 
-def init_agent(agent_name: str, user_id: str, session_id: str) -> Agent:
+def init_agent(agent_name: str, user_id: str, session_id: str, tier: str) -> Agent:
     provider = AgentCoreMemoryToolProvider(
         memory_id=BEDROCK_AGENTCORE_MEMORY_ID,
         actor_id=f"user_{user_id}",
@@ -33,11 +29,16 @@ def init_agent(agent_name: str, user_id: str, session_id: str) -> Agent:
     return Agent(
         name=agent_name,
         system_prompt=memory_agent_system_prompt,
-        model=bedrock_model,
+        model=model_registry.get(tier, "memory"),
         tools=provider.tools,
+        hooks=[MetricsHook("memory")],
     )
 
 
+# Memory Agent 的工具绑定到具体参会者，按 user_id 分别缓存
+agent_pool = AgentPool(init_agent, max_idle_per_key=SPECIALIST_POOL_MAX_IDLE)
+
+
 @tool
 def process_attendee_info(user_id: str, session_id: str, query: str) -> str:
     """
@@ -54,18 +55,19 @@ def process_attendee_info(user_id: str, session_id: str, query: str) -> str:
     formatted_query = f"{query}"
 
     try:
-        logger.info(
-            f"Routed to Memory Agent: user_id:{user_id}, session_id:{session_id}, query:{query}"
+        logger.debug(
+            "Routed to Memory Agent: user_id:%s, session_id:%s, query:%s", user_id, session_id, query
         )
-        agent = init_agent("Memory Agent", user_id, session_id)
-        agent_response = agent(formatted_query)
+        tier = model_registry.tier_for("memory")
+        with agent_pool.lease("Memory Agent", user_id, session_id, tier) as agent:
+            agent_response = model_registry.invoke(agent, formatted_query, tier, "memory")
         text_response = str(agent_response)
-        logger.info(f"Memory agent response: {text_response}")
+        log_payload(logger, "Memory agent response", text_response)
         
         if len(text_response) > 0:
             return text_response
 
         return "没有关于这个参会者的任何信息。"
     except Exception as e:
-        logger.error(f"Error in memory agent: {str(e)}")
+        logger.error("Error in memory agent: %s", e)
         return f"处理参会者信息时出错：{str(e)}"
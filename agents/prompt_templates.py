@@ -84,6 +84,12 @@ Session 信息包括：
 - 主题分类
 - 是否需要预约
 
+生成具体日程时：
+- 必须调用 plan_itinerary 工具，传入参会者的兴趣领域和已注册的 session ID，由工具计算无冲突、考虑会场间步行时间的日程
+- 只按工具返回的 itinerary 顺序讲解日程，不要自行增加、删除或调整 session 和时间
+- 如果 dropped_registered 不为空，说明哪些已注册的 session 与哪些 session 冲突，建议参会者取舍
+- 介绍 session 内容时再使用 retrieve_session_info 补充知识库信息
+
 请用中文与参会者交流，提供专业、实用的议程规划建议。
 """
 
@@ -3,27 +3,21 @@ Session Agent - Helps plan re:Invent agenda and recommends relevant sessions
 """
 
 from strands import Agent, tool
-from strands.models import BedrockModel
-from strands_tools import retrieve
 from agents.prompt_templates import session_agent_system_prompt
 from config.bedrock_config import (
-    BEDROCK_MODEL_ID,
-    DEFAULT_KNOWLEDGE_BASE_ID,
-    MAX_RAG_RESULTS,
-    MIN_RELEVANCE_SCORE,
-    AWS_REGION,
+    SPECIALIST_POOL_MAX_IDLE,
 )
-import uuid
-from tools.logger_config import get_logger
+from tools.logger_config import get_logger, log_payload
+from tools.agent_pool import AgentPool
+from tools.model_registry import model_registry
+from tools.metrics import MetricsHook
+from tools.kb_retrieval import retrieve_kb
+from tools.session_catalog import get_session_catalog
+from tools.itinerary_planner import KEYNOTE_TRACK, plan_itinerary as build_itinerary
+from tools.attendee_directory import attendee_directory, format_attendee_context
 
 logger = get_logger(__name__)
 
-bedrock_model = BedrockModel(
-    model_id=BEDROCK_MODEL_ID,
-    temperature=0.3,
-    top_p=0.3,
-)
-
 
 @tool
 def retrieve_session_info(query: str) -> dict:
@@ -37,37 +31,96 @@ def retrieve_session_info(query: str) -> dict:
         Dictionary containing session information
     """
     try:
-        retrieve_response = retrieve.retrieve(
-            {
-                "toolUseId": str(uuid.uuid4()),
-                "input": {
-                    "text": query,
-                    "score": MIN_RELEVANCE_SCORE,
-                    "numberOfResults": MAX_RAG_RESULTS,
-                    "knowledgeBaseId": DEFAULT_KNOWLEDGE_BASE_ID,
-                    "region": AWS_REGION,
-                },
-            }
-        )
-        logger.info(f"Session retrieve_response: {retrieve_response}")
+        retrieve_response = retrieve_kb(query)
+        log_payload(logger, "Session retrieve_response", retrieve_response)
         return retrieve_response
     except Exception as e:
-        logger.error(f"Error retrieving session info: {str(e)}")
+        logger.error("Error retrieving session info: %s", e)
         return {
             "status": "error",
             "message": f"Error retrieving session information: {str(e)}",
         }
 
 
-def init_agent(agent_name: str) -> Agent:
+def _split(value: str) -> list:
+    return [item for item in value.replace("，", ",").replace(";", ",").split(",") if item.strip()]
+
+
+def plan_itinerary(
+    user_id: str = "",
+    interests: str = "",
+    registered_sessions: str = "",
+    days: str = "",
+    min_level: int = 0,
+) -> dict:
+    """
+    Build a conflict-free re:Invent itinerary from the session catalog, accounting
+    for walking time between venues. Registered sessions are kept whenever possible.
+
+    Args:
+        user_id: Attendee user id; their registered sessions and interests are used
+            when interests / registered_sessions are not given
+        interests: Tracks of interest separated by ";", e.g. "AI/ML;Serverless".
+            Available tracks: {tracks}
+        registered_sessions: Session ids separated by ";", e.g. "AIM301;SVS201;KEY001"
+        days: Optional dates ("2025-12-02") or weekdays ("Tue") separated by ";"
+        min_level: Optional minimum level (100-400) preferred for interest sessions
+
+    Returns:
+        Dictionary with the ordered itinerary, registered sessions that could not fit
+        and the sessions they conflict with, and the total walking minutes
+    """
+    try:
+        catalog, walking = get_session_catalog()
+        attendee = attendee_directory.get(user_id)
+        interest_list = _split(interests) or (list(attendee.interests) if attendee else [])
+        registered = _split(registered_sessions) or (
+            list(attendee.registered_sessions) if attendee else []
+        )
+        itinerary = build_itinerary(
+            catalog,
+            walking,
+            interests=interest_list,
+            registered_sessions=registered,
+            days=_split(days),
+            min_level=min_level or None,
+        )
+        logger.debug(
+            "Planned itinerary with %d sessions, %d registered sessions dropped",
+            len(itinerary.sessions),
+            len(itinerary.dropped_registered),
+        )
+        return {"status": "success", **itinerary.to_dict()}
+    except Exception as e:
+        logger.error("Error planning itinerary: %s", e)
+        return {
+            "status": "error",
+            "message": f"Error planning itinerary: {str(e)}",
+        }
+
+
+# 可选 track 列表取自议程目录，避免与 config/sessions.csv 不一致
+plan_itinerary.__doc__ = plan_itinerary.__doc__.replace(
+    "{tracks}",
+    ", ".join(t for t in get_session_catalog()[0].tracks if t.lower() != KEYNOTE_TRACK),
+)
+plan_itinerary = tool(plan_itinerary)
+
+
+def init_agent(agent_name: str, tier: str) -> Agent:
     return Agent(
         name=agent_name,
         system_prompt=session_agent_system_prompt,
-        model=bedrock_model,
-        tools=[retrieve_session_info],
+        model=model_registry.get(tier, "session"),
+        tools=[plan_itinerary, retrieve_session_info],
+        hooks=[MetricsHook("session")],
     )
 
 
+# 复用预热好的 Agent 实例，避免每次委托都重新构建
+agent_pool = AgentPool(init_agent, max_idle_per_key=SPECIALIST_POOL_MAX_IDLE)
+
+
 @tool
 def get_session_planning(query: str, user_id: str = None) -> str:
     """
@@ -81,11 +134,18 @@ def get_session_planning(query: str, user_id: str = None) -> str:
         Session recommendations and agenda planning suggestions
     """
     formatted_query = f"请帮助规划 re:Invent 议程：{query}"
+    attendee = attendee_directory.get(user_id)
+    if attendee is not None:
+        formatted_query += (
+            f"\n{format_attendee_context(attendee)}"
+            f"\n生成日程时调用 plan_itinerary 并传入 user_id={attendee.user_id}"
+        )
 
     try:
-        logger.info("Routed to Session Agent")
-        agent = init_agent("Session Agent")
-        agent_response = agent(formatted_query)
+        logger.debug("Routed to Session Agent")
+        tier = model_registry.tier_for("session")
+        with agent_pool.lease("Session Agent", tier) as agent:
+            agent_response = model_registry.invoke(agent, formatted_query, tier, "session")
         text_response = str(agent_response)
 
         if len(text_response) > 0:
@@ -93,5 +153,5 @@ def get_session_planning(query: str, user_id: str = None) -> str:
 
         return "很抱歉，暂时无法提供议程规划建议。请稍后再试。"
     except Exception as e:
-        logger.error(f"Error in session agent: {str(e)}")
+        logger.error("Error in session agent: %s", e)
         return f"处理议程规划时出错：{str(e)}"
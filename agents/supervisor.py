@@ -1,36 +1,121 @@
 from strands import Agent, tool
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator, Optional
 from models.context import CustomerServiceAgentContext, create_initial_context
-from strands.models import BedrockModel
+from models.history import ConversationHistory, SummarizingConversationManager
 from agents.prompt_templates import supervisor_agent_system_prompt
 from agents.weather_agent import get_weather_info
 from agents.dining_agent import get_dining_recommendations
 from agents.session_agent import get_session_planning
 from agents.memory_agent import process_attendee_info
-from tools.agentcore_memory import update_memory
-from config.bedrock_config import BEDROCK_AGENTCORE_MEMORY_ID, AWS_REGION
-from strands_tools.agent_core_memory import AgentCoreMemoryToolProvider
-from tools.logger_config import get_logger
+from agents.intent_router import (
+    intent_router,
+    router_metrics,
+    RouteDecision,
+    ToolCallRecorder,
+    OFF_TOPIC,
+    OFF_TOPIC_REPLY,
+    WEATHER,
+    DINING,
+    SESSION,
+)
+from tools.agentcore_memory import record_turn
+from tools.attendee_profile import load_attendee_profile, NO_PROFILE_MESSAGE
+from tools.attendee_directory import attendee_directory, format_attendee_context
+from tools.response_cache import response_cache
+from tools.model_registry import model_registry
+from tools.metrics import MetricsHook, TurnMetrics, current_turn, start_turn
+from tools.tracing import tracer
+from config.bedrock_config import (
+    HISTORY_WINDOW_MESSAGES,
+    INTENT_ROUTER_MODE,
+    FANOUT_ENABLED,
+    FANOUT_MAX_WORKERS,
+    FANOUT_ABANDONED_HEADROOM,
+    FANOUT_BRANCH_TIMEOUT_SECONDS,
+    RESPONSE_CACHE_ENABLED,
+    METRICS_IN_RESPONSE,
+)
+from tools.logger_config import get_logger, log_payload
+from concurrent.futures import ThreadPoolExecutor, wait
+import asyncio
+import contextvars
+import re
+import threading
 import time
 
 logger = get_logger(__name__)
 
+GOSSIP_MARKER = "###gossip###"
+
+# 预路由命中时直接调用的专业 Agent 工具
+SPECIALIST_TOOLS = {
+    WEATHER: get_weather_info,
+    DINING: get_dining_recommendations,
+    SESSION: get_session_planning,
+}
+SPECIALIST_LABELS = {WEATHER: "天气", DINING: "美食", SESSION: "议程"}
+# 专业 Agent 出错或暂不可用时返回的文本，不能进入回复缓存
+SPECIALIST_ERROR_RE = re.compile(r"^\s*(处理\S{2,6}时出错|很抱歉，暂时无法)")
 
-bedrock_model = BedrockModel(
-    model_id="us.amazon.nova-pro-v1:0",
-    temperature=0.3,
-    top_p=0.8,
+# 多领域问题的各专业 Agent 分支在这里并发执行
+# 超时的分支无法中止，会继续占用线程直到结束；线程池为它们额外预留线程，
+# 在途分支数由信号量限制，被放弃的分支立即归还名额，不会饿死后续的请求
+_fanout_pool = ThreadPoolExecutor(
+    max_workers=FANOUT_MAX_WORKERS + FANOUT_ABANDONED_HEADROOM,
+    thread_name_prefix="specialist-fanout",
 )
+_fanout_slots = threading.BoundedSemaphore(FANOUT_MAX_WORKERS)
+
+
+class _BranchSlot:
+    """A fan-out slot, released once: when the branch finishes or when it is abandoned."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._released = False
+
+    def release(self, *_: Any) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        _fanout_slots.release()
+
+
+class _MarkerFilter:
+    """Remove a marker from streamed text even when it is split across chunks."""
+
+    def __init__(self, marker: str):
+        self.marker = marker
+        self.buffer = ""
+
+    def feed(self, chunk: str) -> str:
+        self.buffer = (self.buffer + chunk).replace(self.marker, "")
+        # 保留可能是标记前缀的尾部字符，等下一个 chunk 再判断
+        hold = 0
+        for k in range(min(len(self.marker) - 1, len(self.buffer)), 0, -1):
+            if self.marker.startswith(self.buffer[-k:]):
+                hold = k
+                break
+        emit = self.buffer[: len(self.buffer) - hold]
+        self.buffer = self.buffer[len(self.buffer) - hold :]
+        return emit
+
+    def flush(self) -> str:
+        emit, self.buffer = self.buffer, ""
+        return emit
 
 
 class SupervisorAgent:
     """Supervisor agent manages interactions and maintains conversation state."""
 
     def __init__(self, session_id: str):
-        self.conversation_history: List[Dict[str, Any]] = []
         self.session_id: str = session_id
         self.user_id: str = None
         self.context = create_initial_context()
+        # 会话历史与 context.descriptions 共用同一个有界存储，每条消息只保存一次
+        self.conversation_history: ConversationHistory = self.context.descriptions
+        self._summary_evicted = 0
         self.current_agent_name = "Supervisor-Agent"
         self.memories = "当前参会者未提供个人信息"
 
@@ -44,37 +129,57 @@ class SupervisorAgent:
             Returns:
                 Confirmation message
             """
-            logger.info(f"use tool: update_user_id: {user_id}")
+            logger.info("use tool: update_user_id: %s", user_id)
             self.user_id = user_id
 
-            bedrock_memory_provider = AgentCoreMemoryToolProvider(
-                memory_id=BEDROCK_AGENTCORE_MEMORY_ID,
-                actor_id=f"user_{user_id}",
-                session_id=f"session_user_{user_id}",
-                namespace=f"/users/user_{user_id}",
-                region=AWS_REGION,
-            )
-
-            histories = process_attendee_info(
-                self.user_id,
-                self.session_id,
-                "您保存了该参会者的哪些信息？请列出所有信息。",
-            )
+            # 直接读取记忆记录并格式化，不再额外调用一次 Memory Agent LLM
+            try:
+                histories = load_attendee_profile(user_id)
+            except Exception as e:
+                logger.error("Error loading attendee profile: %s", e)
+                histories = NO_PROFILE_MESSAGE
+            # 注册资料（兴趣、饮食偏好、已注册 session）从本地目录即时读取
+            attendee = attendee_directory.get(user_id)
+            if attendee is not None:
+                profile = format_attendee_context(attendee)
+                histories = profile if histories == NO_PROFILE_MESSAGE else f"{profile}\n{histories}"
             self.update_system_prompt(histories)
             self.memories = histories
-            # Add memory tools to the agent
-            self.current_agent.tools.add_tools(bedrock_memory_provider.tools)
 
             return f"User ID {user_id} 已记录"
 
+        @tool
+        def summarize_attendee_history(question: str) -> str:
+            """
+            Ask the Memory Agent for an LLM summary of what is stored about the attendee.
+            Only use this when the attendee explicitly asks what you remember about them
+            and the history already in your instructions is not enough.
+
+            Args:
+                question: What the attendee wants to know about their stored information
+            Returns:
+                Summary of the attendee's stored information
+            """
+            if self.user_id is None:
+                return "请先提供您的 user id"
+            return process_attendee_info(self.user_id, self.session_id, question)
+
         # Create the agent with all tools
+        self._system_prompt = self._build_system_prompt()
+        self._tool_recorder = ToolCallRecorder()
         self.current_agent = Agent(
             name="Supervisor Agent",
-            system_prompt=self._build_system_prompt(),
-            model=bedrock_model,
+            system_prompt=self._system_prompt,
+            model=model_registry.get(model_registry.tier_for("supervisor"), "supervisor"),
             state={"session_id": session_id},
+            # 只保留最近的消息窗口，被移出窗口的消息进入滚动摘要
+            conversation_manager=SummarizingConversationManager(
+                self.conversation_history, window_size=HISTORY_WINDOW_MESSAGES
+            ),
+            hooks=[self._tool_recorder, MetricsHook("supervisor")],
             tools=[
                 update_user_id,
+                summarize_attendee_history,
                 get_weather_info,
                 get_dining_recommendations,
                 get_session_planning,
@@ -92,74 +197,340 @@ class SupervisorAgent:
 
     def update_system_prompt(self, updates_prompt: str) -> None:
         """Update the system prompt of the current agent."""
-        self.current_agent.system_prompt += f"\n下面是此参会者的历史信息,请先基于历史信息给予总结回复，然后再提供服务。\n 历史信息:{updates_prompt}"
-        logger.info(f"System prompt updated: {self.current_agent.system_prompt}")
+        self._system_prompt += f"\n下面是此参会者的历史信息,请先基于历史信息给予总结回复，然后再提供服务。\n 历史信息:{updates_prompt}"
+        self._apply_system_prompt()
+        log_payload(logger, "System prompt updated", self.current_agent.system_prompt)
+
+    def _apply_system_prompt(self) -> None:
+        """Set the agent prompt to the base prompt plus the rolling summary."""
+        summary = self.conversation_history.summary
+        if summary:
+            self.current_agent.system_prompt = (
+                f"{self._system_prompt}\n更早的对话摘要:\n{summary}"
+            )
+        else:
+            self.current_agent.system_prompt = self._system_prompt
+
+    def _refresh_summary(self) -> None:
+        """Re-apply the system prompt only when messages were evicted this turn."""
+        if self.conversation_history.evicted_count != self._summary_evicted:
+            self._summary_evicted = self.conversation_history.evicted_count
+            self._apply_system_prompt()
+
+    def _record_user_message(self, message: str) -> None:
+        self.context.update_descriptions(
+            {"role": "user", "content": message, "timestamp": time.time()}
+        )
+
+    def _finalize_response(self, message: str, agent_result: Any) -> Dict[str, Any]:
+        """Turn an agent result into a response message and record it."""
+        # Extract string content from AgentResult
+        if hasattr(agent_result, "content"):
+            response = str(agent_result.content)
+        else:
+            response = str(agent_result)
+
+        chat_type = "0"
+        if GOSSIP_MARKER in response:
+            chat_type = "1"
+            response = response.replace(GOSSIP_MARKER, "")
+
+        # Add to conversation history
+        self.context.update_descriptions(
+            {"role": "assistant", "content": response, "timestamp": time.time()}
+        )
+        self._refresh_summary()
+
+        # 记忆写入在后台线程批量完成，不占用本轮响应时间
+        record_turn(self.user_id, message, response)
+
+        return {
+            "content": response,
+            "chat_type": chat_type,
+            "agent": self.current_agent_name,
+        }
+
+    def _route(self, message: str) -> Optional[RouteDecision]:
+        """Classify the prompt; returns a decision only when it should skip the LLM."""
+        self._route_decision = intent_router.route(message)
+        self._tool_recorder.tool_names.clear()
+        self._llm_start = time.perf_counter()
+        # 追问、指代上文或提供身份的问题依赖本会话的上下文，既不查缓存也不写缓存；
+        # 会话进行中、又识别不出领域的短问题（如“明天呢？”）同样视为追问
+        decision = self._route_decision
+        self._cacheable = decision.fallback_reason != "context" and not (
+            decision.intent is None and self.current_agent.messages
+        )
+        if INTENT_ROUTER_MODE != "on":
+            return None
+        if self._route_decision.confident or (
+            FANOUT_ENABLED and self._route_decision.fallback_reason == "multi_domain"
+        ):
+            return self._route_decision
+        return None
+
+    def _fan_out(self, message: str, domains: List[str]) -> str:
+        """Run the specialists for each domain concurrently and merge their answers."""
+        # 各分支同时开始，统一的截止时间即每个分支的截止时间
+        deadline = time.monotonic() + FANOUT_BRANCH_TIMEOUT_SECONDS
+        futures = {}
+        answers = {}
+        for domain in domains:
+            if not _fanout_slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                logger.warning("No fan-out slot for branch %s before the deadline", domain)
+                self._cacheable = False
+                answers[domain] = f"暂时无法获取{SPECIALIST_LABELS[domain]}信息，请稍后再单独询问。"
+                continue
+            slot = _BranchSlot()
+            query = f"{message}\n（请只回答其中与{SPECIALIST_LABELS[domain]}相关的部分）"
+            ctx = contextvars.copy_context()
+            future = _fanout_pool.submit(ctx.run, self._run_branch, domain, query)
+            future.add_done_callback(slot.release)
+            futures[future] = (domain, slot)
+
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for future, (domain, slot) in futures.items():
+            if future in done and future.exception() is None:
+                answers[domain] = future.result()
+                if SPECIALIST_ERROR_RE.match(answers[domain]):
+                    self._cacheable = False
+            else:
+                if future in not_done:
+                    future.cancel()
+                    slot.release()
+                    logger.warning("Fan-out branch %s missed the deadline", domain)
+                else:
+                    logger.error("Fan-out branch %s failed: %s", domain, future.exception())
+                self._cacheable = False
+                answers[domain] = f"暂时无法获取{SPECIALIST_LABELS[domain]}信息，请稍后再单独询问。"
+
+        return "\n\n".join(
+            f"【{SPECIALIST_LABELS[domain]}】\n{answers[domain]}" for domain in domains
+        )
+
+    def _run_branch(self, domain: str, query: str) -> str:
+        with tracer.start_as_current_span(f"fanout.{domain}"):
+            return SPECIALIST_TOOLS[domain](query, self.user_id)
+
+    def _remember_exchange(self, message: str, response: str) -> None:
+        """Append a turn answered without the LLM to the agent messages."""
+        # 把这轮问答写入 agent 的消息，后续交给 LLM 的追问仍有上下文
+        agent = self.current_agent
+        messages = agent.messages
+        if not messages or messages[-1]["role"] == "assistant":
+            messages.append({"role": "user", "content": [{"text": message}]})
+            messages.append({"role": "assistant", "content": [{"text": response}]})
+            # 绕过了 agent 调用，需手动套用窗口，否则连续的快速路径/缓存命中会让消息无限增长
+            agent.conversation_manager.apply_management(agent)
+
+    def _cached_reply(self, message: str) -> Optional[Dict[str, Any]]:
+        """Answer from the response cache; only anonymous, self-contained turns are cached."""
+        if not RESPONSE_CACHE_ENABLED or not self._cacheable or self.user_id is not None:
+            return None
+        cached = response_cache.get(message, self._route_decision.intent)
+        if cached is None:
+            return None
+        logger.info("Response cache hit")
+        self._remember_exchange(message, cached["content"])
+        self.context.update_descriptions(
+            {"role": "assistant", "content": cached["content"], "timestamp": time.time()}
+        )
+        self._refresh_summary()
+        return {**cached, "agent": self.current_agent_name}
+
+    def _cache_reply(self, message: str, message_item: Dict[str, Any]) -> None:
+        # 本轮识别出参会者身份后，回复可能包含个人信息，不缓存
+        if RESPONSE_CACHE_ENABLED and self._cacheable and self.user_id is None:
+            response_cache.put(
+                message,
+                self._route_decision.intent,
+                {"content": message_item["content"], "chat_type": message_item["chat_type"]},
+            )
+
+    def _dispatch(self, message: str, decision: RouteDecision) -> Dict[str, Any]:
+        """Answer a confidently routed prompt without the supervisor LLM."""
+        start = time.perf_counter()
+        if len(decision.domains) > 1:
+            response = self._fan_out(message, list(decision.domains))
+        elif decision.intent == OFF_TOPIC:
+            response = OFF_TOPIC_REPLY + GOSSIP_MARKER
+        else:
+            response = SPECIALIST_TOOLS[decision.intent](message, self.user_id)
+            if SPECIALIST_ERROR_RE.match(response):
+                self._cacheable = False
+        route = "+".join(decision.domains) if len(decision.domains) > 1 else decision.intent
+        logger.info("Fast path routed to %s (confidence %.2f)", route, decision.confidence)
+
+        self._remember_exchange(message, response.replace(GOSSIP_MARKER, ""))
+        message_item = self._finalize_response(message, response)
+        router_metrics.record_fast_path(route, (time.perf_counter() - start) * 1000)
+        return message_item
+
+    def _select_model(self) -> str:
+        """Pick the supervisor model tier for this turn from the router's intent guess."""
+        tier = model_registry.tier_for("supervisor", self._route_decision.intent)
+        self.current_agent.model = model_registry.get(tier, "supervisor")
+        return tier
+
+    def _record_llm_route(self) -> None:
+        """Compare the router's guess with the tools the supervisor LLM actually called."""
+        if INTENT_ROUTER_MODE == "off":
+            return
+        router_metrics.record_llm_turn(
+            self._route_decision,
+            self._tool_recorder.tool_names,
+            (time.perf_counter() - self._llm_start) * 1000,
+        )
+
+    def _error_message(self) -> Dict[str, Any]:
+        return {
+            "content": "十分抱歉，系统暂时繁忙，请稍后再试。",
+            "chat_type": "1",
+            "agent": self.current_agent_name,
+        }
 
     def process_message(self, message: str) -> Dict[str, Any]:
         """Process a user message and return the response with events."""
+        with start_turn() as turn, tracer.start_as_current_span(
+            "supervisor.process_message", attributes={"session.id": self.session_id}
+        ) as span:
+            result = self._process_message(message, turn)
+            span.set_attribute("attendee_guide.route", turn.route)
+            return result
+
+    def _process_message(self, message: str, turn: TurnMetrics) -> Dict[str, Any]:
         messages = []
         # Add user message to conversation history
-        tmp_msg = {"role": "user", "content": message, "timestamp": time.time()}
-        self.context.update_descriptions(tmp_msg)
-        self.conversation_history.append(tmp_msg)
-        update_memory(self.user_id, (message, "USER"))
+        self._record_user_message(message)
 
         # Process the message with the current agent
         try:
-            # Get agent response
-            conversation_prompt = self._build_conversation_prompt(message)
-            agent_result = self.current_agent(conversation_prompt)
-            logger.info(f"agent result####: {agent_result}")
-
-            # Extract string content from AgentResult
-            if hasattr(agent_result, "content"):
-                response = str(agent_result.content)
+            decision = self._route(message)
+            cached = self._cached_reply(message)
+            if cached is not None:
+                turn.route = "cache"
+                messages.append(cached)
+            elif decision is not None:
+                turn.route = "fast_path"
+                messages.append(self._dispatch(message, decision))
+                self._cache_reply(message, messages[-1])
             else:
-                response = str(agent_result)
-
-            chat_type = "0"
-            if "###gossip###" in response:
-                chat_type = "1"
-                response = response.replace("###gossip###", "")
-
-            messages.append(
-                {
-                    "content": response,
-                    "chat_type": chat_type,
-                    "agent": self.current_agent_name,
-                }
-            )
+                # Get agent response
+                conversation_prompt = self._build_conversation_prompt(message)
+                tier = self._select_model()
+                agent_result = model_registry.invoke(
+                    self.current_agent, conversation_prompt, tier, "supervisor"
+                )
+                log_payload(logger, "Supervisor agent result", agent_result)
+                self._record_llm_route()
 
-            # Add to conversation history
-            self.conversation_history.append(
-                {"role": "assistant", "content": response, "timestamp": time.time()}
-            )
-            self.context.update_descriptions(
-                {"role": "assistant", "content": response, "timestamp": time.time()}
-            )
-
-            update_memory(self.user_id, (response, "ASSISTANT"))
+                messages.append(self._finalize_response(message, agent_result))
+                self._cache_reply(message, messages[-1])
 
         except Exception as e:
-            error_message = f"十分抱歉，系统暂时繁忙，请稍后再试。"
-            logger.info(f"Error: {str(e)}")
-            messages.append(
-                {
-                    "content": error_message,
-                    "chat_type": "1",
-                    "agent": self.current_agent_name,
-                }
-            )
+            logger.info("Error: %s", e)
+            turn.route = "error"
+            messages.append(self._error_message())
         tmp_str = self._build_response(messages)
-        logger.info(f"build_response result: {tmp_str}")
+        log_payload(logger, "build_response result", tmp_str)
         return tmp_str
 
+    async def stream_message(self, message: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user message and yield events while the agent runs.
+
+        Yields dicts with an "event" name and "data" payload:
+        - token: a chunk of supervisor text as soon as the model produces it
+        - tool: the supervisor started a tool call (routing to a sub-agent)
+        - done: the final response, same shape as process_message
+        """
+        with start_turn() as turn, tracer.start_as_current_span(
+            "supervisor.stream_message", attributes={"session.id": self.session_id}
+        ) as span:
+            async for event in self._stream_message(message, turn):
+                yield event
+            span.set_attribute("attendee_guide.route", turn.route)
+
+    async def _stream_message(self, message: str, turn: TurnMetrics) -> AsyncIterator[Dict[str, Any]]:
+        self._record_user_message(message)
+
+        announced_tools = set()
+        marker_filter = _MarkerFilter(GOSSIP_MARKER)
+        agent_result = None
+        try:
+            decision = self._route(message)
+            cached = self._cached_reply(message)
+            if cached is not None:
+                turn.route = "cache"
+                yield {"event": "token", "data": {"text": cached["content"]}}
+                yield {"event": "done", "data": self._build_response([cached])}
+                return
+
+            if decision is not None:
+                turn.route = "fast_path"
+                domains = decision.domains if len(decision.domains) > 1 else (decision.intent,)
+                for domain in domains:
+                    if domain in SPECIALIST_TOOLS:
+                        yield {
+                            "event": "tool",
+                            "data": {"name": SPECIALIST_TOOLS[domain].tool_name, "tool_use_id": None},
+                        }
+                message_item = await asyncio.to_thread(self._dispatch, message, decision)
+                self._cache_reply(message, message_item)
+                yield {"event": "token", "data": {"text": message_item["content"]}}
+                yield {"event": "done", "data": self._build_response([message_item])}
+                return
+
+            conversation_prompt = self._build_conversation_prompt(message)
+            # 流式输出已经发送给参会者，不做低置信度升级
+            self._select_model()
+            async for event in self.current_agent.stream_async(conversation_prompt):
+                if "data" in event:
+                    text = marker_filter.feed(event["data"])
+                    if text:
+                        yield {"event": "token", "data": {"text": text}}
+                elif "current_tool_use" in event:
+                    tool_use = event["current_tool_use"]
+                    tool_use_id = tool_use.get("toolUseId")
+                    if tool_use.get("name") and tool_use_id not in announced_tools:
+                        announced_tools.add(tool_use_id)
+                        yield {
+                            "event": "tool",
+                            "data": {
+                                "name": tool_use["name"],
+                                "tool_use_id": tool_use_id,
+                            },
+                        }
+                elif "result" in event:
+                    agent_result = event["result"]
+
+            if agent_result is None:
+                raise RuntimeError("Agent stream ended without a result")
+
+            tail = marker_filter.flush()
+            if tail:
+                yield {"event": "token", "data": {"text": tail}}
+
+            self._record_llm_route()
+            message_item = self._finalize_response(message, agent_result)
+            self._cache_reply(message, message_item)
+        except Exception as e:
+            logger.info("Error: %s", e)
+            turn.route = "error"
+            message_item = self._error_message()
+
+        yield {"event": "done", "data": self._build_response([message_item])}
+
     def _build_conversation_prompt(self, current_message: str) -> str:
         """Build a conversation prompt from the history."""
         return current_message
 
     def _build_response(self, messages: List[Dict]) -> Dict[str, Any]:
         """Build the response object."""
-        return {
+        response = {
             "messages": messages,
         }
+        turn = current_turn()
+        if METRICS_IN_RESPONSE and turn is not None:
+            response["metrics"] = turn.to_dict()
+        return response
@@ -4,80 +4,71 @@ Completely free, no registration needed
 """
 
 from strands import Agent, tool
-from strands.models import BedrockModel
-from strands_tools import retrieve
 from agents.prompt_templates import weather_agent_system_prompt
 from config.bedrock_config import (
-    BEDROCK_MODEL_ID,
-    DEFAULT_KNOWLEDGE_BASE_ID,
-    MAX_RAG_RESULTS,
-    MIN_RELEVANCE_SCORE,
-    AWS_REGION,
+    SPECIALIST_POOL_MAX_IDLE,
+    FORECAST_COORD_PRECISION,
+    FORECAST_REFRESH_AHEAD_SECONDS,
+    FORECAST_MAX_STALE_SECONDS,
+    FORECAST_CACHE_MAX_SIZE,
+    FORECAST_PREWARM_CITIES,
 )
-import uuid
 import requests
 from datetime import datetime
-from tools.logger_config import get_logger
+from tools.logger_config import get_logger, log_payload
+from tools.agent_pool import AgentPool
+from tools.model_registry import model_registry
+from tools.metrics import MetricsHook
+from tools.kb_retrieval import retrieve_kb
+from tools.geocoding import geocode_city, get_city_coordinates
+from tools.http_client import http_get
+from tools.forecast_cache import ForecastCache
 
 logger = get_logger(__name__)
 
-bedrock_model = BedrockModel(
-    model_id=BEDROCK_MODEL_ID,
-    temperature=0.3,
-    top_p=0.3,
-)
 
-@tool
-def get_city_coordinates(city: str) -> dict:
-    """
-    Get coordinates for a city using Open-Meteo Geocoding API (free, no API key required).
-    Prioritizes results with higher population to avoid small towns with same names.
+def fetch_forecast(latitude: float, longitude: float) -> dict:
+    """Fetch the raw Open-Meteo forecast payload for a coordinate."""
+    # Open-Meteo API - completely free, no API key needed
+    url = "https://api.open-meteo.com/v1/forecast"
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "current": [
+            "temperature_2m",
+            "relative_humidity_2m",
+            "apparent_temperature",
+            "weather_code",
+            "wind_speed_10m",
+            "wind_direction_10m",
+        ],
+        "hourly": ["temperature_2m", "weather_code", "relative_humidity_2m"],
+        "forecast_days": 1,
+        "timezone": "America/Los_Angeles",
+        "temperature_unit": "celsius",
+        "wind_speed_unit": "kmh",
+    }
+
+    response = http_get(url, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+forecast_cache = ForecastCache(
+    fetch_forecast,
+    precision=FORECAST_COORD_PRECISION,
+    refresh_ahead_seconds=FORECAST_REFRESH_AHEAD_SECONDS,
+    max_stale_seconds=FORECAST_MAX_STALE_SECONDS,
+    maxsize=FORECAST_CACHE_MAX_SIZE,
+)
 
-    Args:
-        city: City name to search for
 
-    Returns:
-        Dictionary containing latitude, longitude, and full location name
-    """
-    try:
-        geocoding_url = "https://geocoding-api.open-meteo.com/v1/search"
-        params = {
-            "name": city,
-            "count": 5,  # Get multiple results to choose the best one
-            "language": "zh",
-            "format": "json"
-        }
-        
-        response = requests.get(geocoding_url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get("results"):
-            return {
-                "status": "error",
-                "message": f"未找到城市: {city}"
-            }
-        
-        # Sort by population (if available) to get major cities first
-        results = data["results"]
-        results.sort(key=lambda x: x.get("population", 0), reverse=True)
-        
-        result = results[0]
-        return {
-            "status": "success",
-            "latitude": result["latitude"],
-            "longitude": result["longitude"],
-            "name": result["name"],
-            "country": result.get("country", ""),
-            "admin1": result.get("admin1", ""),
-            "population": result.get("population", 0)
-        }
-    except Exception as e:
-        logger.error(f"Error geocoding city {city}: {str(e)}")
-        return {
-            "status": "error",
-            "message": f"获取城市坐标失败: {str(e)}"
-        }
+def prewarm_forecasts(cities=FORECAST_PREWARM_CITIES) -> None:
+    """Start background forecast fetches for the given cities (used at startup)."""
+    for city in cities:
+        coord_result = geocode_city(city)
+        if coord_result["status"] == "success":
+            forecast_cache.prefetch(coord_result["latitude"], coord_result["longitude"])
 
 
 @tool
@@ -93,7 +84,7 @@ def get_realtime_weather(city: str = "Las Vegas") -> dict:
     """
     try:
         # First, get coordinates for the city
-        coord_result = get_city_coordinates(city)
+        coord_result = geocode_city(city)
         if coord_result["status"] == "error":
             return coord_result
         
@@ -101,29 +92,8 @@ def get_realtime_weather(city: str = "Las Vegas") -> dict:
         longitude = coord_result["longitude"]
         location_name = f"{coord_result['name']}, {coord_result.get('admin1', coord_result.get('country', ''))}"
         
-        # Open-Meteo API - completely free, no API key needed
-        url = "https://api.open-meteo.com/v1/forecast"
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "current": [
-                "temperature_2m",
-                "relative_humidity_2m",
-                "apparent_temperature",
-                "weather_code",
-                "wind_speed_10m",
-                "wind_direction_10m",
-            ],
-            "hourly": ["temperature_2m", "weather_code", "relative_humidity_2m"],
-            "forecast_days": 1,
-            "timezone": "America/Los_Angeles",
-            "temperature_unit": "celsius",
-            "wind_speed_unit": "kmh",
-        }
-
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        # 同一坐标同一小时内的预报直接命中缓存，无需访问 Open-Meteo
+        data = forecast_cache.get(latitude, longitude)
 
         # Weather code mapping (WMO codes)
         weather_descriptions = {
@@ -189,17 +159,17 @@ def get_realtime_weather(city: str = "Las Vegas") -> dict:
                 }
             )
 
-        logger.info(f"Successfully retrieved weather data from Open-Meteo")
+        logger.debug("Successfully retrieved weather data from Open-Meteo")
         return weather_info
 
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching weather data: {str(e)}")
+        logger.error("Error fetching weather data: %s", e)
         return {
             "status": "error",
             "message": f"获取天气数据失败: {str(e)}",
         }
     except Exception as e:
-        logger.error(f"Unexpected error in get_realtime_weather: {str(e)}")
+        logger.error("Unexpected error in get_realtime_weather: %s", e)
         return {
             "status": "error",
             "message": f"处理天气数据时出错: {str(e)}",
@@ -218,38 +188,32 @@ def retrieve_weather_info(query: str) -> dict:
         Dictionary containing weather information from knowledge base
     """
     try:
-        retrieve_response = retrieve.retrieve(
-            {
-                "toolUseId": str(uuid.uuid4()),
-                "input": {
-                    "text": query,
-                    "score": MIN_RELEVANCE_SCORE,
-                    "numberOfResults": MAX_RAG_RESULTS,
-                    "knowledgeBaseId": DEFAULT_KNOWLEDGE_BASE_ID,
-                    "region": AWS_REGION,
-                },
-            }
-        )
-        logger.info(f"Weather retrieve_response: {retrieve_response}")
+        retrieve_response = retrieve_kb(query)
+        log_payload(logger, "Weather retrieve_response", retrieve_response)
         return retrieve_response
     except Exception as e:
-        logger.error(f"Error retrieving weather info: {str(e)}")
+        logger.error("Error retrieving weather info: %s", e)
         return {
             "status": "error",
             "message": f"Error retrieving weather information: {str(e)}",
         }
 
 
-def init_agent(agent_name: str) -> Agent:
+def init_agent(agent_name: str, tier: str) -> Agent:
     """Initialize the weather agent with geocoding, real-time weather and knowledge base tools."""
     return Agent(
         name=agent_name,
         system_prompt=weather_agent_system_prompt,
-        model=bedrock_model,
+        model=model_registry.get(tier, "weather"),
         tools=[get_city_coordinates, get_realtime_weather, retrieve_weather_info],
+        hooks=[MetricsHook("weather")],
     )
 
 
+# 复用预热好的 Agent 实例，避免每次委托都重新构建
+agent_pool = AgentPool(init_agent, max_idle_per_key=SPECIALIST_POOL_MAX_IDLE)
+
+
 @tool
 def get_weather_info(query: str, user_id: str = None) -> str:
     """
@@ -278,9 +242,10 @@ def get_weather_info(query: str, user_id: str = None) -> str:
 """
 
     try:
-        logger.info("Routed to Free Weather Agent (Open-Meteo)")
-        agent = init_agent("Weather Agent")
-        agent_response = agent(formatted_query)
+        logger.debug("Routed to Free Weather Agent (Open-Meteo)")
+        tier = model_registry.tier_for("weather")
+        with agent_pool.lease("Weather Agent", tier) as agent:
+            agent_response = model_registry.invoke(agent, formatted_query, tier, "weather")
         text_response = str(agent_response)
 
         if len(text_response) > 0:
@@ -288,5 +253,5 @@ def get_weather_info(query: str, user_id: str = None) -> str:
 
         return "很抱歉，暂时无法获取天气信息。请稍后再试。"
     except Exception as e:
-        logger.error(f"Error in weather agent: {str(e)}")
+        logger.error("Error in weather agent: %s", e)
         return f"处理天气查询时出错：{str(e)}"
@@ -0,0 +1,69 @@
+"""
+Benchmark - per-delegation specialist agent setup cost, rebuild vs pooled lease
+
+No model is invoked; this measures only the work done before the first
+Bedrock call (Agent construction, tool registry and tool spec parsing).
+
+Usage:
+    python -m benchmarks.bench_agent_pool --iterations 200
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from agents import dining_agent, memory_agent, session_agent, weather_agent
+
+
+def _measure(fn: Callable[[], None], iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = {
+        "Weather Agent": (weather_agent, ("Weather Agent", "fast")),
+        "Dining Agent": (dining_agent, ("Dining Agent", "default")),
+        "Session Agent": (session_agent, ("Session Agent", "default")),
+        "Memory Agent": (memory_agent, ("Memory Agent", "user001", "bench", "fast")),
+    }
+
+    print(f"{'specialist':<16}{'mode':<10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, (module, key) in cases.items():
+        def rebuild():
+            module.init_agent(*key)
+
+        def pooled():
+            with module.agent_pool.lease(*key):
+                pass
+
+        # 预热一次，让池中有一个可复用的实例
+        pooled()
+        for mode, fn in (("rebuild", rebuild), ("pooled", pooled)):
+            stats = _summary(_measure(fn, args.iterations))
+            print(
+                f"{name:<16}{mode:<10}{stats['mean']:>10.3f}"
+                f"{stats['p50']:>10.3f}{stats['p95']:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark - attendee directory load time, memory and lookup latency at conference scale
+
+Writes a synthetic attendee export to a temporary directory, loads it with
+AttendeeDirectory, and reports load time, traced memory, lookup latency
+and hot reload after the file changes.
+
+Usage:
+    python -m benchmarks.bench_attendee_directory --attendees 60000
+"""
+
+import argparse
+import csv
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from tools.attendee_directory import AttendeeDirectory
+
+INTERESTS = ["AI/ML", "Serverless", "Database", "Security", "Containers", "Networking", "Analytics"]
+DIETS = ["无特殊要求", "无特殊要求", "无特殊要求", "素食", "清真", "纯素", "无麸质"]
+COMPANIES = [f"Company{i}" for i in range(2000)]
+PREFIXES = ["AIM", "SVS", "DAT", "SEC", "CON", "NET", "ANT"]
+
+
+def write_export(path: str, attendees: int, seed: int = 11) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["user_id", "name", "company", "interests", "dietary_preferences", "registered_sessions"]
+        )
+        for i in range(attendees):
+            sessions = [f"{rng.choice(PREFIXES)}{rng.randrange(100, 500)}" for _ in range(rng.randrange(1, 8))]
+            writer.writerow(
+                [
+                    f"user{i:06d}",
+                    f"Attendee {i}",
+                    rng.choice(COMPANIES),
+                    ";".join(rng.sample(INTERESTS, rng.randrange(1, 4))),
+                    rng.choice(DIETS),
+                    ";".join(sessions + [rng.choice(["KEY001", "KEY002"])]),
+                ]
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attendees", type=int, default=60000)
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "attendees.csv")
+        write_export(path, args.attendees)
+        print(f"export size: {os.path.getsize(path) / 1e6:.1f} MB")
+
+        directory = AttendeeDirectory(path, check_interval_seconds=0)
+        tracemalloc.start()
+        start = time.perf_counter()
+        directory.load()
+        load_ms = (time.perf_counter() - start) * 1000
+        stats = directory.stats()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"loaded {stats['attendees']} attendees in {load_ms:.0f} ms")
+        print(f"memory: {current / 1e6:.1f} MB retained, {peak / 1e6:.1f} MB peak")
+
+        ids = [f"user{random.randrange(args.attendees):06d}" for _ in range(args.lookups)]
+        directory._check_interval = 5.0
+        start = time.perf_counter()
+        for user_id in ids:
+            directory.get(user_id)
+        per_lookup_us = (time.perf_counter() - start) / len(ids) * 1e6
+        print(f"get(user_id): {per_lookup_us:.2f} µs")
+
+        samples = []
+        for interest in ["ai/ml", "security", "analytics"]:
+            start = time.perf_counter()
+            matches = directory.by_interest(interest)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"by_interest: {statistics.fmean(samples):.2f} ms for ~{len(matches)} attendees")
+
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        directory._next_check = 0.0
+        start = time.perf_counter()
+        directory.get("user000001")
+        caller_ms = (time.perf_counter() - start) * 1000
+        # 热加载在后台线程完成，调用方不等待
+        while directory.reloads < 2:
+            time.sleep(0.005)
+        reload_ms = (time.perf_counter() - start) * 1000
+        print(f"hot reload: caller {caller_ms:.2f} ms, background {reload_ms:.0f} ms, reloads={directory.reloads}")
+
+
+if __name__ == "__main__":
+    main()
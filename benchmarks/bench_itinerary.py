@@ -0,0 +1,70 @@
+"""
+Benchmark - itinerary planning latency on synthetic full-size session catalogs
+
+Sessions are spread over five conference days and the configured venues,
+with the walking times from config/venue_walking_minutes.csv.
+
+Usage:
+    python -m benchmarks.bench_itinerary --sizes 100 1000 5000 10000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import List
+
+from tools.itinerary_planner import plan_itinerary
+from tools.session_catalog import Session, SessionCatalog, get_session_catalog
+
+TRACKS = ["AI/ML", "Serverless", "Database", "Security", "Containers", "Networking", "Analytics"]
+VENUES = ["Venetian", "Caesars Forum", "Wynn", "Encore", "MGM Grand", "Mandalay Bay"]
+DAY_START = 8 * 60
+DAY_MINUTES = 10 * 60
+
+
+def synthetic_catalog(size: int, seed: int = 7) -> SessionCatalog:
+    rng = random.Random(seed)
+    sessions = []
+    for i in range(size):
+        track = rng.choice(TRACKS)
+        start = rng.randrange(5) * 1440 + DAY_START + rng.randrange(0, DAY_MINUTES, 15)
+        sessions.append(
+            Session(
+                session_id=f"{track[:3].upper()}{i:05d}",
+                title=f"Session {i}",
+                session_type=rng.choice(["Breakout", "Chalk Talk", "Workshop"]),
+                track=track,
+                level=rng.choice([100, 200, 300, 400]),
+                venue=rng.choice(VENUES),
+                start=start,
+                end=start + rng.choice([60, 60, 120]),
+            )
+        )
+    return SessionCatalog(sessions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 10000])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    _, walking = get_session_catalog()
+    print(f"{'sessions':>9}{'planned':>9}{'p50 ms':>10}{'max ms':>10}")
+    for size in args.sizes:
+        catalog = synthetic_catalog(size)
+        registered = [s.session_id for s in catalog.sessions[:: max(1, size // 10)]]
+        samples: List[float] = []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            itinerary = plan_itinerary(catalog, walking, ["AI/ML", "Serverless"], registered)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{size:>9}{len(itinerary.sessions):>9}"
+            f"{statistics.median(samples):>10.2f}{max(samples):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
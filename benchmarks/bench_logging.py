@@ -0,0 +1,188 @@
+"""
+Benchmark - log volume and caller-side logging time per turn, fully offline
+
+Runs the offline scenarios (see benchmarks/offline.py) with the logging
+setup this tree configures through tools.logger_config.get_logger() and
+its own call sites, writing to a counting sink. "log ms" is the time
+request threads spend inside Logger._log (building the record and
+handling it); arguments that a call site formats eagerly (f-strings,
+str() of payloads) are computed before that call and are not included,
+so the figure understates setups that format at the call site.
+
+--baseline REV checks REV out into a temporary git worktree and runs this
+same script there first, so both rows come from the same harness, e.g.
+the commit before async JSON logging:
+
+Usage:
+    python -m benchmarks.bench_logging --iterations 5 --concurrency 8
+    python -m benchmarks.bench_logging --baseline fb9dd98
+"""
+
+import argparse
+import io
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+from typing import Dict, Iterator, List
+from unittest import mock
+
+import agents.supervisor
+import tools.logger_config
+from benchmarks.bench_offline import _jobs, run_direct
+from benchmarks.offline import load_scenarios, offline_environment
+from tools.response_cache import response_cache
+
+HEADER = f"{'setup':<12}{'turns':>7}{'lines/turn':>12}{'KB/turn':>10}{'log ms/turn':>13}"
+
+
+class CountingSink:
+    """File-like object that only counts what is written."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.lines = 0
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            self.bytes += len(text.encode("utf-8"))
+            self.lines += text.count("\n")
+
+    def flush(self) -> None:
+        pass
+
+
+class LogCallTimer:
+    """Accumulate the time callers spend in Logger._log."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def installed(self) -> Iterator[None]:
+        original = logging.Logger._log
+
+        def timed_log(logger: logging.Logger, *args, **kwargs) -> None:
+            start = time.perf_counter()
+            original(logger, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.seconds += elapsed
+
+        with mock.patch.object(logging.Logger, "_log", timed_log):
+            yield
+
+
+def _output_handlers() -> List[logging.Handler]:
+    # 同步配置直接挂在 root 上；异步配置的输出 handler 挂在后台 listener 上
+    handlers = list(logging.getLogger().handlers)
+    listener = getattr(tools.logger_config, "_listener", None)
+    if listener is not None:
+        handlers.extend(listener.handlers)
+    return [h for h in handlers if isinstance(h, logging.StreamHandler)]
+
+
+@contextmanager
+def tree_logging(sink: CountingSink) -> Iterator[None]:
+    """Let this tree's get_logger() configure the root logger, writing to sink."""
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    shutdown = getattr(tools.logger_config, "shutdown_logging", None)
+    if shutdown is not None:
+        shutdown()
+    root.handlers.clear()
+    tools.logger_config.get_logger(__name__)
+    for handler in _output_handlers():
+        handler.setStream(sink)
+    try:
+        yield
+    finally:
+        if shutdown is not None:
+            shutdown()
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
+
+
+def run_tree(scenarios, iterations: int, concurrency: int) -> Dict[str, float]:
+    sink = CountingSink()
+    timer = LogCallTimer()
+    response_cache.clear()
+    # 丢弃 strands 默认回调打印到 stdout 的流式文本
+    with tree_logging(sink), timer.installed(), redirect_stdout(io.StringIO()):
+        samples = run_direct(_jobs(scenarios, iterations, "logging"), concurrency)
+    turns = max(1, len(samples))
+    return {
+        "turns": len(samples),
+        "lines": sink.lines / turns,
+        "kb": sink.bytes / turns / 1e3,
+        "log_ms": timer.seconds / turns * 1000,
+    }
+
+
+def run_baseline(revision: str, argv: List[str]) -> None:
+    """Run this script unchanged in a temporary worktree of revision."""
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, "baseline")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, revision], check=True, capture_output=True)
+        try:
+            shutil.copy(__file__, os.path.join(worktree, "benchmarks", "bench_logging.py"))
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_logging", *argv, "--label", revision, "--no-header"],
+                cwd=worktree,
+                check=True,
+            )
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], check=False, capture_output=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--model-latency-ms", type=float, default=5.0)
+    parser.add_argument("--answer-chars", type=int, default=2000)
+    parser.add_argument("--router", choices=["on", "shadow", "off"], default="off")
+    parser.add_argument("--baseline", help="Also measure this git revision, e.g. fb9dd98")
+    parser.add_argument("--label", default="current")
+    parser.add_argument("--no-header", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not args.no_header:
+        print(HEADER, flush=True)
+    if args.baseline:
+        run_baseline(
+            args.baseline,
+            [
+                "--iterations", str(args.iterations),
+                "--concurrency", str(args.concurrency),
+                "--model-latency-ms", str(args.model_latency_ms),
+                "--answer-chars", str(args.answer_chars),
+                "--router", args.router,
+            ],
+        )
+
+    scenarios = load_scenarios()
+    with offline_environment(
+        model_latency_ms=args.model_latency_ms,
+        fixture_latency_ms=0.0,
+        answer_chars=args.answer_chars,
+    ), mock.patch.object(agents.supervisor, "INTENT_ROUTER_MODE", args.router), mock.patch.object(
+        agents.supervisor, "RESPONSE_CACHE_ENABLED", False
+    ):
+        stats = run_tree(scenarios, args.iterations, args.concurrency)
+    print(
+        f"{args.label:<12}{stats['turns']:>7}{stats['lines']:>12.1f}"
+        f"{stats['kb']:>10.2f}{stats['log_ms']:>13.3f}",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
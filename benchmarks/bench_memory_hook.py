@@ -0,0 +1,114 @@
+"""
+Benchmark - MemoryHook.on_message_added cost over growing conversation histories
+
+Compares the previous implementation (deep copy of the whole history,
+sequential namespace retrievals, synchronous save) with the current
+MemoryHook, using a fake memory client with fixed per-call latency.
+
+Usage:
+    python -m benchmarks.bench_memory_hook --latency-ms 20 --lengths 10 100 1000 5000
+"""
+
+import argparse
+import copy
+import statistics
+import time
+from types import SimpleNamespace
+from typing import List
+
+from strands.hooks.events import MessageAddedEvent
+
+from tools.memory_hook import MemoryHook
+
+
+class FakeMemoryClient:
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+
+    def retrieve_memories(self, memory_id, namespace, query, top_k=3):
+        time.sleep(self.latency)
+        return [{"content": {"text": f"{namespace} memory {i}"}} for i in range(top_k)]
+
+    def save_conversation(self, memory_id, actor_id, session_id, messages):
+        time.sleep(self.latency)
+
+
+class LegacyMemoryHook(MemoryHook):
+    """The previous on_message_added: deep copy, sequential retrievals, sync save."""
+
+    def _legacy_add_context(self, namespace, query, init_content, event):
+        content = None
+        memories = self.memory_client.retrieve_memories(
+            memory_id=self.memory_id, namespace=namespace, query=query, top_k=3
+        )
+        for memory in memories:
+            if not content:
+                content = "\n\n" + init_content + "\n\n"
+            content += memory["content"]["text"]
+            if content:
+                event.agent.messages[-1]["content"][0]["text"] += content + "\n\n"
+
+    def on_message_added(self, event):
+        messages = copy.deepcopy(event.agent.messages)
+        if messages[-1]["role"] == "user":
+            for namespace, init_content in self.namespaces:
+                self._legacy_add_context(
+                    namespace, messages[-1]["content"][0]["text"], init_content, event
+                )
+        self.memory_client.save_conversation(
+            memory_id=self.memory_id,
+            actor_id=self.actor_id,
+            session_id=self.session_id,
+            messages=[(messages[-1]["content"][0]["text"], messages[-1]["role"])],
+        )
+
+
+def _history(length: int) -> List[dict]:
+    return [
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": [{"text": f"第 {i} 条消息：re:Invent 期间 Las Vegas 的天气和餐厅推荐" * 5}],
+        }
+        for i in range(length)
+    ]
+
+
+def _run(hook: MemoryHook, length: int, iterations: int, repeat_query: bool) -> List[float]:
+    samples = []
+    for i in range(iterations):
+        query = "keynote schedule" if repeat_query else f"question {i}"
+        messages = _history(length)
+        message = {"role": "user", "content": [{"text": query}]}
+        messages.append(message)
+        event = MessageAddedEvent(agent=SimpleNamespace(messages=messages), message=message)
+        start = time.perf_counter()
+        hook.on_message_added(event)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+
+    client = FakeMemoryClient(args.latency_ms)
+    print(f"{'history':>8}  {'implementation':<22}{'p50 ms':>10}{'mean ms':>10}")
+    for length in args.lengths:
+        cases = [
+            ("legacy", LegacyMemoryHook(client, "mem", "actor", "session"), False),
+            ("current", MemoryHook(client, "mem", "actor", "session"), False),
+            ("current (cached query)", MemoryHook(client, "mem", "actor", "session"), True),
+        ]
+        for name, hook, repeat_query in cases:
+            samples = _run(hook, length, args.iterations, repeat_query)
+            print(
+                f"{length:>8}  {name:<22}{statistics.median(samples):>10.2f}"
+                f"{statistics.fmean(samples):>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
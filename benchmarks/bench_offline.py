@@ -0,0 +1,213 @@
+"""
+Benchmark - end-to-end turn latency, throughput and allocations, fully offline
+
+Runs the scripted conversations in benchmarks/fixtures/scenarios.json
+through SupervisorAgent.process_message ("direct") or the FastAPI app's
+/invocations endpoint over an in-process ASGI transport ("http"), with
+stub models and recorded tool fixtures (see benchmarks/offline.py).
+Confidently routed prompts take the intent router's fast path and never
+reach the supervisor model; use --router off to measure the LLM path.
+The response cache is off by default so every turn is orchestrated; with
+--response-cache repeated scenarios are served from it after warmup.
+
+Usage:
+    python -m benchmarks.bench_offline --mode direct --iterations 5 --concurrency 8
+    python -m benchmarks.bench_offline --mode http --model-latency-ms 300 --allocations
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Tuple
+from unittest import mock
+
+import httpx
+
+import agents.supervisor
+from agents.intent_router import router_metrics
+from agents.supervisor import SPECIALIST_ERROR_RE, SupervisorAgent
+from benchmarks.offline import load_scenarios, offline_environment
+from tools.kb_retrieval import invalidate_kb_cache
+from tools.model_registry import model_registry
+from tools.response_cache import response_cache
+
+ERROR_REPLY_PREFIX = "十分抱歉，系统暂时繁忙"
+
+Job = Tuple[Dict[str, Any], str]
+
+
+class TurnSample(NamedTuple):
+    scenario: str
+    ms: float
+    ok: bool
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {"p50": value, "p95": value, "p99": value, "mean": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "mean": statistics.fmean(samples)}
+
+
+def _is_ok(result: Dict[str, Any]) -> bool:
+    """A turn failed if the supervisor, a specialist or any tool call reported an error."""
+    messages = result.get("messages") or []
+    if not messages:
+        return False
+    reply = str(messages[-1].get("content", ""))
+    if reply.startswith(ERROR_REPLY_PREFIX):
+        return False
+    # 多专家合并回答中每段单独成行，逐行检查专家的错误回复
+    if any(SPECIALIST_ERROR_RE.match(line) for line in reply.splitlines()):
+        return False
+    tools = (result.get("metrics") or {}).get("tools", [])
+    return not any(call.get("status") == "error" for call in tools)
+
+
+def _jobs(scenarios: List[Dict[str, Any]], iterations: int, tag: str) -> List[Job]:
+    return [
+        (scenario, f"{tag}-{iteration}-{i}")
+        for iteration in range(iterations)
+        for i, scenario in enumerate(scenarios)
+    ]
+
+
+def run_direct(jobs: List[Job], concurrency: int) -> List[TurnSample]:
+    def run(job: Job) -> List[TurnSample]:
+        scenario, session_id = job
+        supervisor = SupervisorAgent(session_id=f"session_{session_id}")
+        samples = []
+        for prompt in scenario["turns"]:
+            start = time.perf_counter()
+            result = supervisor.process_message(prompt)
+            samples.append(
+                TurnSample(scenario["name"], (time.perf_counter() - start) * 1000, _is_ok(result))
+            )
+        return samples
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return [sample for samples in pool.map(run, jobs) for sample in samples]
+
+
+async def run_http(jobs: List[Job], concurrency: int) -> List[TurnSample]:
+    from main import app
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+
+        async def run(job: Job) -> List[TurnSample]:
+            scenario, session_id = job
+            samples = []
+            async with semaphore:
+                for prompt in scenario["turns"]:
+                    start = time.perf_counter()
+                    response = await client.post(
+                        "/invocations",
+                        json={"input": {"prompt": prompt, "session_id": session_id}},
+                    )
+                    ok = response.status_code == 200 and _is_ok(response.json()["output"]["message"])
+                    samples.append(
+                        TurnSample(scenario["name"], (time.perf_counter() - start) * 1000, ok)
+                    )
+            return samples
+
+        results = await asyncio.gather(*(run(job) for job in jobs))
+    return [sample for samples in results for sample in samples]
+
+
+def run_pass(mode: str, jobs: List[Job], concurrency: int) -> List[TurnSample]:
+    if mode == "http":
+        return asyncio.run(run_http(jobs, concurrency))
+    return run_direct(jobs, concurrency)
+
+
+def report(samples: List[TurnSample], wall_seconds: float) -> None:
+    by_scenario: Dict[str, List[TurnSample]] = {}
+    for sample in samples:
+        by_scenario.setdefault(sample.scenario, []).append(sample)
+    by_scenario["all"] = samples
+
+    print(f"{'scenario':<22}{'turns':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, group in by_scenario.items():
+        stats = _summary([s.ms for s in group])
+        errors = sum(not s.ok for s in group)
+        print(
+            f"{name:<22}{len(group):>7}{errors:>8}"
+            f"{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}{stats['mean']:>10.1f}"
+        )
+    print(f"throughput: {len(samples) / wall_seconds:.1f} turns/s over {wall_seconds:.2f} s")
+
+
+def report_allocations(mode: str, jobs: List[Job], concurrency: int, top: int = 8) -> None:
+    tracemalloc.start(10)
+    before = tracemalloc.take_snapshot()
+    samples = run_pass(mode, jobs, concurrency)
+    after = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    turns = max(1, len(samples))
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    print(f"allocations: {peak / 1e6:.1f} MB peak, {retained / turns / 1e3:.1f} KB retained per turn")
+    for stat in after.compare_to(before, "lineno")[:top]:
+        frame = stat.traceback[0]
+        print(f"  {stat.size_diff / 1e3:>10.1f} KB  {stat.count_diff:>7} blocks  {frame.filename}:{frame.lineno}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["direct", "http"], default="direct")
+    parser.add_argument("--scenarios", default=None, help="Scenario JSON file (default: fixtures/scenarios.json)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--model-latency-ms", type=float, default=50.0)
+    parser.add_argument("--chunk-ms", type=float, default=0.0)
+    parser.add_argument("--fixture-latency-ms", type=float, default=20.0)
+    parser.add_argument("--router", choices=["on", "shadow", "off"], default=None)
+    parser.add_argument("--response-cache", action="store_true", help="Serve repeated prompts from the response cache")
+    parser.add_argument("--allocations", action="store_true", help="Run one extra pass under tracemalloc")
+    args = parser.parse_args()
+
+    scenarios = load_scenarios(args.scenarios) if args.scenarios else load_scenarios()
+    with offline_environment(
+        model_latency_ms=args.model_latency_ms,
+        chunk_ms=args.chunk_ms,
+        fixture_latency_ms=args.fixture_latency_ms,
+    ), mock.patch.object(
+        agents.supervisor, "INTENT_ROUTER_MODE", args.router or agents.supervisor.INTENT_ROUTER_MODE
+    ), mock.patch.object(
+        agents.supervisor,
+        "RESPONSE_CACHE_ENABLED",
+        agents.supervisor.RESPONSE_CACHE_ENABLED and args.response_cache,
+    ), mock.patch.object(
+        # 失败判断依赖每轮的工具调用状态
+        agents.supervisor, "METRICS_IN_RESPONSE", True
+    ):
+        response_cache.clear()
+        invalidate_kb_cache()
+        if args.warmup:
+            run_pass(args.mode, _jobs(scenarios, args.warmup, "warmup"), args.concurrency)
+
+        jobs = _jobs(scenarios, args.iterations, "bench")
+        start = time.perf_counter()
+        samples = run_pass(args.mode, jobs, args.concurrency)
+        report(samples, time.perf_counter() - start)
+
+        router = router_metrics.stats()
+        print(f"router: fast_path={router['fast_path']} fallback={router['fallback']}")
+        for tier, stats in model_registry.stats().items():
+            if stats["calls"]:
+                print(f"model tier {tier}: {stats}")
+
+        if args.allocations:
+            report_allocations(args.mode, _jobs(scenarios, 1, "alloc"), args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
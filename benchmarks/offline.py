@@ -0,0 +1,134 @@
+"""
+Offline environment - runs the agents without Bedrock, AgentCore or the internet
+
+Installs StubModels in the model registry and serves recorded fixtures
+from benchmarks/fixtures for the Open-Meteo forecast (get_realtime_weather),
+the Overpass API (search_nearby_restaurants) and strands retrieve
+(retrieve_*_info). AgentCore Memory reads return no profile and memory
+writes are dropped.
+"""
+
+import json
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, Iterator, List
+from unittest import mock
+
+import agents.supervisor
+import agents.dining_agent
+import agents.weather_agent
+from tools import agentcore_memory, kb_retrieval
+from tools.attendee_profile import NO_PROFILE_MESSAGE
+from tools.model_registry import model_registry
+from benchmarks.stub_model import install_stub_models
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+KB_TOPICS = {
+    "weather": ("天气", "穿衣", "温度", "weather"),
+    "dining": ("餐厅", "美食", "吃", "dining", "restaurant"),
+    "session": ("session", "议程", "日程", "keynote"),
+}
+
+
+def load_fixture(name: str) -> Any:
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_scenarios(path: str = os.path.join(FIXTURES_DIR, "scenarios.json")) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FixtureResponse:
+    """The subset of requests.Response the tools use."""
+
+    status_code = 200
+
+    def __init__(self, payload: Any):
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Any:
+        return self._payload
+
+
+def _kb_topic(query: str) -> str:
+    text = query.lower()
+    for topic, keywords in KB_TOPICS.items():
+        if any(keyword in text for keyword in keywords):
+            return topic
+    return "default"
+
+
+@contextmanager
+def offline_environment(
+    model_latency_ms: float = 50.0,
+    chunk_ms: float = 0.0,
+    fixture_latency_ms: float = 20.0,
+    answer_chars: int = 300,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Patch every external dependency of a turn with stubs and fixtures.
+
+    Args:
+        model_latency_ms: Stub model time to first token
+        chunk_ms: Stub model delay between streamed text chunks
+        fixture_latency_ms: Simulated network latency of each fixture call
+        answer_chars: Length of the stub model's final answers
+
+    Yields:
+        The stub model of each tier (built on first use)
+    """
+    forecast = load_fixture("open_meteo_forecast.json")
+    overpass = load_fixture("overpass_restaurants.json")
+    kb_texts = load_fixture("kb_retrieve.json")
+
+    def network_delay() -> None:
+        if fixture_latency_ms:
+            time.sleep(fixture_latency_ms / 1000)
+
+    def http_get(url: str, **kwargs: Any) -> FixtureResponse:
+        network_delay()
+        return FixtureResponse(forecast)
+
+    def http_post(url: str, **kwargs: Any) -> FixtureResponse:
+        network_delay()
+        return FixtureResponse(overpass)
+
+    def retrieve(tool: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        network_delay()
+        return {
+            "toolUseId": tool["toolUseId"],
+            "status": "success",
+            "content": [{"text": kb_texts[_kb_topic(tool["input"]["text"])]}],
+        }
+
+    def load_attendee_profile(user_id: str) -> str:
+        network_delay()
+        return NO_PROFILE_MESSAGE
+
+    with ExitStack() as stack:
+        stubs = stack.enter_context(
+            install_stub_models(
+                model_registry,
+                latency_ms=model_latency_ms,
+                chunk_ms=chunk_ms,
+                answer_chars=answer_chars,
+            )
+        )
+        stack.enter_context(mock.patch.object(agents.weather_agent, "http_get", http_get))
+        stack.enter_context(mock.patch.object(agents.dining_agent, "http_post", http_post))
+        stack.enter_context(mock.patch.object(kb_retrieval, "KB_RETRIEVAL_BACKEND", "bedrock"))
+        stack.enter_context(mock.patch.object(kb_retrieval.retrieve, "retrieve", retrieve))
+        stack.enter_context(
+            mock.patch.object(agents.supervisor, "load_attendee_profile", load_attendee_profile)
+        )
+        stack.enter_context(
+            mock.patch.object(agentcore_memory.memory_writer, "submit", lambda *args, **kwargs: True)
+        )
+        yield stubs
@@ -0,0 +1,217 @@
+"""
+Stub model - deterministic, offline stand-in for the Bedrock model tiers
+
+Each call answers with the next step of a tool-call script: the script
+looks at the tools the agent has and the prompt of the current turn and
+returns the tool calls a well-behaved model would make, one per model
+call, followed by a final text answer built from the tool results.
+Time to first token and per-chunk streaming delay are simulated, and calls
+are recorded in the model registry's per-tier stats like the real models.
+"""
+
+import asyncio
+import itertools
+import json
+import re
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from strands.models import Model
+
+from agents.intent_router import TOOL_INTENTS, intent_router
+from tools.model_registry import ModelRegistry, TierStats
+
+ToolCall = Tuple[str, Dict[str, Any]]
+# (本轮用户输入, agent 可用的工具名) → 按顺序执行的工具调用
+ToolCallScript = Callable[[str, Set[str]], List[ToolCall]]
+
+INTENT_TOOLS = {intent: name for name, intent in TOOL_INTENTS.items()}
+USER_ID_RE = re.compile(r"user\s*id\s*(?:是|为|:|：|is)?\s*([A-Za-z0-9_-]+)", re.IGNORECASE)
+PLANNED_USER_RE = re.compile(r"user_id=([A-Za-z0-9_-]+)")
+ITINERARY_RE = re.compile(r"日程|行程|规划|安排|itinerary|schedule", re.IGNORECASE)
+
+_tool_use_ids = itertools.count(1)
+
+
+def conference_script(prompt: str, tool_names: Set[str]) -> List[ToolCall]:
+    """Tool calls of the supervisor and the specialists for one prompt."""
+    if "get_weather_info" in tool_names:
+        # Supervisor：记录 user id，否则按意图调用对应的专家 agent
+        match = USER_ID_RE.search(prompt)
+        if match:
+            return [("update_user_id", {"user_id": match.group(1)})]
+        decision = intent_router.route(prompt)
+        return [
+            (INTENT_TOOLS[domain], {"query": prompt})
+            for domain in decision.domains
+            if INTENT_TOOLS.get(domain) in tool_names
+        ]
+    if "get_realtime_weather" in tool_names:
+        return [
+            ("get_realtime_weather", {"city": "Las Vegas"}),
+            ("retrieve_weather_info", {"query": prompt}),
+        ]
+    if "search_nearby_restaurants" in tool_names:
+        return [
+            ("search_nearby_restaurants", {"city": "Las Vegas", "radius_km": 2.0}),
+            ("retrieve_dining_info", {"query": prompt}),
+        ]
+    if "plan_itinerary" in tool_names and ITINERARY_RE.search(prompt):
+        match = PLANNED_USER_RE.search(prompt)
+        return [("plan_itinerary", {"user_id": match.group(1) if match else ""})]
+    if "retrieve_session_info" in tool_names:
+        return [("retrieve_session_info", {"query": prompt})]
+    return []
+
+
+def _current_turn(messages: List[Dict[str, Any]]) -> Tuple[str, List[str]]:
+    """Prompt of the current turn and the tool results the model has seen since."""
+    results: List[str] = []
+    for message in reversed(messages):
+        if message["role"] != "user":
+            continue
+        tool_results = [block["toolResult"] for block in message["content"] if "toolResult" in block]
+        if not tool_results:
+            prompt = "".join(block.get("text", "") for block in message["content"])
+            return prompt, results[::-1]
+        for result in tool_results:
+            results.append(
+                "".join(
+                    item["text"] if "text" in item else json.dumps(item.get("json"), ensure_ascii=False)
+                    for item in result.get("content", [])
+                )
+            )
+    return "", results[::-1]
+
+
+class StubModel(Model):
+    """
+    Scripted model with simulated latency.
+
+    Args:
+        tier: Model tier this stub replaces
+        stats: Tier stats to record calls in
+        script: Tool-call script, see conference_script
+        latency_ms: Delay before the first event of every call
+        chunk_ms: Delay between streamed text chunks
+        answer_chars: Length of the final text answer
+        chunk_chars: Characters per streamed text chunk
+    """
+
+    def __init__(
+        self,
+        tier: str,
+        stats: Optional[TierStats] = None,
+        script: ToolCallScript = conference_script,
+        latency_ms: float = 50.0,
+        chunk_ms: float = 0.0,
+        answer_chars: int = 300,
+        chunk_chars: int = 20,
+    ):
+        self.tier = tier
+        self._stats = stats
+        self._script = script
+        self.config = {
+            "model_id": f"stub-{tier}",
+            "latency_ms": latency_ms,
+            "chunk_ms": chunk_ms,
+            "answer_chars": answer_chars,
+            "chunk_chars": chunk_chars,
+        }
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        """Return an output_model instance with placeholder values for required fields."""
+        await asyncio.sleep(self.config["latency_ms"] / 1000)
+        text, _ = _current_turn(prompt)
+        placeholders = {str: text, int: 0, float: 0.0, bool: False, list: [], dict: {}}
+        values = {
+            name: placeholders.get(getattr(field.annotation, "__origin__", field.annotation))
+            for name, field in output_model.model_fields.items()
+            if field.is_required()
+        }
+        yield {"output": output_model.model_construct(**values)}
+
+    def _answer(self, prompt: str, results: List[str]) -> str:
+        digest = " ".join(" ".join(r.split()) for r in results)
+        text = f"关于“{prompt[:40]}”：{digest or '以下是一般性的参会建议。'}"
+        target = self.config["answer_chars"]
+        while len(text) < target:
+            text += " 祝您在 re:Invent 期间一切顺利。"
+        return text[:target]
+
+    async def stream(
+        self,
+        messages,
+        tool_specs=None,
+        system_prompt=None,
+        **kwargs: Any,
+    ):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.sleep(self.config["latency_ms"] / 1000)
+
+        prompt, results = _current_turn(messages)
+        tool_names = {spec["name"] for spec in tool_specs or []}
+        calls = self._script(prompt, tool_names)
+
+        yield {"messageStart": {"role": "assistant"}}
+        if len(results) < len(calls):
+            name, tool_input = calls[len(results)]
+            output = json.dumps(tool_input, ensure_ascii=False)
+            yield {
+                "contentBlockStart": {
+                    "start": {"toolUse": {"toolUseId": f"tooluse_{next(_tool_use_ids)}", "name": name}}
+                }
+            }
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": output}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+        else:
+            output = self._answer(prompt, results)
+            size = self.config["chunk_chars"]
+            for i in range(0, len(output), size):
+                if i and self.config["chunk_ms"]:
+                    await asyncio.sleep(self.config["chunk_ms"] / 1000)
+                yield {"contentBlockDelta": {"delta": {"text": output[i : i + size]}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+
+        # 粗略按 4 字符一个 token 估算用量
+        usage = {
+            "inputTokens": (len(system_prompt or "") + len(json.dumps(messages, ensure_ascii=False, default=str))) // 4,
+            "outputTokens": max(1, len(output) // 4),
+        }
+        usage["totalTokens"] = usage["inputTokens"] + usage["outputTokens"]
+        latency_ms = (loop.time() - start) * 1000
+        yield {"metadata": {"usage": usage, "metrics": {"latencyMs": int(latency_ms)}}}
+        if self._stats is not None:
+            self._stats.record(latency_ms, usage)
+
+
+@contextmanager
+def install_stub_models(registry: ModelRegistry, **stub_options: Any) -> Iterator[Dict[str, StubModel]]:
+    """
+    Make the registry hand out StubModels instead of Bedrock models.
+
+    Agents built while the context is active keep their stub model, so
+    install the stubs before any SupervisorAgent or pooled specialist is
+    created. Yields the stub of each tier (built on first use).
+    """
+    stubs: Dict[str, StubModel] = {}
+
+    def get(tier: str, agent_name: Optional[str] = None) -> StubModel:
+        if tier not in stubs:
+            stubs[tier] = StubModel(tier, registry._stats.get(tier), **stub_options)
+        return stubs[tier]
+
+    registry.get = get
+    try:
+        yield stubs
+    finally:
+        del registry.get
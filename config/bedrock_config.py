@@ -20,6 +20,28 @@ BEDROCK_MODEL_ID = "us.amazon.nova-pro-v1:0"
 MODEL_TEMPERATURE = 0.3
 MODEL_TOP_P = 0.3
 
+# Model Tiers
+# 各 Agent 按层级使用模型：简单的路由和天气问答用 Lite，议程规划等复杂任务用 Pro，低置信度输出自动升级
+MODEL_TIERS = {
+    "fast": "us.amazon.nova-lite-v1:0",
+    "default": BEDROCK_MODEL_ID,
+    "strong": "us.amazon.nova-premier-v1:0",
+}
+MODEL_ESCALATION = {"fast": "default", "default": "strong"}  # Next tier for low-confidence output
+AGENT_MODEL_TIERS = {
+    "supervisor": "default",
+    "weather": "fast",
+    "dining": "default",
+    "session": "default",
+    "memory": "fast",
+}
+INTENT_MODEL_TIERS = {  # Supervisor tier by router intent; overrides AGENT_MODEL_TIERS
+    "weather": "fast",
+    "off_topic": "fast",
+}
+AGENT_MODEL_PARAMS = {"supervisor": {"top_p": 0.8}}  # Per-agent overrides of MODEL_TEMPERATURE / MODEL_TOP_P
+LOW_CONFIDENCE_MIN_CHARS = 5  # Shorter outputs are treated as low-confidence
+
 # Bedrock Agent Core Memory Configuration
 # BEDROCK_AGENTCORE_MEMORY_ID = "memory_strands_test1-1VqKHU3EKq"
 BEDROCK_AGENTCORE_MEMORY_ID = "memory22-uuH40yFOhd"
@@ -29,3 +51,152 @@ BEDROCK_AGENTCORE_MEMORY_ID = "memory22-uuH40yFOhd"
 # 运行 04-agentcore-runtime-strands-deploy.ipynb 部署后，在输出中找到 Runtime ARN
 AGENTCORE_RUNTIME_ARN = "arn:aws:bedrock-agentcore:us-east-1:xxxxxxx:runtime/strands_claude_getting_started-VS3rt4EOF7"
 
+
+# Session Registry Configuration
+# 每个参会者会话独立一个 SupervisorAgent，超出上限或空闲超时的会话会被回收
+MAX_ACTIVE_SESSIONS = 2000  # Maximum number of SupervisorAgent instances kept in memory
+SESSION_IDLE_TTL_SECONDS = 1800  # Evict sessions idle for longer than 30 minutes
+SESSION_EVICTION_INTERVAL_SECONDS = 60  # How often a background thread drops idle sessions
+
+# Agent Turn Execution Configuration
+# Agent 调用在独立线程池中执行，避免阻塞 uvicorn 事件循环（包括 /ping 健康检查）
+AGENT_MAX_CONCURRENT_TURNS = 16  # Worker threads / concurrent agent turns per process
+AGENT_TURN_QUEUE_TIMEOUT_SECONDS = 30  # Return 503 if no worker frees up in time
+
+# Specialist Agent Pool Configuration
+SPECIALIST_POOL_MAX_IDLE = 8  # Warm idle agents kept per specialist (and per user for Memory Agent)
+
+# Geocoding Configuration
+# 常用会议城市（如 Las Vegas）由内置地名表离线解析，其他城市结果缓存在进程内
+GEOCODE_CACHE_MAX_SIZE = 1024  # Maximum number of cached city lookups
+GEOCODE_CACHE_TTL_SECONDS = 86400  # Cache successful lookups for one day
+GEOCODE_NOT_FOUND_TTL_SECONDS = 300  # Cache "city not found" results briefly
+
+# External HTTP Client Configuration (Open-Meteo, Overpass)
+# 所有外部 API 调用共用连接池，复用 keep-alive 连接，失败时指数退避重试
+HTTP_CONNECT_TIMEOUT = 3.05  # Seconds to establish a TCP/TLS connection
+HTTP_READ_TIMEOUT = 10  # Default seconds to wait for a response
+HTTP_POOL_CONNECTIONS = 10  # Number of distinct hosts with pooled connections
+HTTP_POOL_MAXSIZE = 32  # Keep-alive connections per host
+HTTP_MAX_RETRIES = 2  # Retries on connection errors and 429/5xx responses
+HTTP_BACKOFF_FACTOR = 0.3  # Exponential backoff base in seconds
+
+# Weather Forecast Cache Configuration
+# 预报按坐标（四舍五入）和小时缓存，临近整点后台刷新，上游失败时返回旧数据
+FORECAST_COORD_PRECISION = 2  # Decimal places of lat/lon in cache keys (~1 km)
+FORECAST_REFRESH_AHEAD_SECONDS = 300  # Refresh in the background 5 minutes before the hour
+FORECAST_MAX_STALE_SECONDS = 21600  # Serve up to 6 hour old data if Open-Meteo fails
+FORECAST_CACHE_MAX_SIZE = 256  # Maximum number of cached coordinates
+FORECAST_PREWARM_CITIES = ["Las Vegas"]  # Fetched in the background at server startup
+
+# Restaurant POI Index Configuration
+# 会场周边餐厅从 OSM/Overpass 导出文件加载到本地空间索引，覆盖范围内的查询不再请求 Overpass
+POI_EXTRACT_PATH = "data/poi_las_vegas.json"  # Overpass JSON extract, rewritten after each refresh
+POI_INDEX_BBOX = (36.05, -115.30, 36.25, -115.05)  # (south, west, north, east): Strip and downtown
+POI_GRID_CELL_DEG = 0.01  # Grid cell size in degrees (~1 km)
+POI_REFRESH_INTERVAL_SECONDS = 21600  # Incremental refresh from Overpass every 6 hours
+POI_FULL_RELOAD_SECONDS = 604800  # Full reload weekly, drops venues deleted from OSM
+
+# Knowledge Base Retrieval Cache Configuration
+# 知识库内容（docs/*.md）很少变化，相同问题直接返回缓存；知识库同步后调用 invalidate_kb_cache 清空
+KB_CACHE_MAX_SIZE = 2048  # Maximum number of cached queries
+KB_CACHE_TTL_SECONDS = 3600  # Cached retrievals expire after one hour
+
+# Knowledge Base Retrieval Backend
+# "bedrock": 调用 Bedrock Knowledge Base；"local": 使用进程内 BM25 引擎检索 docs/ 下的文档，无需网络
+KB_RETRIEVAL_BACKEND = "bedrock"
+LOCAL_KB_DOCS_DIR = "docs"  # Markdown source documents of the knowledge base
+LOCAL_KB_INDEX_DIR = ".kb_index"  # Persisted (memory-mapped) local index files
+LOCAL_KB_DENSE_WEIGHT = 0.3  # Weight of hashed n-gram dense scores in hybrid ranking; 0 = BM25 only
+
+# AgentCore Memory Writer Configuration
+# 对话记忆由后台线程异步批量写入，同一参会者的 USER/ASSISTANT 消息合并为一个 event
+MEMORY_WRITER_QUEUE_SIZE = 10000  # Queued turns before new ones are dropped
+MEMORY_WRITER_BATCH_SIZE = 100  # Maximum turns drained per batch
+MEMORY_WRITER_LINGER_SECONDS = 0.2  # Wait this long for more turns before writing a batch
+MEMORY_WRITER_MAX_RETRIES = 3  # Retries per create_event call
+MEMORY_WRITER_BACKOFF_SECONDS = 0.5  # Exponential backoff base
+MEMORY_WRITER_SHUTDOWN_TIMEOUT_SECONDS = 10  # Time allowed to flush pending writes on shutdown
+
+# Attendee Profile Loader Configuration
+# 参会者提供 user id 后直接读取 AgentCore Memory 记录并缓存，写入新对话时缓存失效
+PROFILE_CACHE_MAX_SIZE = 10000  # Maximum number of cached attendee profiles
+PROFILE_CACHE_TTL_SECONDS = 900  # Cached profiles expire after 15 minutes
+PROFILE_MAX_RECORDS = 10  # Long-term memory records included in a profile
+PROFILE_RECENT_TURNS = 3  # Recent conversation turns included in a profile
+
+# Memory Hook Configuration
+MEMORY_HOOK_RETRIEVAL_WORKERS = 8  # Threads used to query memory namespaces concurrently
+MEMORY_HOOK_CACHE_SIZE = 256  # Cached (namespace, query) retrievals per session
+MEMORY_HOOK_CACHE_TTL_SECONDS = 300  # Retrieval results are reused for 5 minutes
+
+# Conversation History Configuration
+# 会话历史只保留最近的消息窗口，更早的消息压缩为滚动摘要注入系统提示词，长会话的提示词和内存保持稳定
+HISTORY_WINDOW_RECORDS = 20  # Messages kept verbatim in the supervisor history store
+HISTORY_SUMMARY_MAX_CHARS = 2000  # Size cap of the rolling summary of evicted messages
+HISTORY_SUMMARY_SNIPPET_CHARS = 120  # Characters of each evicted message kept in the summary
+HISTORY_WINDOW_MESSAGES = 20  # Strands agent messages (incl. tool use/results) kept per session; trimmed ones feed the summary
+
+# Intent Router Configuration
+# 规则预路由：单一领域且置信度足够的问题直接交给专业 Agent，其余交给 Supervisor LLM
+INTENT_ROUTER_MODE = "on"  # "on": dispatch confident prompts; "shadow": classify only, compare with LLM routing; "off"
+INTENT_ROUTER_MIN_CONFIDENCE = 0.75  # One strong keyword (or two weak ones) scores 1.0, a single weak keyword 0.5
+INTENT_ROUTER_MIN_DOMAIN_SCORE = 2  # Every domain of a multi-domain fan-out needs this score (one strong keyword)
+
+# Specialist Fan-out Configuration
+# 同时涉及多个领域的问题（如天气 + 餐厅）并发调用各专业 Agent，再合并回复
+FANOUT_ENABLED = True
+FANOUT_MAX_WORKERS = 16  # Specialist branches running at once across all turns
+FANOUT_ABANDONED_HEADROOM = 16  # Extra threads for branches that missed the deadline but are still running
+FANOUT_BRANCH_TIMEOUT_SECONDS = 30  # Branches still running after this are reported as unavailable
+
+# Response Cache Configuration
+# 未识别参会者身份的常见问题（天气、附近美食、keynote 时间）直接复用之前的回复
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_MAX_SIZE = 5000  # Maximum number of cached responses
+RESPONSE_CACHE_SIMILARITY_THRESHOLD = 0.9  # Minimum cosine similarity of a near-duplicate prompt
+RESPONSE_CACHE_TTL_SECONDS = {
+    "weather": 600,  # Forecasts change, keep weather answers for 10 minutes
+    "dining": 3600,
+    "session": 21600,  # The session catalog rarely changes during the day
+    "off_topic": 86400,
+    "general": 1800,  # Prompts the router could not classify
+}
+
+# Session Catalog & Itinerary Planner Configuration
+# 议程目录与会场间步行时间，行程规划器据此生成无冲突、考虑步行时间的议程
+SESSION_CATALOG_PATH = "config/sessions.csv"
+VENUE_WALKING_PATH = "config/venue_walking_minutes.csv"
+DEFAULT_WALKING_MINUTES = 30  # Walking time for venue pairs missing from the table
+ITINERARY_MIN_BREAK_MINUTES = 0  # Extra break required between sessions on top of walking time
+ITINERARY_WEIGHTS = {
+    "registered": 100,  # Sessions the attendee already registered for
+    "keynote": 30,
+    "interest": 10,  # Session track matches one of the attendee's interests
+    "level_match": 3,  # Interest session at or above the requested level
+}
+
+# Attendee Directory Configuration
+# 参会者资料（兴趣、饮食偏好、已注册 session）从 CSV 加载到内存索引，文件更新后自动重新加载
+ATTENDEE_DIRECTORY_PATH = "config/attendees.csv"
+ATTENDEE_DIRECTORY_CHECK_SECONDS = 5  # Minimum interval between file modification checks
+
+# Metrics Configuration
+# 每个 agent 的调用耗时、模型延迟、token 用量和工具耗时，通过 /metrics 以 Prometheus 格式导出
+METRICS_ENABLED = True
+METRICS_IN_RESPONSE = True  # Attach the per-turn breakdown to each response
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)  # Seconds
+
+# Tracing Configuration
+# OpenTelemetry span 写入本地 JSONL 文件或标准输出，无需外部 collector；python -m tools.tracing 查看瀑布图
+TRACING_EXPORTER = "none"  # "file", "console" or "none"; "file" appends to TRACING_FILE_PATH without rotation, use for local debugging
+TRACING_FILE_PATH = "traces.jsonl"
+TRACING_MAX_ATTRIBUTE_CHARS = 500  # Longer span attributes are truncated on export
+
+# Logging Configuration
+# 日志记录经内存队列由后台线程格式化并写出（JSON 或文本），请求线程不做格式化和 I/O
+LOG_LEVEL = "INFO"
+LOG_FORMAT = "json"  # "json" or "text"
+LOG_QUEUE_SIZE = 10000  # Records beyond this are dropped instead of blocking the request thread
+LOG_FIELD_MAX_CHARS = 2000  # Longer messages and fields are truncated
+LOG_PAYLOAD_SAMPLE_RATE = 0.01  # Fraction of log_payload() calls (prompts, agent results, KB responses) that are logged
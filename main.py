@@ -1,14 +1,35 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import PlainTextResponse
+from fastapi import FastAPI, HTTPException, Header
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime, timezone
+from contextlib import asynccontextmanager, AsyncExitStack
 from strands import Agent
 from agents.supervisor import SupervisorAgent
+from agents.weather_agent import prewarm_forecasts
+from agents.dining_agent import poi_refresher
+from tools.attendee_directory import attendee_directory
+from agents.intent_router import router_metrics
+from tools.session_registry import SessionRegistry
+from tools.turn_executor import TurnExecutor, TurnRejectedError
+from tools import http_client
+from tools.kb_retrieval import invalidate_kb_cache, kb_cache_stats
+from tools.response_cache import response_cache
+from tools.model_registry import model_registry
+from tools.metrics import metrics_registry
+from tools.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+from tools.agentcore_memory import memory_writer
+from config.bedrock_config import (
+    MAX_ACTIVE_SESSIONS,
+    SESSION_IDLE_TTL_SECONDS,
+    SESSION_EVICTION_INTERVAL_SECONDS,
+    AGENT_MAX_CONCURRENT_TURNS,
+    AGENT_TURN_QUEUE_TIMEOUT_SECONDS,
+    MEMORY_WRITER_SHUTDOWN_TIMEOUT_SECONDS,
+)
+import json
 import random
 
-app = FastAPI(title="re:Invent Attendee Guide Agent Server", version="1.0.0")
-
 # Initialize Strands agent
 # strands_agent = Agent()
 
@@ -21,13 +42,79 @@ class InvocationResponse(BaseModel):
     output: Dict[str, Any]
 
 
-# initialize Agent
-session_id = str(random.randint(100000000, 999999999))
-attendee_guide_agent = SupervisorAgent(session_id=f"session_{session_id}")
+# 每个会话独立的 SupervisorAgent，按需创建，LRU + 空闲超时回收
+session_registry = SessionRegistry(
+    factory=lambda session_id: SupervisorAgent(session_id=f"session_{session_id}"),
+    max_sessions=MAX_ACTIVE_SESSIONS,
+    idle_ttl_seconds=SESSION_IDLE_TTL_SECONDS,
+)
+
+# Agent 调用是同步阻塞的，统一放到有界线程池执行
+turn_executor = TurnExecutor(
+    max_concurrent_turns=AGENT_MAX_CONCURRENT_TURNS,
+    queue_timeout_seconds=AGENT_TURN_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 后台预热会场城市的天气预报，高峰期天气问题直接命中缓存
+    prewarm_forecasts()
+    # 加载会场周边餐厅索引并启动后台增量刷新
+    poi_refresher.start()
+    # 启动时加载参会者目录，请求路径上不做冷加载
+    attendee_directory.load()
+    # 定期回收空闲会话，不依赖新会话创建时顺带驱逐
+    session_registry.start_eviction(SESSION_EVICTION_INTERVAL_SECONDS)
+    yield
+    session_registry.stop_eviction()
+    poi_refresher.stop()
+    turn_executor.shutdown(wait=True)
+    # 退出前把队列中尚未写入的记忆刷到 AgentCore Memory
+    memory_writer.shutdown(timeout=MEMORY_WRITER_SHUTDOWN_TIMEOUT_SECONDS)
+    http_client.close()
+    await http_client.aclose()
+    shutdown_tracing()
+
+
+# 本地导出 span：请求 → supervisor → 专家 agent → 外部调用 同属一个 trace
+setup_tracing()
+
+app = FastAPI(
+    title="re:Invent Attendee Guide Agent Server", version="1.0.0", lifespan=lifespan
+)
+app.add_middleware(TracingMiddleware)
+
+
+def resolve_session_id(
+    request: InvocationRequest, runtime_session_id: Optional[str] = None
+) -> str:
+    """
+    Pick the session key for a request.
+
+    Priority: input.session_id, input.user_id, the AgentCore runtime session
+    header, and finally a freshly generated id for anonymous one-off calls.
+    """
+    for key in ("session_id", "user_id"):
+        value = request.input.get(key)
+        if value:
+            return str(value)
+    if runtime_session_id:
+        return runtime_session_id
+    return str(random.randint(100000000, 999999999))
+
+
+def run_turn(session_id: str, user_message: str) -> Dict[str, Any]:
+    """Run one agent turn for a session; executed in the turn executor."""
+    with session_registry.session(session_id) as attendee_guide_agent:
+        return attendee_guide_agent.process_message(user_message)
 
 
 @app.post("/invocations", response_model=InvocationResponse)
-async def invoke_agent(request: InvocationRequest):
+async def invoke_agent(
+    request: InvocationRequest,
+    x_amzn_bedrock_agentcore_runtime_session_id: Optional[str] = Header(None),
+):
     try:
         user_message = request.input.get("prompt", "")
         if not user_message:
@@ -36,15 +123,23 @@ async def invoke_agent(request: InvocationRequest):
                 detail="No prompt found in input. Please provide a 'prompt' key in the input.",
             )
 
-        result = attendee_guide_agent.process_message(user_message)
+        session_id = resolve_session_id(
+            request, x_amzn_bedrock_agentcore_runtime_session_id
+        )
+        result = await turn_executor.run(run_turn, session_id, user_message)
         response = {
             "message": result,
+            "session_id": session_id,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "model": "strands-agent",
         }
 
         return InvocationResponse(output=response)
 
+    except HTTPException:
+        raise
+    except TurnRejectedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Agent processing failed: {str(e)}"
@@ -52,14 +147,17 @@ async def invoke_agent(request: InvocationRequest):
 
 
 @app.post("/invocations/markdown", response_class=PlainTextResponse)
-async def invoke_agent_markdown(request: InvocationRequest):
+async def invoke_agent_markdown(
+    request: InvocationRequest,
+    x_amzn_bedrock_agentcore_runtime_session_id: Optional[str] = Header(None),
+):
     """
     返回 Markdown 格式的响应，可直接保存为 .md 文件
     
     使用示例:
     curl -X POST http://your-api/invocations/markdown \
     -H "Content-Type: application/json" \
-    -d '{"input": {"prompt": "你的问题"}}' \
+    -d '{"input": {"prompt": "你的问题", "session_id": "attendee-123"}}' \
     -o plan.md
     """
     try:
@@ -70,18 +168,91 @@ async def invoke_agent_markdown(request: InvocationRequest):
                 detail="No prompt found in input. Please provide a 'prompt' key in the input.",
             )
 
-        result = attendee_guide_agent.process_message(user_message)
+        session_id = resolve_session_id(
+            request, x_amzn_bedrock_agentcore_runtime_session_id
+        )
+        result = await turn_executor.run(run_turn, session_id, user_message)
         
         # 格式化为 Markdown
         markdown_content = format_response_to_markdown(result, user_message)
         
         return markdown_content
 
+    except HTTPException:
+        raise
+    except TurnRejectedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Agent processing failed: {str(e)}"
+        )
+
+
+@app.post("/invocations/stream")
+async def invoke_agent_stream(
+    request: InvocationRequest,
+    x_amzn_bedrock_agentcore_runtime_session_id: Optional[str] = Header(None),
+):
+    """
+    以 Server-Sent Events 流式返回响应
+
+    事件类型:
+    - session: 本次请求使用的 session_id
+    - token: Supervisor 模型生成的文本片段
+    - tool: Supervisor 路由到的工具 / 专业 Agent
+    - done: 最终响应（与 /invocations 的 message 字段结构相同）
+
+    使用示例:
+    curl -N -X POST http://your-api/invocations/stream \
+    -H "Content-Type: application/json" \
+    -d '{"input": {"prompt": "你的问题", "session_id": "attendee-123"}}'
+    """
+    user_message = request.input.get("prompt", "")
+    if not user_message:
+        raise HTTPException(
+            status_code=400,
+            detail="No prompt found in input. Please provide a 'prompt' key in the input.",
+        )
+
+    session_id = resolve_session_id(
+        request, x_amzn_bedrock_agentcore_runtime_session_id
+    )
+
+    # 在返回响应前占用并发槽位和会话锁，超出并发时直接返回 503
+    stack = AsyncExitStack()
+    try:
+        await stack.enter_async_context(turn_executor.slot())
+        attendee_guide_agent = await stack.enter_async_context(
+            session_registry.session_async(session_id)
+        )
+    except TurnRejectedError as e:
+        await stack.aclose()
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        await stack.aclose()
         raise HTTPException(
             status_code=500, detail=f"Agent processing failed: {str(e)}"
         )
 
+    async def event_stream():
+        try:
+            yield format_sse_event("session", {"session_id": session_id})
+            async for event in attendee_guide_agent.stream_message(user_message):
+                yield format_sse_event(event["event"], event["data"])
+        finally:
+            await stack.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 
 def format_response_to_markdown(result: dict, prompt: str) -> str:
     """将 Agent 响应格式化为 Markdown"""
@@ -130,12 +301,54 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/ping",
+            "metrics": "/metrics",
             "invoke_json": "POST /invocations",
-            "invoke_markdown": "POST /invocations/markdown"
+            "invoke_markdown": "POST /invocations/markdown",
+            "invoke_stream": "POST /invocations/stream"
         }
     }
 
 
+@app.post("/admin/kb/invalidate")
+async def invalidate_knowledge_base_cache():
+    """知识库同步（Ingestion Job 完成）后调用，清空检索缓存"""
+    invalidate_kb_cache()
+    return {"status": "invalidated"}
+
+
+@app.get("/admin/cache/stats")
+async def cache_stats():
+    """回复缓存与知识库检索缓存的命中情况"""
+    return {"response_cache": response_cache.stats(), "kb_cache": kb_cache_stats()}
+
+
+@app.post("/admin/cache/invalidate")
+async def invalidate_response_cache():
+    """会议信息（议程、场馆）更新后调用，清空回复缓存"""
+    response_cache.clear()
+    return {"status": "invalidated"}
+
+
+@app.get("/admin/router/stats")
+async def intent_router_stats():
+    """预路由命中率、路由准确率和节省的延迟"""
+    return router_metrics.stats()
+
+
+@app.get("/admin/models/stats")
+async def model_tier_stats():
+    """各模型层级的调用次数、平均延迟、token 用量和升级次数"""
+    return model_registry.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 格式的各 agent 调用耗时、模型延迟、token 用量和工具耗时"""
+    return PlainTextResponse(
+        metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/ping")
 async def ping():
     return {"status": "healthy"}
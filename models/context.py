@@ -1,9 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from enum import Enum
 import random
 import string
 
+from models.history import ConversationHistory
+
 class OrderStatus(str, Enum):
     NEED_PAY='need_pay'
     SHIPPED='shipped'
@@ -13,12 +15,14 @@ class OrderStatus(str, Enum):
 
 class CustomerServiceAgentContext(BaseModel):
     """Context for airline customer service agents."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     customer_name: Optional[str] = None
     customer_id: Optional[int] = None
     order_number: Optional[str] = None
     #status: created, pending, deliverying, complete, close
     status: Optional[OrderStatus] = None
-    descriptions: Optional[List[Dict[str,Any]]] = []
+    descriptions: ConversationHistory = Field(default_factory=ConversationHistory)
 
     def update_descriptions(self, message: Dict[str,Any]):
         self.descriptions.append(message)
@@ -0,0 +1,118 @@
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, NamedTuple, Union
+import time
+
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+
+from config.bedrock_config import (
+    HISTORY_WINDOW_RECORDS,
+    HISTORY_SUMMARY_MAX_CHARS,
+    HISTORY_SUMMARY_SNIPPET_CHARS,
+)
+
+
+class HistoryRecord(NamedTuple):
+    """One conversation message; tuple-backed so each record is a single small object."""
+    role: str
+    content: str
+    timestamp: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class ConversationHistory:
+    """
+    Sliding window of recent messages plus a rolling summary of older ones.
+
+    The summary is fed by SummarizingConversationManager with the messages
+    it trims from the agent's prompt, so it starts exactly where the
+    model's context ends. Each trimmed message becomes a short snippet;
+    the summary keeps only its newest lines once it exceeds
+    summary_max_chars, so memory and prompt size stay flat however long
+    the session runs. Records beyond the verbatim window are dropped.
+
+    Args:
+        window: Maximum number of records kept verbatim
+        summary_max_chars: Size cap of the rolling summary
+        snippet_chars: Characters of each evicted message kept in the summary
+    """
+
+    def __init__(
+        self,
+        window: int = HISTORY_WINDOW_RECORDS,
+        summary_max_chars: int = HISTORY_SUMMARY_MAX_CHARS,
+        snippet_chars: int = HISTORY_SUMMARY_SNIPPET_CHARS,
+    ):
+        self.window = window
+        self.summary_max_chars = summary_max_chars
+        self.snippet_chars = snippet_chars
+        self._records: Deque[HistoryRecord] = deque()
+        self._summary_lines: Deque[str] = deque()
+        self._summary_chars = 0
+        self.evicted_count = 0
+
+    def append(self, message: Union[HistoryRecord, Dict[str, Any]]) -> None:
+        if not isinstance(message, HistoryRecord):
+            message = HistoryRecord(
+                message["role"], message["content"], message.get("timestamp", time.time())
+            )
+        self._records.append(message)
+        while len(self._records) > self.window:
+            self._records.popleft()
+
+    def summarize_message(self, message: Dict[str, Any]) -> None:
+        """Add a strands message dropped from the agent's context to the summary."""
+        # 只保留文本内容，toolUse/toolResult 不进入摘要
+        text = " ".join(block["text"] for block in message.get("content", []) if "text" in block)
+        if text.strip():
+            self._summarize(message["role"], text)
+
+    def _summarize(self, role: str, content: str) -> None:
+        speaker = "参会者" if role == "user" else "助手"
+        text = " ".join(content.split())
+        if len(text) > self.snippet_chars:
+            text = text[: self.snippet_chars] + "…"
+        line = f"- {speaker}: {text}"
+        self._summary_lines.append(line)
+        self._summary_chars += len(line) + 1
+        while self._summary_chars > self.summary_max_chars and len(self._summary_lines) > 1:
+            self._summary_chars -= len(self._summary_lines.popleft()) + 1
+        self.evicted_count += 1
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(self._summary_lines)
+
+    def __iter__(self) -> Iterator[HistoryRecord]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index: int) -> HistoryRecord:
+        return self._records[index]
+
+
+class SummarizingConversationManager(SlidingWindowConversationManager):
+    """
+    Strands sliding window that hands every message it trims to a
+    ConversationHistory, so the rolling summary covers exactly what left
+    the model's prompt (tool use/result messages included in the count).
+
+    Args:
+        history: History whose summary receives the trimmed messages
+        window_size: Maximum number of agent messages kept
+    """
+
+    def __init__(self, history: ConversationHistory, window_size: int, **kwargs: Any):
+        super().__init__(window_size=window_size, **kwargs)
+        self.history = history
+
+    def reduce_context(self, agent: Any, e: Exception = None, **kwargs: Any) -> None:
+        before = list(agent.messages)
+        super().reduce_context(agent, e, **kwargs)
+        kept = {id(message) for message in agent.messages}
+        for message in before:
+            if id(message) not in kept:
+                self.history.summarize_message(message)
@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+
+from tools.attendee_directory import AttendeeDirectory
+
+HEADER = "user_id,name,company,interests,dietary_preferences,registered_sessions\n"
+
+
+def write_csv(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        for row in rows:
+            f.write(",".join(row) + "\n")
+
+
+def slow_loads(directory, seconds):
+    load = directory._load
+
+    def slow(mtime_ns):
+        time.sleep(seconds)
+        return load(mtime_ns)
+
+    directory._load = slow
+
+
+def test_concurrent_callers_wait_for_the_cold_load(tmp_path):
+    path = tmp_path / "attendees.csv"
+    write_csv(path, [("user001", "Alice", "Acme", "AI/ML", "素食", "AIM301")])
+    directory = AttendeeDirectory(str(path), check_interval_seconds=60)
+    slow_loads(directory, 0.2)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(directory.get("user001"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert [attendee.name for attendee in results] == ["Alice"] * 4
+    assert directory.reloads == 1
+
+
+def test_hot_reload_runs_in_the_background(tmp_path):
+    path = tmp_path / "attendees.csv"
+    write_csv(path, [("user001", "Alice", "Acme", "AI/ML", "", "")])
+    directory = AttendeeDirectory(str(path), check_interval_seconds=60)
+    directory.load()
+    assert directory.get("user002") is None
+
+    write_csv(path, [("user001", "Alice", "Acme", "AI/ML", "", ""), ("user002", "Bob", "Initech", "", "", "")])
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+    slow_loads(directory, 0.3)
+    directory._next_check = 0.0
+
+    start = time.perf_counter()
+    # 触发检查的调用立即返回旧快照，不等待重新加载
+    assert directory.get("user002") is None
+    assert time.perf_counter() - start < 0.1
+    deadline = time.monotonic() + 5
+    while directory.get("user002") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert directory.get("user002").name == "Bob"
+    assert directory.get("user001").name == "Alice"
+
+
+def test_missing_file_leaves_directory_empty(tmp_path):
+    directory = AttendeeDirectory(str(tmp_path / "missing.csv"), check_interval_seconds=60)
+    directory.load()
+    assert directory.get("user001") is None
+    assert len(directory) == 0
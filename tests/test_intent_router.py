@@ -0,0 +1,102 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from agents.intent_router import DINING, OFF_TOPIC, SESSION, WEATHER, IntentRouter
+
+router = IntentRouter()
+
+SCENARIOS = {
+    scenario["name"]: scenario["turns"]
+    for scenario in json.loads(
+        (Path(__file__).parent.parent / "benchmarks" / "fixtures" / "scenarios.json").read_text("utf-8")
+    )
+}
+
+
+@pytest.mark.parametrize(
+    "prompt, intent",
+    [
+        ("今天拉斯维加斯天气如何？", WEATHER),
+        ("re:Invent 期间需要带外套吗", WEATHER),
+        ("What's the weather forecast for Las Vegas this week?", WEATHER),
+        ("Should I bring an umbrella on Wednesday?", WEATHER),
+        ("Venetian 附近有什么餐厅推荐？", DINING),
+        ("晚饭想吃火锅", DINING),
+        ("Any good restaurants near Caesars Forum?", DINING),
+        ("Where can I grab a bite after the show?", DINING),
+        ("帮我规划一下周二的日程", SESSION),
+        ("有哪些关于生成式 AI 的工作坊", SESSION),
+        ("Which sessions cover serverless on Tuesday?", SESSION),
+        ("Tell me about AIM301", SESSION),
+        ("给我讲个笑话", OFF_TOPIC),
+        ("帮我写一首关于大海的诗", OFF_TOPIC),
+        ("写一篇关于春天的小故事", OFF_TOPIC),
+        ("帮我写几句歌词", OFF_TOPIC),
+        ("Write me a poem about the desert", OFF_TOPIC),
+        ("Tell me a short story about robots", OFF_TOPIC),
+        ("Can you write a song about Vegas?", OFF_TOPIC),
+    ],
+)
+def test_single_domain_prompt_takes_fast_path(prompt, intent):
+    decision = router.route(prompt)
+    assert decision.intent == intent
+    assert decision.fallback_reason is None
+
+
+def test_off_topic_benchmark_scenario_takes_fast_path():
+    (prompt,) = SCENARIOS["off_topic"]
+    decision = router.route(prompt)
+    assert (decision.intent, decision.fallback_reason) == (OFF_TOPIC, None)
+
+
+@pytest.mark.parametrize(
+    "prompt, reason",
+    [
+        ("我的 user id 是 user001，帮我推荐餐厅", "context"),
+        ("那明天的天气呢？", "context"),
+        ("What about the weather tomorrow?", "context"),
+        ("你还记得我上次问的餐厅吗", "context"),
+        ("你好", "no_match"),
+        ("我的 user id 是 user001", "no_match"),
+        ("晴", "low_confidence"),
+    ],
+)
+def test_prompt_falls_back_to_llm(prompt, reason):
+    assert router.route(prompt).fallback_reason == reason
+
+
+def test_weather_and_dining_prompt_fans_out():
+    decision = router.route(
+        "what's the weather and where should I eat near the Venetian on Tuesday"
+    )
+    assert decision.domains == (WEATHER, DINING)
+    assert decision.fallback_reason == "multi_domain"
+
+
+def test_session_code_is_case_sensitive():
+    assert router.route("Tell me about AIM301").domains == (SESSION,)
+    assert router.route("my badge is abc123").domains == ()
+
+
+@pytest.mark.parametrize(
+    "prompt, intent",
+    [
+        ("temperature of the keynote room", WEATHER),
+        ("Where to eat near the keynote?", DINING),
+        ("主题演讲会场附近有什么餐厅", DINING),
+    ],
+)
+def test_venue_mention_does_not_fan_out(prompt, intent):
+    decision = router.route(prompt)
+    assert decision.domains == (intent,)
+    assert (decision.intent, decision.fallback_reason) == (intent, None)
+
+
+def test_fan_out_needs_strong_evidence_in_every_domain():
+    # 单个弱关键词（"cold"）不足以把议程问题拆成两个专家
+    assert router.route("Which sessions are indoors in case it is cold?").domains == (SESSION,)
+    decision = router.route("天气怎么样，还有周二的 keynote 几点开始")
+    assert decision.domains == (WEATHER, SESSION)
+    assert decision.fallback_reason == "multi_domain"
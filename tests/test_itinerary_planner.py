@@ -0,0 +1,79 @@
+import itertools
+import random
+
+import pytest
+
+from tools.itinerary_planner import plan_itinerary, session_weight
+from tools.session_catalog import Session, SessionCatalog, WalkingTimes
+
+TRACKS = ["AI/ML", "Serverless", "Database", "Keynote"]
+VENUES = ["Venetian", "Caesars Forum", "Wynn", "MGM Grand"]
+BREAK_MINUTES = 5
+
+
+def random_case(seed):
+    rng = random.Random(seed)
+    sessions = []
+    for i in range(rng.randint(1, 10)):
+        start = rng.randrange(2) * 1440 + 8 * 60 + rng.randrange(0, 8 * 60, 15)
+        sessions.append(
+            Session(
+                session_id=f"S{i:03d}",
+                title=f"Session {i}",
+                session_type="Breakout",
+                track=rng.choice(TRACKS),
+                level=rng.choice([100, 200, 300, 400]),
+                venue=rng.choice(VENUES),
+                start=start,
+                end=start + rng.choice([30, 60, 120]),
+            )
+        )
+    walking = WalkingTimes(
+        [(a, b, rng.randint(5, 40)) for a, b in itertools.combinations(VENUES, 2)],
+        default_minutes=30,
+    )
+    interests = rng.sample(["AI/ML", "Serverless", "Database"], rng.randint(0, 2))
+    registered = [s.session_id for s in sessions if rng.random() < 0.3]
+    min_level = rng.choice([None, 200, 300])
+    return SessionCatalog(sessions), walking, interests, registered, min_level
+
+
+def feasible(chosen, walking):
+    ordered = sorted(chosen, key=lambda s: s.end)
+    return all(
+        a.end + walking.minutes(a.venue, b.venue) + BREAK_MINUTES <= b.start
+        for a, b in zip(ordered, ordered[1:])
+    )
+
+
+def brute_force_score(catalog, walking, interests, registered, min_level):
+    interest_set = {i.lower() for i in interests}
+    weights = {
+        s.session_id: session_weight(s, interest_set, set(registered), min_level)
+        for s in catalog.sessions
+    }
+    candidates = [s for s in catalog.sessions if weights[s.session_id] > 0]
+    best = 0.0
+    for size in range(1, len(candidates) + 1):
+        for chosen in itertools.combinations(candidates, size):
+            if feasible(chosen, walking):
+                best = max(best, sum(weights[s.session_id] for s in chosen))
+    return best
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_plan_matches_brute_force(seed):
+    catalog, walking, interests, registered, min_level = random_case(seed)
+    itinerary = plan_itinerary(
+        catalog,
+        walking,
+        interests=interests,
+        registered_sessions=registered,
+        min_level=min_level,
+        min_break_minutes=BREAK_MINUTES,
+    )
+    chosen = [p.session for p in itinerary.sessions]
+    assert feasible(chosen, walking)
+    assert itinerary.score == pytest.approx(
+        brute_force_score(catalog, walking, interests, registered, min_level)
+    )
@@ -0,0 +1,48 @@
+import pytest
+
+from tools.response_cache import ResponseCache, extract_context
+
+
+@pytest.mark.parametrize(
+    "cached, asked, domain",
+    [
+        (
+            "请问 AIM301 这个分会场在哪个酒店举行，几点开始？",
+            "请问 AIM402 这个分会场在哪个酒店举行，几点开始？",
+            "session",
+        ),
+        (
+            "拉斯维加斯今天最高气温多少度，需要带外套吗？",
+            "拉斯维加斯今天最低气温多少度，需要带外套吗？",
+            "weather",
+        ),
+        ("Venetian 附近有什么好吃的火锅店？", "Wynn 附近有什么好吃的火锅店？", "dining"),
+        ("推荐 3 家 Venetian 附近的餐厅", "推荐 5 家 Venetian 附近的餐厅", "dining"),
+        (
+            "请推荐 Venetian 附近适合商务宴请、环境安静、价格适中的火锅餐厅",
+            "请推荐 Venetian 附近适合商务宴请、环境安静、价格适中的寿司餐厅",
+            "dining",
+        ),
+        ("Venetian 附近午餐去哪里吃比较好？", "Venetian 附近晚餐去哪里吃比较好？", "dining"),
+        ("Where is the SVS201 session held?", "Where is the SVS305 session held?", "session"),
+    ],
+)
+def test_near_miss_prompt_is_not_served_the_cached_answer(cached, asked, domain):
+    cache = ResponseCache()
+    cache.put(cached, domain, "cached answer")
+    assert cache.get(asked, domain) is None
+    assert cache.get(cached, domain) == "cached answer"
+
+
+def test_reworded_prompt_hits_the_cache():
+    cache = ResponseCache()
+    cache.put("Venetian 附近有什么好吃的餐厅推荐？", "dining", "cached answer")
+    assert cache.get("Venetian 附近有什么好吃的餐厅推荐吗", "dining") == "cached answer"
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_context_includes_session_codes_numbers_and_key_terms():
+    context = extract_context("AIM301 在 Venetian 吗？下午 3 点开始", "session")
+    assert context[-1] == ("AIM301", "3", "afternoon", "venetian")
+    # session code 区分大小写，与意图路由一致
+    assert extract_context("aim301 在哪", "session")[-1] == ("301",)
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from tools import session_registry as registry_module
+from tools.session_registry import SessionRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(registry_module.time, "monotonic", fake)
+    return fake
+
+
+def make_registry(max_sessions=10, idle_ttl_seconds=60):
+    return SessionRegistry(
+        factory=lambda session_id: object(),
+        max_sessions=max_sessions,
+        idle_ttl_seconds=idle_ttl_seconds,
+    )
+
+
+def test_get_returns_same_agent_per_session(clock):
+    registry = make_registry()
+    assert registry.get("a") is registry.get("a")
+    assert registry.get("a") is not registry.get("b")
+    assert registry.stats()["created"] == 2
+
+
+def test_lru_eviction_over_capacity(clock):
+    registry = make_registry(max_sessions=2)
+    registry.get("a")
+    clock.now += 1
+    registry.get("b")
+    clock.now += 1
+    registry.get("a")
+    clock.now += 1
+    registry.get("c")
+    assert registry.remove("b") is None
+    assert len(registry) == 2
+
+
+def test_pinned_session_is_not_evicted(clock):
+    registry = make_registry(max_sessions=1)
+    with registry.session("a") as agent:
+        registry.get("b")
+        # 上限为 1，但 a 正在使用，只能暂时超出上限
+        assert registry.get("a") is agent
+    assert len(registry) == 1
+
+
+def test_evict_idle_drops_expired_sessions(clock):
+    registry = make_registry(idle_ttl_seconds=60)
+    registry.get("a")
+    registry.get("b")
+    clock.now += 30
+    registry.get("b")
+    clock.now += 31
+    registry.evict_idle()
+    assert registry.remove("a") is None
+    assert registry.remove("b") is not None
+
+
+def test_unpin_moves_session_to_most_recent(clock):
+    registry = make_registry(idle_ttl_seconds=60)
+    with registry.session("a"):
+        clock.now += 10
+        registry.get("b")
+        clock.now += 40
+    # a 释放时刷新了 last_used；b 在其后、已过期，不能因为 a 未过期而提前停止扫描
+    clock.now += 21
+    registry.evict_idle()
+    assert registry.remove("b") is None
+    assert registry.remove("a") is not None
+
+
+def test_pinned_expired_session_is_kept(clock):
+    registry = make_registry(idle_ttl_seconds=60)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with registry.session("a"):
+            entered.set()
+            release.wait(5)
+
+    worker = threading.Thread(target=hold)
+    worker.start()
+    entered.wait(5)
+    clock.now += 120
+    registry.evict_idle()
+    assert len(registry) == 1
+    release.set()
+    worker.join(5)
+
+
+def test_background_eviction(monkeypatch):
+    registry = make_registry(idle_ttl_seconds=0)
+    registry.get("a")
+    evicted = threading.Event()
+    original = registry.evict_idle
+
+    def evict_idle():
+        original()
+        evicted.set()
+
+    monkeypatch.setattr(registry, "evict_idle", evict_idle)
+    registry.start_eviction(0.01)
+    try:
+        assert evicted.wait(5)
+    finally:
+        registry.stop_eviction()
+    assert len(registry) == 0
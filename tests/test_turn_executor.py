@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+import pytest
+
+from tools.turn_executor import TurnExecutor, TurnRejectedError
+
+
+def test_cancelled_turn_keeps_its_slot_until_the_worker_finishes():
+    started = threading.Event()
+    finish = threading.Event()
+
+    def blocking_turn():
+        started.set()
+        finish.wait(5)
+        return "done"
+
+    async def scenario():
+        executor = TurnExecutor(max_concurrent_turns=1, queue_timeout_seconds=0.1)
+        task = asyncio.create_task(executor.run(blocking_turn))
+        await asyncio.to_thread(started.wait, 5)
+        # 模拟客户端断开：await 被取消，但工作线程仍在运行
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert executor.stats()["in_flight"] == 1
+        with pytest.raises(TurnRejectedError):
+            await executor.run(lambda: "next")
+
+        finish.set()
+        for _ in range(100):
+            if executor.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert await executor.run(lambda: "next") == "next"
+        executor.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,93 @@
+"""
+Specialist agent pool - reuses warm Strands agents across delegations
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator
+
+from strands import Agent
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AgentPool:
+    """
+    Keyed pool of idle agents built by a factory.
+
+    Specialist agents are stateless between delegations, so instead of
+    rebuilding an Agent (tool registry, tool spec parsing, model wiring) on
+    every tool call we lease a warm one and clear its message history when
+    it comes back. Each leased agent is used by exactly one caller at a time.
+
+    Args:
+        factory: Builds a new agent; called with the lease key arguments
+        max_idle_per_key: Idle agents kept for each key
+        max_keys: Distinct keys kept; least recently used keys are dropped
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., Agent],
+        max_idle_per_key: int = 8,
+        max_keys: int = 512,
+    ):
+        self._factory = factory
+        self._max_idle_per_key = max_idle_per_key
+        self._max_keys = max_keys
+        self._idle: "OrderedDict[tuple[Hashable, ...], list[Agent]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._reused = 0
+
+    def _acquire(self, key: tuple[Hashable, ...]) -> Agent:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._idle.move_to_end(key)
+                self._reused += 1
+                return idle.pop()
+            self._created += 1
+        return self._factory(*key)
+
+    def _release(self, key: tuple[Hashable, ...], agent: Agent) -> None:
+        self._reset(agent)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if len(idle) < self._max_idle_per_key:
+                idle.append(agent)
+            while len(self._idle) > self._max_keys:
+                self._idle.popitem(last=False)
+
+    @staticmethod
+    def _reset(agent: Agent) -> None:
+        """Clear per-delegation state so the next caller starts fresh."""
+        agent.messages.clear()
+        conversation_manager = getattr(agent, "conversation_manager", None)
+        if hasattr(conversation_manager, "removed_message_count"):
+            conversation_manager.removed_message_count = 0
+
+    @contextmanager
+    def lease(self, *key: Hashable) -> Iterator[Agent]:
+        """
+        Borrow an agent for one delegation.
+
+        Agents whose invocation raised are discarded instead of returned,
+        since their message list may end in a half-finished tool exchange.
+        """
+        agent = self._acquire(key)
+        try:
+            yield agent
+        except Exception:
+            logger.info("Discarding pooled agent for %s after error", key)
+            raise
+        else:
+            self._release(key, agent)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            idle = sum(len(agents) for agents in self._idle.values())
+        return {"created": self._created, "reused": self._reused, "idle": idle}
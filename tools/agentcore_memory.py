@@ -1,15 +1,200 @@
-from config.bedrock_config import BEDROCK_AGENTCORE_MEMORY_ID, AWS_REGION
+from config.bedrock_config import (
+    BEDROCK_AGENTCORE_MEMORY_ID,
+    AWS_REGION,
+    MEMORY_WRITER_QUEUE_SIZE,
+    MEMORY_WRITER_BATCH_SIZE,
+    MEMORY_WRITER_LINGER_SECONDS,
+    MEMORY_WRITER_MAX_RETRIES,
+    MEMORY_WRITER_BACKOFF_SECONDS,
+)
 from bedrock_agentcore.memory import MemoryClient
-from typing import Tuple, List
+from typing import Callable, Dict, List, Optional, Tuple
+from tools.logger_config import get_logger
+import queue
+import threading
+import time
+
+logger = get_logger(__name__)
+
+Message = Tuple[str, str]
+
+
+class MemoryWriter:
+    """
+    Background writer for AgentCore Memory events.
+
+    Turns are queued and persisted by a single worker thread with one
+    reused MemoryClient, so memory writes are off the response path.
+    Queued messages for the same actor are merged into one create_event
+    call (e.g. a USER/ASSISTANT pair), failed writes are retried with
+    exponential backoff, and anonymous users are skipped.
+
+    Args:
+        memory_id: AgentCore Memory id
+        region: AWS region of the memory
+        max_queue: Maximum queued turns; new turns are dropped when full
+        batch_size: Maximum queued turns drained per batch
+        linger_seconds: Time to wait for more turns before writing a batch
+        max_retries: Retries per create_event call
+        backoff_seconds: Base delay of the exponential backoff
+    """
+
+    def __init__(
+        self,
+        memory_id: str,
+        region: str,
+        max_queue: int,
+        batch_size: int,
+        linger_seconds: float,
+        max_retries: int,
+        backoff_seconds: float,
+    ):
+        self._memory_id = memory_id
+        self._region = region
+        self._queue: "queue.Queue[Tuple[str, List[Message]]]" = queue.Queue(max_queue)
+        self._batch_size = batch_size
+        self._linger = linger_seconds
+        self._max_retries = max_retries
+        self._backoff = backoff_seconds
+        self._client: Optional[MemoryClient] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._listeners: List[Callable[[str], None]] = []
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _get_client(self) -> MemoryClient:
+        if self._client is None:
+            self._client = MemoryClient(region_name=self._region)
+        return self._client
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="memory-writer", daemon=True
+                    )
+                    self._thread.start()
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """Register a callback invoked with the user_id after each successful write."""
+        self._listeners.append(listener)
+
+    def submit(self, user_id: Optional[str], messages: List[Message]) -> bool:
+        """
+        Queue messages for a user without blocking.
+
+        Returns:
+            True if queued, False if skipped (anonymous user) or dropped (queue full)
+        """
+        if not user_id or not messages:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((user_id, messages))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Memory write queue full, dropping turn for user %s", user_id)
+            return False
+
+    def _next_batch(self) -> List[Tuple[str, List[Message]]]:
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self._linger
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, user_id: str, messages: List[Message]) -> None:
+        params = {
+            "memory_id": self._memory_id,
+            "actor_id": f"user_{user_id}",
+            "session_id": f"session_user_{user_id}",
+            "messages": messages,
+        }
+        for attempt in range(self._max_retries + 1):
+            try:
+                self._get_client().create_event(**params)
+                break
+            except Exception as e:
+                if attempt == self._max_retries:
+                    self.failed += 1
+                    logger.error("Memory write failed for user %s: %s", user_id, e)
+                    return
+                time.sleep(self._backoff * (2**attempt))
+        self.written += 1
+        # 监听器在重试循环之外执行，出错不会导致重复写入
+        for listener in self._listeners:
+            try:
+                listener(user_id)
+            except Exception as e:
+                logger.error("Memory write listener failed for user %s: %s", user_id, e)
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            # 按参会者合并，保持消息原有顺序，每个参会者一次 create_event
+            by_actor: Dict[str, List[Message]] = {}
+            for user_id, messages in batch:
+                by_actor.setdefault(user_id, []).extend(messages)
+            try:
+                for user_id, messages in by_actor.items():
+                    self._write(user_id, messages)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until queued turns are written; returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Flush pending turns and stop the worker thread."""
+        flushed = self.flush(timeout)
+        if not flushed:
+            logger.warning("Memory writer shutdown with %d turns unwritten", self._queue.qsize())
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+
+memory_writer = MemoryWriter(
+    memory_id=BEDROCK_AGENTCORE_MEMORY_ID,
+    region=AWS_REGION,
+    max_queue=MEMORY_WRITER_QUEUE_SIZE,
+    batch_size=MEMORY_WRITER_BATCH_SIZE,
+    linger_seconds=MEMORY_WRITER_LINGER_SECONDS,
+    max_retries=MEMORY_WRITER_MAX_RETRIES,
+    backoff_seconds=MEMORY_WRITER_BACKOFF_SECONDS,
+)
 
 
 def update_memory(user_id: str, message: Tuple[str, str]) -> None:
-    params = {
-        "memory_id": BEDROCK_AGENTCORE_MEMORY_ID,
-        "actor_id": f"user_{user_id}",
-        "session_id": f"session_user_{user_id}",
-        "messages": [message],
-    }
-
-    memory_client = MemoryClient(region_name=AWS_REGION)
-    response = memory_client.create_event(**params)
+    """Queue a single (text, role) message for the user's memory."""
+    memory_writer.submit(user_id, [message])
+
+
+def record_turn(user_id: str, user_message: str, assistant_message: str) -> None:
+    """Queue a USER/ASSISTANT pair; it is persisted as one memory event."""
+    memory_writer.submit(
+        user_id, [(user_message, "USER"), (assistant_message, "ASSISTANT")]
+    )
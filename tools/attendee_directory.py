@@ -0,0 +1,236 @@
+"""
+Attendee directory - indexed, hot-reloaded attendee profiles from config/attendees.csv
+
+Profiles are held as tuples of interned strings; interests, registered
+sessions and dietary preferences have inverted indexes of row numbers.
+The first load happens eagerly at startup (load()); callers arriving before
+it has finished wait for it instead of seeing an empty directory. After
+that the file's mtime is checked at most every
+ATTENDEE_DIRECTORY_CHECK_SECONDS and a changed file is loaded by a
+background thread into a new snapshot that replaces the old one
+atomically, so readers never wait on a reload or see a half-built index.
+"""
+
+import csv
+import os
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from config.bedrock_config import ATTENDEE_DIRECTORY_PATH, ATTENDEE_DIRECTORY_CHECK_SECONDS
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+NO_DIETARY_REQUIREMENT = "无特殊要求"
+
+
+class Attendee(NamedTuple):
+    user_id: str
+    name: str
+    company: str
+    interests: Tuple[str, ...]
+    dietary_preference: str
+    registered_sessions: Tuple[str, ...]
+
+    @property
+    def has_dietary_requirement(self) -> bool:
+        return bool(self.dietary_preference) and self.dietary_preference != NO_DIETARY_REQUIREMENT
+
+
+class _TuplePool:
+    """Split ";"-separated fields into interned tuples, sharing identical tuples."""
+
+    def __init__(self, upper: bool = False):
+        self._upper = upper
+        self._tuples: Dict[str, Tuple[str, ...]] = {}
+
+    def __call__(self, value: str) -> Tuple[str, ...]:
+        result = self._tuples.get(value)
+        if result is None:
+            text = value.upper() if self._upper else value
+            result = tuple(sys.intern(item.strip()) for item in text.split(";") if item.strip())
+            self._tuples[value] = result
+        return result
+
+
+class _Snapshot:
+    __slots__ = ("attendees", "by_id", "by_interest", "by_session", "by_diet", "mtime_ns")
+
+    def __init__(self, attendees: List[Attendee], mtime_ns: int):
+        self.attendees = attendees
+        self.mtime_ns = mtime_ns
+        self.by_id: Dict[str, int] = {}
+        self.by_interest: Dict[str, array] = {}
+        self.by_session: Dict[str, array] = {}
+        self.by_diet: Dict[str, array] = {}
+        for row, attendee in enumerate(attendees):
+            self.by_id[attendee.user_id] = row
+            for interest in attendee.interests:
+                self.by_interest.setdefault(interest.lower(), array("I")).append(row)
+            for session_id in attendee.registered_sessions:
+                self.by_session.setdefault(session_id, array("I")).append(row)
+            if attendee.dietary_preference:
+                self.by_diet.setdefault(attendee.dietary_preference, array("I")).append(row)
+
+
+class AttendeeDirectory:
+    """
+    In-memory attendee store with lookups by user_id, interest, session and diet.
+
+    Args:
+        path: Attendee CSV (user_id,name,company,interests,dietary_preferences,registered_sessions)
+        check_interval_seconds: Minimum time between file modification checks
+    """
+
+    def __init__(self, path: str, check_interval_seconds: float):
+        self._path = path
+        self._check_interval = check_interval_seconds
+        self._snapshot = _Snapshot([], -1)
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._reloading = False
+        self.reloads = 0
+
+    def _load(self, mtime_ns: int) -> _Snapshot:
+        attendees = []
+        split_interests = _TuplePool()
+        split_sessions = _TuplePool(upper=True)
+        with open(self._path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            columns = {name.strip(): i for i, name in enumerate(next(reader, []))}
+            if "user_id" not in columns:
+                raise ValueError(f"{self._path} has no user_id column")
+            # 缺失的列读取为空字符串
+            empty = len(columns)
+            user_col, name_col, company_col, interests_col, diet_col, sessions_col = (
+                columns.get(name, empty)
+                for name in (
+                    "user_id",
+                    "name",
+                    "company",
+                    "interests",
+                    "dietary_preferences",
+                    "registered_sessions",
+                )
+            )
+            for row in reader:
+                row.extend([""] * (empty + 1 - len(row)))
+                user_id = row[user_col].strip()
+                if not user_id:
+                    continue
+                attendees.append(
+                    Attendee(
+                        user_id=user_id,
+                        name=row[name_col].strip(),
+                        company=sys.intern(row[company_col].strip()),
+                        interests=split_interests(row[interests_col]),
+                        dietary_preference=sys.intern(row[diet_col].strip()),
+                        registered_sessions=split_sessions(row[sessions_col]),
+                    )
+                )
+        return _Snapshot(attendees, mtime_ns)
+
+    def _reload(self) -> None:
+        """Load the file into a new snapshot if its mtime changed; callers hold _lock."""
+        try:
+            mtime_ns = os.stat(self._path).st_mtime_ns
+            if mtime_ns != self._snapshot.mtime_ns:
+                start = time.perf_counter()
+                self._snapshot = self._load(mtime_ns)
+                self.reloads += 1
+                logger.info(
+                    "Loaded %d attendees from %s in %.1f ms",
+                    len(self._snapshot.attendees),
+                    self._path,
+                    (time.perf_counter() - start) * 1000,
+                )
+        except (OSError, csv.Error, ValueError) as e:
+            # 文件暂时不可读（例如正在被覆盖写入）时继续使用上一份数据
+            logger.error("Error loading attendee directory: %s", e)
+        finally:
+            self._next_check = time.monotonic() + self._check_interval
+
+    def load(self) -> None:
+        """Load the file now unless already loaded; called once at startup."""
+        if self._loaded.is_set():
+            return
+        with self._lock:
+            if not self._loaded.is_set():
+                self._reload()
+                self._loaded.set()
+
+    def _reload_in_background(self) -> None:
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+
+        def run() -> None:
+            try:
+                with self._lock:
+                    self._reload()
+            finally:
+                self._reloading = False
+
+        threading.Thread(target=run, name="attendee-reload", daemon=True).start()
+
+    def _current(self) -> _Snapshot:
+        if not self._loaded.is_set():
+            # 首次加载尚未完成（未经 lifespan 启动，例如脚本和基准测试）时等待加载结束
+            self.load()
+        elif time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self._check_interval
+            self._reload_in_background()
+        return self._snapshot
+
+    def get(self, user_id: Optional[str]) -> Optional[Attendee]:
+        if not user_id:
+            return None
+        snapshot = self._current()
+        row = snapshot.by_id.get(user_id.strip())
+        return None if row is None else snapshot.attendees[row]
+
+    def by_interest(self, interest: str) -> List[Attendee]:
+        snapshot = self._current()
+        return [snapshot.attendees[row] for row in snapshot.by_interest.get(interest.lower(), ())]
+
+    def by_session(self, session_id: str) -> List[Attendee]:
+        snapshot = self._current()
+        return [snapshot.attendees[row] for row in snapshot.by_session.get(session_id.upper(), ())]
+
+    def by_diet(self, dietary_preference: str) -> List[Attendee]:
+        snapshot = self._current()
+        return [snapshot.attendees[row] for row in snapshot.by_diet.get(dietary_preference, ())]
+
+    def __len__(self) -> int:
+        return len(self._current().attendees)
+
+    def stats(self) -> Dict[str, int]:
+        snapshot = self._current()
+        return {
+            "attendees": len(snapshot.attendees),
+            "interests": len(snapshot.by_interest),
+            "sessions": len(snapshot.by_session),
+            "reloads": self.reloads,
+        }
+
+
+def format_attendee_context(attendee: Attendee) -> str:
+    """Format a profile as a short, prompt-ready line."""
+    parts = [f"参会者 {attendee.user_id}（{attendee.name}，{attendee.company}）"]
+    if attendee.interests:
+        parts.append("兴趣领域：" + "、".join(attendee.interests))
+    if attendee.dietary_preference:
+        parts.append("饮食偏好：" + attendee.dietary_preference)
+    if attendee.registered_sessions:
+        parts.append("已注册 session：" + "、".join(attendee.registered_sessions))
+    return "；".join(parts)
+
+
+attendee_directory = AttendeeDirectory(
+    ATTENDEE_DIRECTORY_PATH, check_interval_seconds=ATTENDEE_DIRECTORY_CHECK_SECONDS
+)
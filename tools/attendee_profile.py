@@ -0,0 +1,136 @@
+"""
+Attendee profile loader - reads an attendee's memory records directly from
+AgentCore Memory and formats them without an LLM round trip
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+from bedrock_agentcore.memory import MemoryClient
+
+from config.bedrock_config import (
+    AWS_REGION,
+    BEDROCK_AGENTCORE_MEMORY_ID,
+    PROFILE_CACHE_MAX_SIZE,
+    PROFILE_CACHE_TTL_SECONDS,
+    PROFILE_MAX_RECORDS,
+    PROFILE_RECENT_TURNS,
+)
+from tools.agentcore_memory import memory_writer
+from tools.cache import TTLCache
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+NO_PROFILE_MESSAGE = "没有关于这个参会者的任何信息。"
+PROFILE_QUERY = "参会者的个人信息、兴趣偏好、饮食要求和议程安排"
+MAX_TEXT_CHARS = 200
+
+_profile_cache = TTLCache(
+    maxsize=PROFILE_CACHE_MAX_SIZE, ttl_seconds=PROFILE_CACHE_TTL_SECONDS
+)
+_client: Optional[MemoryClient] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> MemoryClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MemoryClient(region_name=AWS_REGION)
+    return _client
+
+
+def _truncate(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) <= MAX_TEXT_CHARS:
+        return text
+    return text[:MAX_TEXT_CHARS] + "…"
+
+
+def format_profile(
+    user_id: str,
+    records: List[Dict[str, Any]],
+    turns: List[List[Dict[str, Any]]],
+) -> str:
+    """
+    Format memory records and recent turns into a stable, prompt-ready text.
+
+    Args:
+        user_id: Attendee user id
+        records: Long-term memory records from retrieve_memories
+        turns: Recent conversation turns from get_last_k_turns
+
+    Returns:
+        Profile text, or NO_PROFILE_MESSAGE when nothing is stored
+    """
+    facts = []
+    seen = set()
+    for record in records:
+        text = _truncate(record.get("content", {}).get("text", ""))
+        if text and text not in seen:
+            seen.add(text)
+            facts.append(f"- {text}")
+
+    history = []
+    for turn in turns:
+        for message in turn:
+            text = _truncate(message.get("content", {}).get("text", ""))
+            if text:
+                speaker = "助手" if message.get("role") == "ASSISTANT" else "参会者"
+                history.append(f"- {speaker}: {text}")
+
+    if not facts and not history:
+        return NO_PROFILE_MESSAGE
+
+    sections = [f"参会者 {user_id} 的历史信息："]
+    if facts:
+        sections.append("偏好与事实：\n" + "\n".join(facts))
+    if history:
+        sections.append("最近对话：\n" + "\n".join(history))
+    return "\n".join(sections)
+
+
+def load_attendee_profile(user_id: str) -> str:
+    """
+    Load an attendee's stored preferences and recent turns.
+
+    Results are cached per user and invalidated whenever the memory writer
+    persists new events for that user.
+
+    Args:
+        user_id: Attendee user id
+
+    Returns:
+        Formatted profile text
+    """
+    cached = _profile_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    client = _get_client()
+    actor_id = f"user_{user_id}"
+    records = client.retrieve_memories(
+        memory_id=BEDROCK_AGENTCORE_MEMORY_ID,
+        namespace=f"/users/{actor_id}",
+        query=PROFILE_QUERY,
+        top_k=PROFILE_MAX_RECORDS,
+    )
+    turns = client.get_last_k_turns(
+        memory_id=BEDROCK_AGENTCORE_MEMORY_ID,
+        actor_id=actor_id,
+        session_id=f"session_user_{user_id}",
+        k=PROFILE_RECENT_TURNS,
+    )
+    profile = format_profile(user_id, records, turns)
+    _profile_cache.set(user_id, profile)
+    return profile
+
+
+def invalidate_profile(user_id: str) -> None:
+    _profile_cache.invalidate(user_id)
+
+
+# 新的对话写入记忆后，该参会者的缓存画像失效
+memory_writer.add_listener(invalidate_profile)
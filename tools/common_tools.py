@@ -46,7 +46,7 @@ def retrieve_from_kb(query: str, kb_id: str) -> Dict[str, Any]:
 
         return retrieve_response
     except Exception as e:
-        logger.error(f"Error details: {str(e)}")
+        logger.error("Error details: %s", e)
         return {
             "status": "error",
             "message": f"Error retrieving from knowledge base: {str(e)}",
@@ -0,0 +1,144 @@
+"""
+Forecast cache - hour-bucketed weather forecasts with stale-while-revalidate
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from tools.cache import SingleFlight
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+BUCKET_SECONDS = 3600
+
+CoordKey = Tuple[float, float]
+
+
+class _Entry:
+    __slots__ = ("data", "bucket", "fetched_at")
+
+    def __init__(self, data: Dict[str, Any], bucket: int, fetched_at: float):
+        self.data = data
+        self.bucket = bucket
+        self.fetched_at = fetched_at
+
+
+class ForecastCache:
+    """
+    Cache raw forecast payloads per rounded coordinate and hour bucket.
+
+    - An entry is fresh while its hour bucket is the current one.
+    - Within refresh_ahead_seconds of the end of the hour, the next hour's
+      data is fetched in the background while the cached entry is served.
+    - If the upstream fails, an entry up to max_stale_seconds old is served.
+
+    Args:
+        fetch: Callable(latitude, longitude) returning the raw forecast
+        precision: Decimal places used to round coordinates into cache keys
+        refresh_ahead_seconds: Background refresh window before the hour ends
+        max_stale_seconds: Maximum age of data served when the upstream fails
+        maxsize: Maximum number of coordinates kept
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[float, float], Dict[str, Any]],
+        precision: int,
+        refresh_ahead_seconds: float,
+        max_stale_seconds: float,
+        maxsize: int,
+    ):
+        self._fetch = fetch
+        self._precision = precision
+        self._refresh_ahead = refresh_ahead_seconds
+        self._max_stale = max_stale_seconds
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[CoordKey, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = SingleFlight()
+        self._refreshing = set()
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+
+    def _key(self, latitude: float, longitude: float) -> CoordKey:
+        return (round(latitude, self._precision), round(longitude, self._precision))
+
+    def _store(self, key: CoordKey, data: Dict[str, Any], bucket: int) -> None:
+        with self._lock:
+            self._entries[key] = _Entry(data, bucket, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def _load(self, key: CoordKey, bucket: int) -> Dict[str, Any]:
+        def fetch() -> Dict[str, Any]:
+            data = self._fetch(*key)
+            self._store(key, data, bucket)
+            return data
+
+        return self._inflight.do(key, fetch)
+
+    def _refresh_in_background(self, key: CoordKey, bucket: int) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run() -> None:
+            try:
+                self._load(key, bucket)
+            except Exception as e:
+                logger.warning("Background forecast refresh failed for %s: %s", key, e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="forecast-refresh", daemon=True).start()
+
+    def get(self, latitude: float, longitude: float) -> Dict[str, Any]:
+        """Return the forecast payload for a coordinate."""
+        key = self._key(latitude, longitude)
+        now = time.time()
+        current_bucket = int(now // BUCKET_SECONDS)
+
+        with self._lock:
+            entry: Optional[_Entry] = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None and entry.bucket >= current_bucket:
+            self.hits += 1
+            seconds_left = (current_bucket + 1) * BUCKET_SECONDS - now
+            if entry.bucket == current_bucket and seconds_left <= self._refresh_ahead:
+                # 提前刷新下一个小时的数据，整点切换时无需同步等待上游
+                self._refresh_in_background(key, current_bucket + 1)
+            return entry.data
+
+        self.misses += 1
+        try:
+            return self._load(key, current_bucket)
+        except Exception:
+            if entry is not None and now - entry.fetched_at <= self._max_stale:
+                self.stale_served += 1
+                logger.warning(
+                    "Forecast upstream failed, serving data from %ds ago for %s", now - entry.fetched_at, key
+                )
+                return entry.data
+            raise
+
+    def prefetch(self, latitude: float, longitude: float) -> None:
+        """Warm the cache for a coordinate without blocking the caller."""
+        key = self._key(latitude, longitude)
+        self._refresh_in_background(key, int(time.time() // BUCKET_SECONDS))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_served": self.stale_served,
+        }
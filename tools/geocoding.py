@@ -0,0 +1,230 @@
+"""
+Geocoding service - city name to coordinates with a bundled gazetteer and cache
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Optional
+
+from strands import tool
+
+from config.bedrock_config import (
+    GEOCODE_CACHE_MAX_SIZE,
+    GEOCODE_CACHE_TTL_SECONDS,
+    GEOCODE_NOT_FOUND_TTL_SECONDS,
+)
+from tools.cache import SingleFlight, TTLCache
+from tools.http_client import http_get
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+
+# 会议相关城市的离线地名表，命中时无需访问网络
+# 字段与 Open-Meteo Geocoding API (language=zh) 返回的结果保持一致
+GAZETTEER: Dict[str, Dict[str, Any]] = {
+    "las vegas": {
+        "latitude": 36.17497,
+        "longitude": -115.13722,
+        "name": "拉斯维加斯",
+        "country": "美国",
+        "admin1": "内华达州",
+        "population": 641676,
+    },
+    "paradise": {
+        "latitude": 36.09719,
+        "longitude": -115.14666,
+        "name": "帕拉代斯",
+        "country": "美国",
+        "admin1": "内华达州",
+        "population": 223167,
+    },
+    "henderson": {
+        "latitude": 36.0397,
+        "longitude": -114.98194,
+        "name": "亨德森",
+        "country": "美国",
+        "admin1": "内华达州",
+        "population": 310390,
+    },
+    "seattle": {
+        "latitude": 47.60621,
+        "longitude": -122.33207,
+        "name": "西雅图",
+        "country": "美国",
+        "admin1": "华盛顿州",
+        "population": 737015,
+    },
+    "san francisco": {
+        "latitude": 37.77493,
+        "longitude": -122.41942,
+        "name": "旧金山",
+        "country": "美国",
+        "admin1": "加利福尼亚州",
+        "population": 864816,
+    },
+    "los angeles": {
+        "latitude": 34.05223,
+        "longitude": -118.24368,
+        "name": "洛杉矶",
+        "country": "美国",
+        "admin1": "加利福尼亚州",
+        "population": 3971883,
+    },
+    "new york": {
+        "latitude": 40.71427,
+        "longitude": -74.00597,
+        "name": "纽约",
+        "country": "美国",
+        "admin1": "纽约州",
+        "population": 8804190,
+    },
+    "beijing": {
+        "latitude": 39.9075,
+        "longitude": 116.39723,
+        "name": "北京市",
+        "country": "中国",
+        "admin1": "北京市",
+        "population": 18960744,
+    },
+    "shanghai": {
+        "latitude": 31.22222,
+        "longitude": 121.45806,
+        "name": "上海市",
+        "country": "中国",
+        "admin1": "上海市",
+        "population": 24874500,
+    },
+}
+
+GAZETTEER_ALIASES: Dict[str, str] = {
+    "vegas": "las vegas",
+    "lv": "las vegas",
+    "las vegas nv": "las vegas",
+    "las vegas nevada": "las vegas",
+    "拉斯维加斯": "las vegas",
+    "拉斯维加斯市": "las vegas",
+    "拉斯韦加斯": "las vegas",
+    "赌城": "las vegas",
+    "paradise nv": "paradise",
+    "亨德森": "henderson",
+    "西雅图": "seattle",
+    "旧金山": "san francisco",
+    "三藩市": "san francisco",
+    "sf": "san francisco",
+    "洛杉矶": "los angeles",
+    "la": "los angeles",
+    "纽约": "new york",
+    "new york city": "new york",
+    "nyc": "new york",
+    "北京": "beijing",
+    "北京市": "beijing",
+    "上海": "shanghai",
+    "上海市": "shanghai",
+}
+
+_geocode_cache = TTLCache(
+    maxsize=GEOCODE_CACHE_MAX_SIZE, ttl_seconds=GEOCODE_CACHE_TTL_SECONDS
+)
+_inflight = SingleFlight()
+
+
+def normalize_city_name(city: str) -> str:
+    """Normalize a city name for cache and gazetteer lookups."""
+    text = unicodedata.normalize("NFKC", city or "").lower()
+    text = re.sub(r"[,.，。、/]+", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _lookup_gazetteer(key: str) -> Optional[Dict[str, Any]]:
+    entry = GAZETTEER.get(GAZETTEER_ALIASES.get(key, key))
+    if entry is None:
+        return None
+    return {"status": "success", **entry}
+
+
+def _fetch_coordinates(city: str) -> Dict[str, Any]:
+    params = {
+        "name": city,
+        "count": 5,  # Get multiple results to choose the best one
+        "language": "zh",
+        "format": "json",
+    }
+
+    response = http_get(GEOCODING_URL, params=params)
+    response.raise_for_status()
+    data = response.json()
+
+    if not data.get("results"):
+        return {"status": "error", "message": f"未找到城市: {city}"}
+
+    # Sort by population (if available) to get major cities first
+    results = data["results"]
+    results.sort(key=lambda x: x.get("population", 0), reverse=True)
+
+    result = results[0]
+    return {
+        "status": "success",
+        "latitude": result["latitude"],
+        "longitude": result["longitude"],
+        "name": result["name"],
+        "country": result.get("country", ""),
+        "admin1": result.get("admin1", ""),
+        "population": result.get("population", 0),
+    }
+
+
+def geocode_city(city: str) -> Dict[str, Any]:
+    """
+    Resolve a city name to coordinates.
+
+    Lookup order: bundled gazetteer, in-process cache, then the Open-Meteo
+    Geocoding API. Concurrent lookups for the same city share one request.
+
+    Args:
+        city: City name to search for
+
+    Returns:
+        Dictionary containing latitude, longitude, and full location name
+    """
+    key = normalize_city_name(city)
+
+    result = _lookup_gazetteer(key)
+    if result is not None:
+        return result
+
+    cached = _geocode_cache.get(key)
+    if cached is not None:
+        return cached
+
+    def load() -> Dict[str, Any]:
+        result = _fetch_coordinates(city)
+        ttl = (
+            GEOCODE_CACHE_TTL_SECONDS
+            if result["status"] == "success"
+            else GEOCODE_NOT_FOUND_TTL_SECONDS
+        )
+        _geocode_cache.set(key, result, ttl=ttl)
+        return result
+
+    try:
+        return _inflight.do(key, load)
+    except Exception as e:
+        logger.error("Error geocoding city %s: %s", city, e)
+        return {"status": "error", "message": f"获取城市坐标失败: {str(e)}"}
+
+
+@tool
+def get_city_coordinates(city: str) -> dict:
+    """
+    Get coordinates for a city using Open-Meteo Geocoding API (free, no API key required).
+    Prioritizes results with higher population to avoid small towns with same names.
+
+    Args:
+        city: City name to search for
+
+    Returns:
+        Dictionary containing latitude, longitude, and full location name
+    """
+    return geocode_city(city)
@@ -0,0 +1,186 @@
+"""
+Shared HTTP client layer - connection pooling, keep-alive, timeouts and retries
+for the external APIs used by the agents' tools (Open-Meteo, Overpass)
+"""
+
+import asyncio
+import random
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.bedrock_config import (
+    HTTP_BACKOFF_FACTOR,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_READ_TIMEOUT,
+)
+from tools.logger_config import get_logger
+from tools.tracing import client_span, inject_headers, record_response
+
+logger = get_logger(__name__)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+Timeout = Union[float, Tuple[float, float], None]
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        # Overpass 查询是只读的，POST 重试是安全的
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # pool_maxsize 是每个 host 的 keep-alive 连接上限
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled requests session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _timeout(timeout: Timeout) -> Tuple[float, float]:
+    if timeout is None:
+        return (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    if isinstance(timeout, tuple):
+        return timeout
+    return (HTTP_CONNECT_TIMEOUT, timeout)
+
+
+def http_get(
+    url: str, params: Optional[Dict[str, Any]] = None, timeout: Timeout = None
+) -> requests.Response:
+    """
+    GET through the pooled session.
+
+    Args:
+        url: Request URL
+        params: Query parameters
+        timeout: Read timeout in seconds, or a (connect, read) tuple
+
+    Returns:
+        The requests Response (caller decides whether to raise_for_status)
+    """
+    with client_span("GET", url) as span:
+        response = get_session().get(
+            url, params=params, headers=inject_headers(), timeout=_timeout(timeout)
+        )
+        record_response(span, response.status_code)
+        return response
+
+
+def http_post(
+    url: str, data: Optional[Dict[str, Any]] = None, timeout: Timeout = None
+) -> requests.Response:
+    """POST form data through the pooled session."""
+    with client_span("POST", url) as span:
+        response = get_session().post(
+            url, data=data, headers=inject_headers(), timeout=_timeout(timeout)
+        )
+        record_response(span, response.status_code)
+        return response
+
+
+def close() -> None:
+    """Close pooled connections of the sync session."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared httpx.AsyncClient for the async server path."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_CONNECTIONS * HTTP_POOL_MAXSIZE,
+                max_keepalive_connections=HTTP_POOL_MAXSIZE,
+            ),
+            # transport 级重试只覆盖连接失败，状态码重试在 async_request 中处理
+            transport=httpx.AsyncHTTPTransport(retries=HTTP_MAX_RETRIES),
+        )
+    return _async_client
+
+
+async def async_request(
+    method: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    data: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+) -> httpx.Response:
+    """
+    Send a request with the shared async client, retrying retryable status
+    codes with exponential backoff and jitter.
+    """
+    client = get_async_client()
+    kwargs: Dict[str, Any] = {"params": params, "data": data}
+    if timeout is not None:
+        kwargs["timeout"] = httpx.Timeout(timeout, connect=HTTP_CONNECT_TIMEOUT)
+
+    with client_span(method, url) as span:
+        kwargs["headers"] = inject_headers()
+        for attempt in range(HTTP_MAX_RETRIES + 1):
+            response = await client.request(method, url, **kwargs)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == HTTP_MAX_RETRIES:
+                break
+            delay = HTTP_BACKOFF_FACTOR * (2**attempt) * (1 + random.random())
+            logger.info(
+                "Retrying %s %s after HTTP %d in %.2fs", method, url, response.status_code, delay
+            )
+            await asyncio.sleep(delay)
+        span.set_attribute("http.request.resend_count", attempt)
+        record_response(span, response.status_code)
+    return response
+
+
+async def async_get(
+    url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None
+) -> httpx.Response:
+    return await async_request("GET", url, params=params, timeout=timeout)
+
+
+async def async_post(
+    url: str, data: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None
+) -> httpx.Response:
+    return await async_request("POST", url, data=data, timeout=timeout)
+
+
+async def aclose() -> None:
+    """Close the shared async client."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
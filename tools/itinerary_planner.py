@@ -0,0 +1,182 @@
+"""
+Itinerary planner - conflict-free, walking-time-aware session schedules
+
+Weighted interval scheduling over the session catalog. A session can
+follow another only if the attendee can walk between the two venues
+(plus a short break) before it starts. Sessions are processed in end-time
+order; for every venue we keep the end times seen so far with the prefix
+maximum of the best schedule ending there, so the best predecessor of a
+session is one bisect per venue: O(n · venues · log n).
+"""
+
+from bisect import bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from config.bedrock_config import ITINERARY_WEIGHTS, ITINERARY_MIN_BREAK_MINUTES
+from tools.session_catalog import Session, SessionCatalog, WalkingTimes
+
+KEYNOTE_TRACK = "keynote"
+
+
+class PlannedSession(NamedTuple):
+    session: Session
+    walk_minutes: int  # walking time from the previous session's venue, 0 for the first of a day
+    registered: bool
+
+
+class Itinerary(NamedTuple):
+    sessions: List[PlannedSession]
+    dropped_registered: Dict[str, List[str]]  # registered session id → planned ids it conflicts with
+    unknown_sessions: List[str]
+    score: float
+
+    @property
+    def total_walking_minutes(self) -> int:
+        return sum(p.walk_minutes for p in self.sessions)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "itinerary": [
+                {**p.session.to_dict(), "walk_minutes": p.walk_minutes, "registered": p.registered}
+                for p in self.sessions
+            ],
+            "dropped_registered": [
+                {"session_id": sid, "conflicts_with": conflicts}
+                for sid, conflicts in self.dropped_registered.items()
+            ],
+            "unknown_sessions": self.unknown_sessions,
+            "total_walking_minutes": self.total_walking_minutes,
+        }
+
+
+class _VenueChain:
+    """End times of processed sessions at one venue with running best schedule."""
+
+    __slots__ = ("ends", "best", "best_index")
+
+    def __init__(self):
+        self.ends: List[int] = []
+        self.best: List[float] = []
+        self.best_index: List[int] = []
+
+    def add(self, end: int, value: float, index: int) -> None:
+        self.ends.append(end)
+        if self.best and self.best[-1] >= value:
+            self.best.append(self.best[-1])
+            self.best_index.append(self.best_index[-1])
+        else:
+            self.best.append(value)
+            self.best_index.append(index)
+
+
+def session_weight(
+    session: Session,
+    interests: Set[str],
+    registered: Set[str],
+    min_level: Optional[int] = None,
+    weights: Dict[str, float] = ITINERARY_WEIGHTS,
+) -> float:
+    """Score a session for an attendee; 0 means it is not worth attending."""
+    weight = 0.0
+    if session.session_id in registered:
+        weight += weights["registered"]
+    if session.track.lower() == KEYNOTE_TRACK:
+        weight += weights["keynote"]
+    if session.track.lower() in interests:
+        weight += weights["interest"]
+        if min_level is not None and session.level >= min_level:
+            weight += weights["level_match"]
+    return weight
+
+
+def _matches_day(session: Session, days: Set[str]) -> bool:
+    start = session.start_time
+    return start.strftime("%Y-%m-%d") in days or start.strftime("%a").lower() in days
+
+
+def plan_itinerary(
+    catalog: SessionCatalog,
+    walking: WalkingTimes,
+    interests: Iterable[str] = (),
+    registered_sessions: Iterable[str] = (),
+    days: Iterable[str] = (),
+    min_level: Optional[int] = None,
+    min_break_minutes: int = ITINERARY_MIN_BREAK_MINUTES,
+) -> Itinerary:
+    """
+    Build the highest-scoring conflict-free itinerary.
+
+    Args:
+        catalog: Session catalog
+        walking: Venue walking times
+        interests: Tracks the attendee cares about, e.g. ["AI/ML", "Serverless"]
+        registered_sessions: Session ids the attendee registered for; weighted highest
+        days: Restrict to these dates ("2025-12-02") or weekdays ("tue")
+        min_level: Prefer interest sessions at or above this level
+        min_break_minutes: Break required between sessions on top of walking time
+
+    Returns:
+        The itinerary, plus registered sessions that did not fit and the
+        planned sessions they conflict with
+    """
+    interest_set = {i.strip().lower() for i in interests if i.strip()}
+    registered = {s.strip().upper() for s in registered_sessions if s.strip()}
+    day_set = {d.strip().lower()[:10] if d[:1].isdigit() else d.strip().lower()[:3] for d in days if d.strip()}
+    unknown = sorted(sid for sid in registered if catalog.get(sid) is None)
+
+    # catalog.sessions is already sorted by end time
+    candidates: List[Session] = []
+    weights: List[float] = []
+    for session in catalog.sessions:
+        if day_set and not _matches_day(session, day_set):
+            continue
+        weight = session_weight(session, interest_set, registered, min_level)
+        if weight > 0:
+            candidates.append(session)
+            weights.append(weight)
+
+    values = [0.0] * len(candidates)
+    previous = [-1] * len(candidates)
+    chains: Dict[str, _VenueChain] = {}
+    for i, session in enumerate(candidates):
+        best_value, best_index = 0.0, -1
+        for venue, chain in chains.items():
+            latest_end = session.start - walking.minutes(venue, session.venue) - min_break_minutes
+            k = bisect_right(chain.ends, latest_end)
+            if k and chain.best[k - 1] > best_value:
+                best_value, best_index = chain.best[k - 1], chain.best_index[k - 1]
+        values[i] = best_value + weights[i]
+        previous[i] = best_index
+        chains.setdefault(session.venue, _VenueChain()).add(session.end, values[i], i)
+
+    chosen: List[Session] = []
+    if candidates:
+        i = max(range(len(candidates)), key=values.__getitem__)
+        score = values[i]
+        while i != -1:
+            chosen.append(candidates[i])
+            i = previous[i]
+        chosen.reverse()
+    else:
+        score = 0.0
+
+    planned = []
+    for k, session in enumerate(chosen):
+        # 每天的第一场不计算从前一天最后一个会场的步行时间
+        same_day = k and chosen[k - 1].end // 1440 == session.start // 1440
+        walk = walking.minutes(chosen[k - 1].venue, session.venue) if same_day else 0
+        planned.append(PlannedSession(session, walk, session.session_id in registered))
+
+    chosen_ids = {s.session_id for s in chosen}
+    dropped: Dict[str, List[str]] = {}
+    for sid in sorted(registered - chosen_ids):
+        session = catalog.get(sid)
+        if session is None or (day_set and not _matches_day(session, day_set)):
+            continue
+        dropped[sid] = [
+            p.session_id
+            for p in chosen
+            if p.start < session.end + walking.minutes(session.venue, p.venue) + min_break_minutes
+            and session.start < p.end + walking.minutes(p.venue, session.venue) + min_break_minutes
+        ]
+    return Itinerary(planned, dropped, unknown, score)
@@ -0,0 +1,104 @@
+"""
+Knowledge base retrieval - shared, cached access to the Knowledge Base (Bedrock or local)
+used by the weather, dining and session agents
+"""
+
+import copy
+import re
+import unicodedata
+import uuid
+from typing import Any, Dict
+
+from strands_tools import retrieve
+
+from config.bedrock_config import (
+    AWS_REGION,
+    DEFAULT_KNOWLEDGE_BASE_ID,
+    KB_CACHE_MAX_SIZE,
+    KB_CACHE_TTL_SECONDS,
+    KB_RETRIEVAL_BACKEND,
+    LOCAL_KB_DENSE_WEIGHT,
+    LOCAL_KB_DOCS_DIR,
+    LOCAL_KB_INDEX_DIR,
+    MAX_RAG_RESULTS,
+    MIN_RELEVANCE_SCORE,
+)
+from tools.cache import SingleFlight, TTLCache
+from tools.local_retriever import get_local_retriever, reset_local_retriever
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+_kb_cache = TTLCache(maxsize=KB_CACHE_MAX_SIZE, ttl_seconds=KB_CACHE_TTL_SECONDS)
+_inflight = SingleFlight()
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different phrasings share a cache entry."""
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.strip("?？!！。.,，;；:： ")
+
+
+def _retrieve_from_bedrock(query: str, kb_id: str) -> Dict[str, Any]:
+    return retrieve.retrieve(
+        {
+            "toolUseId": str(uuid.uuid4()),
+            "input": {
+                "text": query,
+                "score": MIN_RELEVANCE_SCORE,
+                "numberOfResults": MAX_RAG_RESULTS,
+                "knowledgeBaseId": kb_id,
+                "region": AWS_REGION,
+            },
+        }
+    )
+
+
+def retrieve_kb(query: str, kb_id: str = DEFAULT_KNOWLEDGE_BASE_ID) -> Dict[str, Any]:
+    """
+    Retrieve from the knowledge base, serving repeated queries from cache.
+
+    With KB_RETRIEVAL_BACKEND = "local" the query is answered by the
+    in-process index over docs/ instead. Otherwise only successful Bedrock
+    responses are cached; errors always go back to Bedrock on the next call.
+    Every caller gets its own copy: strands writes the toolUseId into the
+    returned dict, so a shared object would mix up ids across tool calls.
+
+    Args:
+        query: The search query
+        kb_id: Knowledge Base ID
+
+    Returns:
+        The strands retrieve tool response
+    """
+    if KB_RETRIEVAL_BACKEND == "local":
+        retriever = get_local_retriever(
+            LOCAL_KB_DOCS_DIR, LOCAL_KB_INDEX_DIR, LOCAL_KB_DENSE_WEIGHT
+        )
+        return retriever.retrieve(query, MIN_RELEVANCE_SCORE, MAX_RAG_RESULTS)
+
+    key = (kb_id, MIN_RELEVANCE_SCORE, MAX_RAG_RESULTS, normalize_query(query))
+    cached = _kb_cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    def load() -> Dict[str, Any]:
+        response = _retrieve_from_bedrock(query, kb_id)
+        if response.get("status") == "success":
+            _kb_cache.set(key, copy.deepcopy(response))
+        return response
+
+    # 同一次加载的结果会返回给所有等待者，也要各自复制
+    return copy.deepcopy(_inflight.do(key, load))
+
+
+def invalidate_kb_cache() -> None:
+    """Drop all cached retrievals, e.g. after a Knowledge Base ingestion job finished."""
+    _kb_cache.clear()
+    reset_local_retriever()
+    logger.info("Knowledge base retrieval cache cleared")
+
+
+def kb_cache_stats() -> Dict[str, int]:
+    return _kb_cache.stats()
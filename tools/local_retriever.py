@@ -0,0 +1,299 @@
+"""
+Local retrieval engine - offline Knowledge Base backend over the docs/ markdown guides
+
+Chunks the markdown by heading, builds a BM25 inverted index (CJK-aware
+tokenization) and an optional hashed n-gram dense index with NumPy, and
+persists both as .npy files that are loaded memory-mapped.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+DENSE_DIM = 512
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_TOKEN_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[a-z0-9]+")
+_CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize mixed Chinese/English text.
+
+    Latin words and numbers become lowercase tokens; runs of CJK characters
+    become character unigrams plus bigrams, which works well for Chinese
+    without a segmentation dictionary.
+    """
+    tokens: List[str] = []
+    for run in _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).lower()):
+        if _CJK_RE.match(run):
+            tokens.extend(run)
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def chunk_markdown(text: str, source: str) -> List[Dict[str, str]]:
+    """
+    Split a markdown document into one chunk per heading section.
+
+    Each chunk's text starts with its heading breadcrumb (e.g.
+    "re:Invent 餐饮指南 > 会场周边餐厅推荐 > Venetian / Palazzo 会场周边")
+    so parent headings contribute to retrieval.
+    """
+    chunks: List[Dict[str, str]] = []
+    path: List[Tuple[int, str]] = []
+    body: List[str] = []
+
+    def flush() -> None:
+        content = "\n".join(body).strip()
+        if content and path:
+            breadcrumb = " > ".join(title for _, title in path)
+            chunks.append({"source": source, "text": f"{breadcrumb}\n{content}"})
+        body.clear()
+
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            path = [item for item in path if item[0] < level]
+            path.append((level, match.group(2)))
+        else:
+            body.append(line)
+    flush()
+    return chunks
+
+
+def hashed_vector(tokens: List[str]) -> np.ndarray:
+    vector = np.zeros(DENSE_DIM, dtype=np.float32)
+    for token, count in Counter(tokens).items():
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        sign = 1.0 if value & 1 else -1.0
+        vector[(value >> 1) % DENSE_DIM] += sign * (1.0 + math.log(count))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class LocalRetriever:
+    """
+    BM25 (+ optional dense) retrieval over heading-level markdown chunks.
+
+    Args:
+        docs_dir: Directory with the *.md knowledge base documents
+        index_dir: Directory where the index arrays are persisted
+        dense_weight: Weight of the dense cosine score in [0, 1]; 0 disables it
+    """
+
+    def __init__(self, docs_dir: str, index_dir: str, dense_weight: float = 0.0):
+        self.docs_dir = docs_dir
+        self.index_dir = index_dir
+        self.dense_weight = dense_weight
+        self.chunks: List[Dict[str, str]] = []
+        self.vocab: Dict[str, int] = {}
+        self.indptr: Optional[np.ndarray] = None
+        self.doc_ids: Optional[np.ndarray] = None
+        self.weights: Optional[np.ndarray] = None
+        self.dense: Optional[np.ndarray] = None
+
+    def _doc_paths(self) -> List[str]:
+        return sorted(
+            os.path.join(self.docs_dir, name)
+            for name in os.listdir(self.docs_dir)
+            if name.endswith(".md")
+        )
+
+    def _fingerprint(self) -> str:
+        digest = hashlib.sha256(f"v{INDEX_VERSION}:{DENSE_DIM}".encode())
+        for path in self._doc_paths():
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    def build(self) -> None:
+        """Chunk the documents and build the BM25 postings and dense matrix."""
+        chunks: List[Dict[str, str]] = []
+        for path in self._doc_paths():
+            with open(path, "r", encoding="utf-8") as f:
+                chunks.extend(chunk_markdown(f.read(), os.path.relpath(path)))
+
+        tokenized = [tokenize(chunk["text"]) for chunk in chunks]
+        doc_lengths = np.array([len(t) for t in tokenized], dtype=np.float32)
+        avg_length = float(doc_lengths.mean()) if len(chunks) else 0.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, tokens in enumerate(tokenized):
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        vocab: Dict[str, int] = {}
+        indptr = [0]
+        doc_ids: List[int] = []
+        weights: List[float] = []
+        n_docs = len(chunks)
+        for term in sorted(postings):
+            entries = postings[term]
+            vocab[term] = len(vocab)
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            # BM25 的词项权重与查询无关，建索引时预先算好
+            for doc_id, tf in entries:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[doc_id] / avg_length)
+                doc_ids.append(doc_id)
+                weights.append(idf * tf * (BM25_K1 + 1) / (tf + norm))
+            indptr.append(len(doc_ids))
+
+        self.chunks = chunks
+        self.vocab = vocab
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.doc_ids = np.array(doc_ids, dtype=np.int32)
+        self.weights = np.array(weights, dtype=np.float32)
+        self.dense = (
+            np.stack([hashed_vector(t) for t in tokenized])
+            if chunks
+            else np.zeros((0, DENSE_DIM), dtype=np.float32)
+        )
+
+    def save(self) -> None:
+        """
+        Persist the index. Files are written to temporaries and renamed into
+        place, so retrievers that still memory-map the previous files keep
+        reading the old (unlinked) data instead of a half-written file.
+        """
+        os.makedirs(self.index_dir, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+        replacements = []
+        for name in ("indptr", "doc_ids", "weights", "dense"):
+            path = os.path.join(self.index_dir, f"{name}.npy")
+            with open(f"{path}{suffix}", "wb") as f:
+                np.save(f, getattr(self, name))
+            replacements.append((f"{path}{suffix}", path))
+        meta = {
+            "fingerprint": self._fingerprint(),
+            "chunks": self.chunks,
+            "vocab": self.vocab,
+        }
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        with open(f"{meta_path}{suffix}", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        replacements.append((f"{meta_path}{suffix}", meta_path))
+        # meta.json 最后替换，读取方先看到完整的数组文件
+        for tmp_path, path in replacements:
+            os.replace(tmp_path, path)
+
+    def load(self) -> bool:
+        """Load a persisted index if it matches the current docs; arrays are memory-mapped."""
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("fingerprint") != self._fingerprint():
+            return False
+        for name in ("indptr", "doc_ids", "weights", "dense"):
+            path = os.path.join(self.index_dir, f"{name}.npy")
+            setattr(self, name, np.load(path, mmap_mode="r"))
+        # 与另一个进程的重建交错时，数组和 meta 可能来自不同版本，此时重建
+        if len(self.indptr) != len(meta["vocab"]) + 1 or len(self.dense) != len(meta["chunks"]):
+            return False
+        self.chunks = meta["chunks"]
+        self.vocab = meta["vocab"]
+        return True
+
+    def load_or_build(self) -> "LocalRetriever":
+        if not self.load():
+            logger.info("Building local KB index from %s", self.docs_dir)
+            self.build()
+            self.save()
+        return self
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Rank chunks for a query.
+
+        Returns:
+            List of (chunk index, score in [0, 1]) sorted by score
+        """
+        n_docs = len(self.chunks)
+        if not n_docs:
+            return []
+        tokens = tokenize(query)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        for term, count in Counter(tokens).items():
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            scores[self.doc_ids[start:end]] += count * self.weights[start:end]
+
+        top = float(scores.max())
+        if top > 0:
+            scores /= top
+        if self.dense_weight > 0:
+            cosine = np.asarray(self.dense @ hashed_vector(tokens))
+            scores = (1 - self.dense_weight) * scores + self.dense_weight * np.clip(cosine, 0, 1)
+
+        k = min(top_k, n_docs)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), float(scores[i])) for i in ranked if scores[i] > 0]
+
+    def retrieve(self, query: str, min_score: float, top_k: int) -> Dict[str, Any]:
+        """Search and format the result like the strands retrieve tool."""
+        results = [(i, s) for i, s in self.search(query, top_k) if s >= min_score]
+        if not results:
+            formatted = "No results found above score threshold."
+        else:
+            lines = []
+            for chunk_id, score in results:
+                chunk = self.chunks[chunk_id]
+                lines.append(f"\nScore: {score:.4f}")
+                lines.append(f"Document ID: {chunk['source']}")
+                lines.append(f"Content: {chunk['text']}\n")
+            formatted = "\n".join(lines)
+        return {
+            "toolUseId": str(uuid.uuid4()),
+            "status": "success",
+            "content": [
+                {"text": f"Retrieved {len(results)} results with score >= {min_score}:\n{formatted}"}
+            ],
+        }
+
+
+_retriever: Optional[LocalRetriever] = None
+_retriever_lock = threading.Lock()
+
+
+def get_local_retriever(docs_dir: str, index_dir: str, dense_weight: float) -> LocalRetriever:
+    """Return the process-wide LocalRetriever, loading or building its index once."""
+    global _retriever
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                _retriever = LocalRetriever(docs_dir, index_dir, dense_weight).load_or_build()
+    return _retriever
+
+
+def reset_local_retriever() -> None:
+    """Forget the loaded index so the next query reloads (or rebuilds) it."""
+    global _retriever
+    with _retriever_lock:
+        _retriever = None
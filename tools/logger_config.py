@@ -1,8 +1,188 @@
 """
 Centralized logging configuration for the application.
+
+Request threads only put records on an in-memory queue; a background
+QueueListener thread formats them (JSON or text) and writes them out, so
+%-style messages are formatted lazily and never on the request path.
+Every field is capped at LOG_FIELD_MAX_CHARS, and large payloads (prompts,
+agent results, KB responses) go through log_payload(), which logs only a
+LOG_PAYLOAD_SAMPLE_RATE sample of calls. Per-call progress messages
+("Routed to ...") are DEBUG; routing and timings are in traces and /metrics.
 """
 
+import atexit
+import json
 import logging
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from opentelemetry import trace
+
+from config.bedrock_config import (
+    LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_QUEUE_SIZE,
+    LOG_FIELD_MAX_CHARS,
+    LOG_PAYLOAD_SAMPLE_RATE,
+)
+from tools.metrics import LOG_RECORDS_DROPPED
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(trace_id)s - %(message)s"
+
+
+def truncate(text: str, max_chars: Optional[int] = None) -> str:
+    max_chars = LOG_FIELD_MAX_CHARS if max_chars is None else max_chars
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}…(+{len(text) - max_chars} chars)"
+
+
+class Truncated:
+    """A payload whose size-capped str() is only built when the record is formatted."""
+
+    __slots__ = ("payload", "max_chars")
+
+    def __init__(self, payload: Any, max_chars: Optional[int] = None):
+        self.payload = payload
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        return truncate(str(self.payload), self.max_chars)
+
+
+class TraceContextFilter(logging.Filter):
+    """Add the current OpenTelemetry trace id to every record as %(trace_id)s."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = trace.get_current_span().get_span_context()
+        record.trace_id = format(context.trace_id, "032x") if context.is_valid else "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; message, extras and tracebacks are size-capped."""
+
+    _RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "trace_id"}
+
+    def __init__(self, max_chars: Optional[int] = None):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "trace_id": getattr(record, "trace_id", "-"),
+            "message": truncate(record.getMessage(), self.max_chars),
+        }
+        for key, value in record.__dict__.items():
+            if key not in self._RESERVED:
+                entry[key] = value if isinstance(value, (bool, int, float, type(None))) else truncate(str(value), self.max_chars)
+        if record.exc_info:
+            entry["exception"] = truncate(self.formatException(record.exc_info), self.max_chars)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """The classic text line with the message size-capped."""
+
+    def __init__(self, fmt: str = TEXT_FORMAT, max_chars: Optional[int] = None):
+        super().__init__(fmt)
+        self.max_chars = max_chars
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        record.message = truncate(record.message, self.max_chars)
+        return super().formatMessage(record)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    Enqueue records without formatting them; drop instead of blocking when full.
+    Drops are counted in `dropped` and exported at /metrics.
+
+    Unlike the stdlib QueueHandler the record keeps msg/args, so formatting
+    happens in the listener thread. Log immutable values or snapshots; an
+    object mutated right after the call may be formatted in its new state.
+    """
+
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+
+class _BlockingSentinelListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # 队列满时等待后台线程腾出空间，保证退出前的日志全部写出
+        self.queue.put(self._sentinel)
+
+
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def _configure() -> None:
+    global _listener
+    root = logging.getLogger()
+    with _configure_lock:
+        # 已由其他方式（例如 uvicorn --log-config）配置过则保持不变
+        if root.handlers:
+            return
+        output = logging.StreamHandler()
+        output.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+        handler = AsyncQueueHandler()
+        # trace id 必须在调用线程读取，因此过滤器挂在队列 handler 上
+        handler.addFilter(TraceContextFilter())
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        _listener = _BlockingSentinelListener(handler.queue, output, respect_handler_level=True)
+        _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the background writer."""
+    global _listener
+    with _configure_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def log_payload(
+    logger: logging.Logger,
+    message: str,
+    payload: Any,
+    level: int = logging.INFO,
+    sample_rate: Optional[float] = None,
+) -> None:
+    """
+    Log a large payload for a sample of calls; other calls log nothing.
+
+    Args:
+        logger: Logger to use
+        message: Short description of the payload
+        payload: Prompt, agent result, KB response...; rendered lazily and size-capped
+        level: Log level
+        sample_rate: Fraction of calls that include the payload, default LOG_PAYLOAD_SAMPLE_RATE
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if random.random() < (LOG_PAYLOAD_SAMPLE_RATE if sample_rate is None else sample_rate):
+        logger.log(level, "%s: %s", message, Truncated(payload), extra={"payload_sampled": True})
 
 
 def get_logger(name: str = None) -> logging.Logger:
@@ -17,9 +197,6 @@ def get_logger(name: str = None) -> logging.Logger:
     """
     # Configure logging if not already configured
     if not logging.getLogger().handlers:
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        )
+        _configure()
 
     return logging.getLogger(name)
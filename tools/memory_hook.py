@@ -1,4 +1,5 @@
-import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 from strands.hooks import HookProvider, HookRegistry
 from strands.hooks.events import (
     BeforeInvocationEvent,
@@ -7,10 +8,23 @@ from strands.hooks.events import (
     AgentInitializedEvent,
 )
 from bedrock_agentcore.memory import MemoryClient
+from config.bedrock_config import (
+    MEMORY_HOOK_RETRIEVAL_WORKERS,
+    MEMORY_HOOK_CACHE_SIZE,
+    MEMORY_HOOK_CACHE_TTL_SECONDS,
+)
+from tools.cache import TTLCache
 from tools.logger_config import get_logger
 
 logger = get_logger(__name__)
 
+# 各命名空间的记忆检索并发执行
+_retrieval_pool = ThreadPoolExecutor(
+    max_workers=MEMORY_HOOK_RETRIEVAL_WORKERS, thread_name_prefix="memory-retrieve"
+)
+# 单线程保存，保证同一进程内消息写入顺序
+_save_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-save")
+
 
 class MemoryHook(HookProvider):
     def __init__(
@@ -24,6 +38,14 @@ class MemoryHook(HookProvider):
         self.memory_id = memory_id
         self.actor_id = actor_id
         self.session_id = session_id
+        self.namespaces = [
+            (f"support/user/{actor_id}/preferences", "These are user preferences:"),
+            (f"support/user/{actor_id}/facts", "These are user facts:"),
+        ]
+        # Retrieval results cached per hook instance, i.e. per session
+        self._retrieval_cache = TTLCache(
+            maxsize=MEMORY_HOOK_CACHE_SIZE, ttl_seconds=MEMORY_HOOK_CACHE_TTL_SECONDS
+        )
 
     def on_agent_initialized(self, event: AgentInitializedEvent):
         """Load recent conversation history when agent starts"""
@@ -50,63 +72,72 @@ class MemoryHook(HookProvider):
                 # context = "\n".join(context_messages)
                 # Add context to agent's system prompt.
                 event.agent.system_prompt += """
-                Do not respond with user preferences or user facts. 
+                Do not respond with user preferences or user facts.
                 Strictly use user preferences and user facts to know more about the user.
                 Also be aware that this information can be outdated.
                 """
                 event.agent.messages = context_messages
 
         except Exception as e:
-            logger.error(f"Memory load error: {e}")
+            logger.error("Memory load error: %s", e)
+
+    def _retrieve(self, namespace: str, query: str) -> List[str]:
+        key = (namespace, query)
+        cached = self._retrieval_cache.get(key)
+        if cached is not None:
+            return cached
 
-    def _add_context_user_query(
-        self, namespace: str, query: str, init_content: str, event: MessageAddedEvent
-    ):
-        content = None
         memories = self.memory_client.retrieve_memories(
             memory_id=self.memory_id, namespace=namespace, query=query, top_k=3
         )
-
-        for memory in memories:
-            if not content:
-                content = "\n\n" + init_content + "\n\n"
-
-            content += memory["content"]["text"]
-
-            if content:
-                event.agent.messages[-1]["content"][0]["text"] += content + "\n\n"
+        texts = [memory["content"]["text"] for memory in memories]
+        self._retrieval_cache.set(key, texts)
+        return texts
+
+    def _build_user_context(self, query: str) -> str:
+        """Retrieve all namespaces concurrently and format them as one block."""
+        futures = [
+            (init_content, _retrieval_pool.submit(self._retrieve, namespace, query))
+            for namespace, init_content in self.namespaces
+        ]
+
+        context = ""
+        for init_content, future in futures:
+            texts = future.result()
+            if texts:
+                context += "\n\n" + init_content + "\n\n" + "".join(texts) + "\n\n"
+        return context
+
+    def _save(self, text: str, role: str) -> None:
+        try:
+            self.memory_client.save_conversation(
+                memory_id=self.memory_id,
+                actor_id=self.actor_id,
+                session_id=self.session_id,
+                messages=[(text, role)],
+            )
+        except Exception as e:
+            logger.error("Memory save error: %s", e)
 
     def on_message_added(self, event: MessageAddedEvent):
         """Store messages in memory"""
-        messages = copy.deepcopy(event.agent.messages)
+        # 只读取新增的这条消息，不复制整个历史
+        message = event.message
         try:
-            if messages[-1]["role"] == "user" or messages[-1]["role"] == "assistant":
-                if "text" not in messages[-1]["content"][0]:
+            if message["role"] == "user" or message["role"] == "assistant":
+                content = message["content"]
+                if not content or "text" not in content[0]:
                     return
 
-                if messages[-1]["role"] == "user":
-                    self._add_context_user_query(
-                        namespace=f"support/user/{self.actor_id}/preferences",
-                        query=messages[-1]["content"][0]["text"],
-                        init_content="These are user preferences:",
-                        event=event,
-                    )
-
-                    self._add_context_user_query(
-                        namespace=f"support/user/{self.actor_id}/facts",
-                        query=messages[-1]["content"][0]["text"],
-                        init_content="These are user facts:",
-                        event=event,
-                    )
-                logger.info("Message saved to memory")
-                self.memory_client.save_conversation(
-                    memory_id=self.memory_id,
-                    actor_id=self.actor_id,
-                    session_id=self.session_id,
-                    messages=[
-                        (messages[-1]["content"][0]["text"], messages[-1]["role"])
-                    ],
-                )
+                text = content[0]["text"]
+                if message["role"] == "user":
+                    context = self._build_user_context(text)
+                    if context:
+                        content[0]["text"] += context
+
+                # 保存放到后台线程，不阻塞本轮对话
+                _save_pool.submit(self._save, text, message["role"])
+                logger.info("Message queued for memory")
 
         except Exception as e:
             raise RuntimeError(f"Memory save error: {e}")
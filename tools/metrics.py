@@ -0,0 +1,298 @@
+"""
+Metrics - per-agent and per-tool latency and token instrumentation
+
+MetricsHook is a strands HookProvider attached to the supervisor and to
+every specialist agent. It records invocation wall time, model call
+latency, token usage and tool durations into the process-wide registry,
+exported in Prometheus text format at /metrics. While a turn is active
+(start_turn) the same numbers are also collected per turn so they can be
+returned with the response.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from strands.hooks import HookProvider, HookRegistry
+from strands.hooks.events import (
+    BeforeInvocationEvent,
+    AfterInvocationEvent,
+    BeforeModelCallEvent,
+    AfterModelCallEvent,
+    BeforeToolCallEvent,
+    AfterToolCallEvent,
+)
+
+from config.bedrock_config import METRICS_ENABLED, METRICS_LATENCY_BUCKETS
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        # 无标签的计数器在首次递增前也导出 0
+        if not values and not self.labelnames:
+            values = [((), 0.0)]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = METRICS_LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels → [每个桶的计数..., +Inf 桶计数, 总和]
+        self._values: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((labels, list(state)) for labels, state in self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, state in values:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {_format_value(cumulative)}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_text} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+TURN_SECONDS = metrics_registry.histogram(
+    "attendee_guide_turn_seconds", "Wall time of one supervisor turn", ["route"]
+)
+AGENT_INVOCATION_SECONDS = metrics_registry.histogram(
+    "attendee_guide_agent_invocation_seconds", "Wall time of one agent invocation", ["agent"]
+)
+MODEL_CALL_SECONDS = metrics_registry.histogram(
+    "attendee_guide_model_call_seconds", "Latency of one model call", ["agent"]
+)
+MODEL_CALL_ERRORS = metrics_registry.counter(
+    "attendee_guide_model_call_errors_total", "Model calls that raised", ["agent"]
+)
+TOKENS = metrics_registry.counter(
+    "attendee_guide_tokens_total", "Model tokens used", ["agent", "direction"]
+)
+TOOL_CALL_SECONDS = metrics_registry.histogram(
+    "attendee_guide_tool_call_seconds", "Duration of one tool call", ["agent", "tool", "status"]
+)
+LOG_RECORDS_DROPPED = metrics_registry.counter(
+    "attendee_guide_log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+
+class TurnMetrics:
+    """Per-turn breakdown of agent, model and tool time, returned with the response."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.route = "llm"
+        self._lock = threading.Lock()
+        self.agents: Dict[str, Dict[str, float]] = {}
+        self.tools: List[Dict[str, Any]] = []
+
+    def record_agent(
+        self, agent: str, seconds: float, model_seconds: float, model_calls: int, usage: Dict[str, int]
+    ) -> None:
+        with self._lock:
+            totals = self.agents.setdefault(
+                agent,
+                {"invocations": 0, "wall_ms": 0.0, "model_ms": 0.0, "model_calls": 0, "input_tokens": 0, "output_tokens": 0},
+            )
+            totals["invocations"] += 1
+            totals["wall_ms"] += seconds * 1000
+            totals["model_ms"] += model_seconds * 1000
+            totals["model_calls"] += model_calls
+            totals["input_tokens"] += usage.get("inputTokens", 0)
+            totals["output_tokens"] += usage.get("outputTokens", 0)
+
+    def record_tool(self, agent: str, tool: str, seconds: float, status: str) -> None:
+        with self._lock:
+            self.tools.append({"agent": agent, "tool": tool, "ms": round(seconds * 1000, 1), "status": status})
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "route": self.route,
+                "wall_ms": round((time.perf_counter() - self.start) * 1000, 1),
+                "agents": {
+                    name: {k: round(v, 1) if isinstance(v, float) else v for k, v in totals.items()}
+                    for name, totals in self.agents.items()
+                },
+                "tools": list(self.tools),
+            }
+
+
+_current_turn: ContextVar[Optional[TurnMetrics]] = ContextVar("turn_metrics", default=None)
+
+
+def current_turn() -> Optional[TurnMetrics]:
+    return _current_turn.get()
+
+
+@contextmanager
+def start_turn() -> Iterator[TurnMetrics]:
+    """Collect metrics of everything run in this context (including nested agents) for one turn."""
+    turn = TurnMetrics()
+    token = _current_turn.set(turn)
+    try:
+        yield turn
+    finally:
+        _current_turn.reset(token)
+        TURN_SECONDS.observe(time.perf_counter() - turn.start, turn.route)
+
+
+class MetricsHook(HookProvider):
+    """
+    Record invocation, model and tool timings of one agent.
+
+    One hook instance belongs to one agent, which runs one invocation at a
+    time; concurrent tool calls are matched by toolUseId.
+
+    Args:
+        agent_name: Label used in metrics, e.g. "supervisor", "weather"
+    """
+
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+        self._invocation_start = 0.0
+        self._model_start = 0.0
+        self._model_seconds = 0.0
+        self._model_calls = 0
+        self._usage_start: Dict[str, int] = {}
+        self._tool_starts: Dict[str, float] = {}
+
+    def on_before_invocation(self, event: BeforeInvocationEvent) -> None:
+        self._invocation_start = time.perf_counter()
+        self._model_seconds = 0.0
+        self._model_calls = 0
+        self._usage_start = dict(event.agent.event_loop_metrics.accumulated_usage)
+
+    def on_after_invocation(self, event: AfterInvocationEvent) -> None:
+        seconds = time.perf_counter() - self._invocation_start
+        usage = event.agent.event_loop_metrics.accumulated_usage
+        delta = {
+            key: usage.get(key, 0) - self._usage_start.get(key, 0)
+            for key in ("inputTokens", "outputTokens")
+        }
+        AGENT_INVOCATION_SECONDS.observe(seconds, self.agent_name)
+        TOKENS.inc(self.agent_name, "input", value=delta["inputTokens"])
+        TOKENS.inc(self.agent_name, "output", value=delta["outputTokens"])
+        turn = _current_turn.get()
+        if turn is not None:
+            turn.record_agent(self.agent_name, seconds, self._model_seconds, self._model_calls, delta)
+
+    def on_before_model_call(self, event: BeforeModelCallEvent) -> None:
+        self._model_start = time.perf_counter()
+
+    def on_after_model_call(self, event: AfterModelCallEvent) -> None:
+        seconds = time.perf_counter() - self._model_start
+        self._model_seconds += seconds
+        self._model_calls += 1
+        MODEL_CALL_SECONDS.observe(seconds, self.agent_name)
+        if event.exception is not None:
+            MODEL_CALL_ERRORS.inc(self.agent_name)
+
+    def on_before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        self._tool_starts[event.tool_use["toolUseId"]] = time.perf_counter()
+
+    def on_after_tool_call(self, event: AfterToolCallEvent) -> None:
+        start = self._tool_starts.pop(event.tool_use["toolUseId"], None)
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        failed = event.exception is not None or (event.result or {}).get("status") == "error"
+        status = "error" if failed else "success"
+        tool_name = event.tool_use["name"]
+        TOOL_CALL_SECONDS.observe(seconds, self.agent_name, tool_name, status)
+        turn = _current_turn.get()
+        if turn is not None:
+            turn.record_tool(self.agent_name, tool_name, seconds, status)
+
+    def register_hooks(self, registry: HookRegistry) -> None:
+        if not METRICS_ENABLED:
+            return
+        registry.add_callback(BeforeInvocationEvent, self.on_before_invocation)
+        registry.add_callback(AfterInvocationEvent, self.on_after_invocation)
+        registry.add_callback(BeforeModelCallEvent, self.on_before_model_call)
+        registry.add_callback(AfterModelCallEvent, self.on_after_model_call)
+        registry.add_callback(BeforeToolCallEvent, self.on_before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self.on_after_tool_call)
@@ -0,0 +1,200 @@
+"""
+Model registry - named Bedrock model tiers shared by all agents
+
+Agents ask for a tier (fast/default/strong) instead of building their own
+BedrockModel. Models are built lazily, one per tier and parameter set,
+and record per-tier call latency and token usage. Turns whose output
+looks low-confidence are re-run on the next tier.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from strands import Agent
+from strands.models import BedrockModel
+
+from config.bedrock_config import (
+    MODEL_TIERS,
+    MODEL_ESCALATION,
+    AGENT_MODEL_TIERS,
+    INTENT_MODEL_TIERS,
+    AGENT_MODEL_PARAMS,
+    MODEL_TEMPERATURE,
+    MODEL_TOP_P,
+    LOW_CONFIDENCE_MIN_CHARS,
+)
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TIER = "default"
+
+# 模型明确表示无法回答或不确定时视为低置信度
+LOW_CONFIDENCE_RE = re.compile(
+    r"我不确定|不太确定|无法回答|无法确定|我不知道|没有足够的信息"
+    r"|i'?m not sure|i don'?t know|i cannot answer|unable to determine",
+    re.IGNORECASE,
+)
+
+
+class TierStats:
+    """Latency and token counters of one model tier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.latency_ms = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.escalations = 0
+
+    def record(self, latency_ms: float, usage: Optional[Dict[str, int]]) -> None:
+        with self._lock:
+            self.calls += 1
+            self.latency_ms += latency_ms
+            if usage:
+                self.input_tokens += usage.get("inputTokens", 0)
+                self.output_tokens += usage.get("outputTokens", 0)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def record_escalation(self) -> None:
+        with self._lock:
+            self.escalations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "avg_latency_ms": self.latency_ms / self.calls if self.calls else None,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "escalations": self.escalations,
+            }
+
+
+class MeteredBedrockModel(BedrockModel):
+    """BedrockModel that records latency and token usage of each call for its tier."""
+
+    def __init__(self, tier: str, stats: TierStats, **model_config: Any):
+        super().__init__(**model_config)
+        self.tier = tier
+        self._stats = stats
+
+    async def stream(self, *args: Any, **kwargs: Any):
+        start = time.perf_counter()
+        usage = None
+        try:
+            async for event in super().stream(*args, **kwargs):
+                if "metadata" in event:
+                    usage = event["metadata"].get("usage")
+                yield event
+        except Exception:
+            self._stats.record_error()
+            raise
+        self._stats.record((time.perf_counter() - start) * 1000, usage)
+
+
+def is_low_confidence(result: Any) -> bool:
+    """Heuristic: truncated, near-empty or explicitly unsure output."""
+    if getattr(result, "stop_reason", None) == "max_tokens":
+        return True
+    text = str(result).strip()
+    return len(text) < LOW_CONFIDENCE_MIN_CHARS or bool(LOW_CONFIDENCE_RE.search(text))
+
+
+class ModelRegistry:
+    """
+    Lazily built Bedrock models per tier.
+
+    Args:
+        tiers: Tier name → Bedrock model id
+        escalation: Tier → next tier used when the output is low-confidence
+        agent_tiers: Agent name → tier
+        intent_tiers: Router intent → tier, takes precedence over agent_tiers
+        agent_params: Agent name → model parameter overrides (e.g. top_p)
+    """
+
+    def __init__(
+        self,
+        tiers: Dict[str, str] = MODEL_TIERS,
+        escalation: Dict[str, str] = MODEL_ESCALATION,
+        agent_tiers: Dict[str, str] = AGENT_MODEL_TIERS,
+        intent_tiers: Dict[str, str] = INTENT_MODEL_TIERS,
+        agent_params: Dict[str, Dict[str, Any]] = AGENT_MODEL_PARAMS,
+    ):
+        self._tiers = tiers
+        self._escalation = escalation
+        self._agent_tiers = agent_tiers
+        self._intent_tiers = intent_tiers
+        self._agent_params = agent_params
+        self._models: Dict[Tuple[str, Tuple], BedrockModel] = {}
+        self._stats: Dict[str, TierStats] = {tier: TierStats() for tier in tiers}
+        self._lock = threading.Lock()
+
+    def tier_for(self, agent_name: str, intent: Optional[str] = None) -> str:
+        if intent is not None and intent in self._intent_tiers:
+            return self._intent_tiers[intent]
+        return self._agent_tiers.get(agent_name, DEFAULT_TIER)
+
+    def get(self, tier: str, agent_name: Optional[str] = None) -> BedrockModel:
+        """Return the shared model of a tier, built on first use."""
+        params = {"temperature": MODEL_TEMPERATURE, "top_p": MODEL_TOP_P}
+        params.update(self._agent_params.get(agent_name, {}))
+        key = (tier, tuple(sorted(params.items())))
+        model = self._models.get(key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = MeteredBedrockModel(
+                        tier, self._stats[tier], model_id=self._tiers[tier], **params
+                    )
+                    self._models[key] = model
+        return model
+
+    def invoke(self, agent: Agent, prompt: Optional[str], tier: str, agent_name: str) -> Any:
+        """
+        Run one agent turn on a tier, escalating while the output is low-confidence.
+
+        Escalation re-runs only the final generation: the low-confidence
+        answer is removed and the stronger model continues from the messages
+        already gathered, so tool calls (specialist agents, HTTP/KB lookups,
+        memory writes) are not repeated. The agent's model is restored
+        afterwards.
+        """
+        result = agent(prompt)
+        next_tier = self._escalation.get(tier)
+        if next_tier is None or not is_low_confidence(result):
+            return result
+
+        messages = agent.messages
+        final = messages[-1] if messages else None
+        # 只有最后一条是纯文本的助手回复时才能只重做最后一次生成
+        if final is None or final["role"] != "assistant" or any("toolUse" in c for c in final["content"]):
+            return result
+
+        logger.info("Escalating %s from %s to %s", agent_name, tier, next_tier)
+        self._stats[tier].record_escalation()
+        messages.pop()
+        model = agent.model
+        agent.model = self.get(next_tier, agent_name)
+        try:
+            return self.invoke(agent, None, next_tier, agent_name)
+        finally:
+            agent.model = model
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            tier: {"model_id": self._tiers[tier], **stats.snapshot()}
+            for tier, stats in self._stats.items()
+        }
+
+
+model_registry = ModelRegistry()
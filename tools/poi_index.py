@@ -0,0 +1,340 @@
+"""
+Restaurant POI index - local spatial index over an OSM/Overpass JSON extract
+
+The extract is downloaded on the first refresh when it does not exist yet.
+To create it ahead of time (e.g. to bake it into an image):
+    python -m tools.poi_index
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.http_client import http_post
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+AMENITY_TYPES = ("restaurant", "cafe", "fast_food")
+
+# (south, west, north, east)
+BBox = Tuple[float, float, float, float]
+
+
+class _Snapshot:
+    """Immutable arrays for one version of the index; swapped atomically on refresh."""
+
+    def __init__(self, elements: Sequence[Dict[str, Any]], cell_deg: float):
+        self.elements = list(elements)
+        self.cell_deg = cell_deg
+        self.lat = np.array([e["lat"] for e in self.elements], dtype=np.float64)
+        self.lon = np.array([e["lon"] for e in self.elements], dtype=np.float64)
+        self.lat_rad = np.radians(self.lat)
+        self.lon_rad = np.radians(self.lon)
+        self.grid = self._build_grid()
+        self.cuisine_index = self._build_cuisine_index()
+
+    def _build_grid(self) -> Dict[Tuple[int, int], np.ndarray]:
+        if not self.elements:
+            return {}
+        ilat = np.floor(self.lat / self.cell_deg).astype(np.int64)
+        ilon = np.floor(self.lon / self.cell_deg).astype(np.int64)
+        order = np.lexsort((ilon, ilat))
+        cells = np.stack([ilat[order], ilon[order]], axis=1)
+        unique_cells, starts = np.unique(cells, axis=0, return_index=True)
+        groups = np.split(order, starts[1:])
+        return {
+            (int(cell[0]), int(cell[1])): group
+            for cell, group in zip(unique_cells, groups)
+        }
+
+    def _build_cuisine_index(self) -> Dict[str, np.ndarray]:
+        postings: Dict[str, List[int]] = {}
+        for i, element in enumerate(self.elements):
+            cuisine = element.get("tags", {}).get("cuisine", "").lower()
+            for token in cuisine.replace(",", ";").split(";"):
+                token = token.strip()
+                if token:
+                    postings.setdefault(token, []).append(i)
+        return {k: np.array(v, dtype=np.int64) for k, v in postings.items()}
+
+    def candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 1e-6))
+        lat_lo = math.floor((lat - dlat) / self.cell_deg)
+        lat_hi = math.floor((lat + dlat) / self.cell_deg)
+        lon_lo = math.floor((lon - dlon) / self.cell_deg)
+        lon_hi = math.floor((lon + dlon) / self.cell_deg)
+        groups = [
+            self.grid[(i, j)]
+            for i in range(lat_lo, lat_hi + 1)
+            for j in range(lon_lo, lon_hi + 1)
+            if (i, j) in self.grid
+        ]
+        if not groups:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(groups)
+
+    def cuisine_matches(self, cuisine_type: str) -> np.ndarray:
+        # 与原 Overpass 过滤保持一致：子串匹配（"chin" 可匹配 "chinese"）
+        term = cuisine_type.lower().strip()
+        groups = [ids for token, ids in self.cuisine_index.items() if term in token]
+        if not groups:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(groups))
+
+
+class POIIndex:
+    """
+    In-memory restaurant index with a geographic grid and a cuisine inverted index.
+
+    Radius queries gather candidates from the grid cells overlapping the
+    search circle, then compute exact haversine distances with NumPy.
+
+    Args:
+        bbox: (south, west, north, east) area covered by the extract
+        cell_deg: Grid cell size in degrees
+    """
+
+    def __init__(self, bbox: BBox, cell_deg: float):
+        self.bbox = bbox
+        self._cell_deg = cell_deg
+        self._snapshot = _Snapshot([], cell_deg)
+        self._by_id: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.timestamp: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.elements)
+
+    def merge(
+        self,
+        elements: Iterable[Dict[str, Any]],
+        timestamp: Optional[str] = None,
+        replace: bool = False,
+    ) -> int:
+        """
+        Upsert Overpass node elements by OSM id and rebuild the index.
+
+        Nodes whose amenity no longer qualifies are removed. Deleted nodes are
+        not reported by incremental queries; replace=True drops everything not
+        in `elements`, for full reloads.
+        """
+        changed = 0
+        with self._lock:
+            if replace:
+                changed = len(self._by_id)
+                self._by_id = {}
+            for element in elements:
+                if element.get("type", "node") != "node" or "lat" not in element:
+                    continue
+                tags = element.get("tags", {})
+                if tags.get("amenity") not in AMENITY_TYPES:
+                    if self._by_id.pop(element["id"], None) is not None:
+                        changed += 1
+                    continue
+                self._by_id[element["id"]] = element
+                changed += 1
+            if changed:
+                self._snapshot = _Snapshot(self._by_id.values(), self._cell_deg)
+            if timestamp:
+                self.timestamp = timestamp
+        return changed
+
+    def load(self, path: str) -> int:
+        """Load an Overpass JSON extract ({"elements": [...]}) from disk."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        timestamp = data.get("osm3s", {}).get("timestamp_osm_base")
+        return self.merge(data.get("elements", []), timestamp, replace=True)
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = {
+                "osm3s": {"timestamp_osm_base": self.timestamp},
+                "elements": list(self._by_id.values()),
+            }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def covers(self, lat: float, lon: float, radius_km: float) -> bool:
+        """True if the search circle lies inside the indexed area."""
+        if not len(self):
+            return False
+        south, west, north, east = self.bbox
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 1e-6))
+        return (
+            south <= lat - dlat
+            and lat + dlat <= north
+            and west <= lon - dlon
+            and lon + dlon <= east
+        )
+
+    def query(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        cuisine_type: Optional[str] = None,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find POIs within radius_km, nearest first.
+
+        Returns:
+            List of (overpass element, distance in km)
+        """
+        snapshot = self._snapshot
+        ids = snapshot.candidates(lat, lon, radius_km)
+        if cuisine_type and ids.size:
+            ids = ids[np.isin(ids, snapshot.cuisine_matches(cuisine_type))]
+        if not ids.size:
+            return []
+
+        lat0 = math.radians(lat)
+        lon0 = math.radians(lon)
+        dlat = snapshot.lat_rad[ids] - lat0
+        dlon = snapshot.lon_rad[ids] - lon0
+        a = (
+            np.sin(dlat / 2) ** 2
+            + math.cos(lat0) * np.cos(snapshot.lat_rad[ids]) * np.sin(dlon / 2) ** 2
+        )
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+        mask = distances <= radius_km
+        ids = ids[mask]
+        distances = distances[mask]
+        order = np.argsort(distances, kind="stable")
+        return [(snapshot.elements[ids[i]], float(distances[i])) for i in order]
+
+
+def build_overpass_query(bbox: BBox, newer_than: Optional[str] = None) -> str:
+    """
+    Overpass QL for restaurant/cafe/fast_food nodes in a bbox.
+
+    With newer_than, returns every amenity node changed since then, so nodes
+    whose amenity changed to another type are seen and can be removed.
+    """
+    south, west, north, east = bbox
+    if newer_than:
+        selector = f'["amenity"](newer:"{newer_than}")'
+    else:
+        selector = f'["amenity"~"^({"|".join(AMENITY_TYPES)})$"]'
+    return f"""
+    [out:json][timeout:90];
+    node{selector}({south},{west},{north},{east});
+    out body;
+    """
+
+
+class POIRefresher:
+    """
+    Keeps a POIIndex in sync with Overpass in a background thread.
+
+    The first run downloads the whole bbox when no extract exists on disk;
+    later runs only request nodes changed since the last extract timestamp.
+    Every full_reload_seconds the whole bbox is downloaded again and replaces
+    the index, which drops nodes deleted from OSM.
+
+    Args:
+        index: The index to refresh
+        extract_path: Overpass JSON file used to persist the index
+        interval_seconds: Time between incremental refreshes
+        full_reload_seconds: Time between full reloads
+    """
+
+    def __init__(
+        self,
+        index: POIIndex,
+        extract_path: str,
+        interval_seconds: float,
+        full_reload_seconds: float,
+    ):
+        self._index = index
+        self._path = extract_path
+        self._interval = interval_seconds
+        self._full_reload = full_reload_seconds
+        self._last_full: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self, full: bool = False) -> int:
+        full = (
+            full
+            or self._index.timestamp is None
+            or self._last_full is None
+            or time.monotonic() - self._last_full >= self._full_reload
+        )
+        started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        query = build_overpass_query(self._index.bbox, None if full else self._index.timestamp)
+        response = http_post(OVERPASS_URL, data={"data": query}, timeout=120)
+        response.raise_for_status()
+        data = response.json()
+        if data.get("remark"):
+            # Overpass 超时等运行时错误仍返回 200，结果可能不完整，不能用来替换索引
+            raise RuntimeError(f"Overpass error: {data['remark']}")
+        timestamp = data.get("osm3s", {}).get("timestamp_osm_base") or started_at
+        changed = self._index.merge(data.get("elements", []), timestamp, replace=full)
+        if full:
+            self._last_full = time.monotonic()
+        self._index.save(self._path)
+        logger.info(
+            "POI index refreshed (full=%s): %d changed, %d total", full, changed, len(self._index)
+        )
+        return changed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("POI index refresh failed: %s", e)
+            self._stop.wait(self._interval)
+
+    def start(self) -> None:
+        """Load the extract from disk (if any) and start periodic refreshes."""
+        if os.path.exists(self._path):
+            try:
+                loaded = self._index.load(self._path)
+                # 本地文件的新旧未知，按文件修改时间推算下一次全量重载
+                age = time.time() - os.path.getmtime(self._path)
+                self._last_full = time.monotonic() - age
+                logger.info("Loaded %d POIs from %s", loaded, self._path)
+            except Exception as e:
+                logger.warning("Failed to load POI extract %s: %s", self._path, e)
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="poi-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main() -> None:
+    from config.bedrock_config import POI_EXTRACT_PATH, POI_GRID_CELL_DEG, POI_INDEX_BBOX
+
+    parser = argparse.ArgumentParser(description="Download the restaurant POI extract from Overpass")
+    parser.add_argument("--output", default=POI_EXTRACT_PATH)
+    args = parser.parse_args()
+
+    index = POIIndex(bbox=POI_INDEX_BBOX, cell_deg=POI_GRID_CELL_DEG)
+    POIRefresher(index, extract_path=args.output, interval_seconds=0, full_reload_seconds=0).refresh(full=True)
+    print(f"Wrote {len(index)} POIs to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
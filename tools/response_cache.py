@@ -0,0 +1,285 @@
+"""
+Response cache - reuses supervisor answers for repeated, non-personalized
+attendee questions
+
+Entries are grouped by context (domain, city, date bucket, dietary
+preference, key terms). A lookup first tries the exact normalized prompt,
+then the most similar cached prompt of the same context by cosine
+similarity of hashed n-gram vectors. Similarity only absorbs rewording:
+session codes, numbers and terms that change the answer (highest vs
+lowest, lunch vs dinner, which venue) are part of the context, so prompts
+that differ in one of them never share an answer.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from config.bedrock_config import (
+    RESPONSE_CACHE_MAX_SIZE,
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+    RESPONSE_CACHE_TTL_SECONDS,
+)
+from tools.geocoding import GAZETTEER, GAZETTEER_ALIASES
+from tools.kb_retrieval import normalize_query
+from tools.local_retriever import hashed_vector, tokenize
+
+DEFAULT_CITY = "las vegas"
+GENERAL_DOMAIN = "general"
+
+# 含个人信息或依赖参会者身份的问题不缓存
+PERSONAL_RE = re.compile(
+    r"我的|我们的|帮我记|user\s*_?id|用户\s*id|\bmy\b|\bmine\b|\bour\b", re.IGNORECASE
+)
+
+DIET_PATTERNS = [
+    ("vegan", r"纯素|\bvegan\b"),
+    ("vegetarian", r"素食|吃素|\bvegetarian\b"),
+    ("halal", r"清真|\bhalal\b"),
+    ("gluten_free", r"无麸质|gluten[- ]?free"),
+    ("kosher", r"犹太|\bkosher\b"),
+]
+
+WEEKDAYS = [
+    (0, r"周一|星期一|礼拜一|\bmon(day)?\b"),
+    (1, r"周二|星期二|礼拜二|\btue(s|sday)?\b"),
+    (2, r"周三|星期三|礼拜三|\bwed(nesday)?\b"),
+    (3, r"周四|星期四|礼拜四|\bthu(rs|rsday)?\b"),
+    (4, r"周五|星期五|礼拜五|\bfri(day)?\b"),
+    (5, r"周六|星期六|礼拜六|\bsat(urday)?\b"),
+    (6, r"周日|周末|星期日|星期天|礼拜天|\bsun(day)?\b|\bweekend\b"),
+]
+# 相似度只衡量措辞；这些词不同则答案不同，必须完全一致才能命中
+KEY_TERMS = [
+    ("high", r"最高|最热|\bhigh(est)?\b|\bmax(imum)?\b"),
+    ("low", r"最低|最冷|\blow(est)?\b|\bmin(imum)?\b"),
+    ("rain", r"雨|降水|\brain|\bprecipitation\b"),
+    ("wind", r"风|\bwind"),
+    ("humidity", r"湿度|\bhumid"),
+    ("uv", r"紫外线|\buv\b"),
+    ("morning", r"早上|上午|早晨|清晨|\bmorning\b"),
+    ("noon", r"中午|\bnoon\b"),
+    ("afternoon", r"下午|\bafternoon\b"),
+    ("evening", r"晚上|傍晚|夜里|今晚|\bevening\b|\bnight\b|\btonight\b"),
+    ("breakfast", r"早餐|早饭|\bbreakfast\b|\bbrunch\b"),
+    ("lunch", r"午餐|午饭|\blunch\b"),
+    ("dinner", r"晚餐|晚饭|宵夜|\bdinner\b|\bsupper\b"),
+    ("hotpot", r"火锅|\bhot ?pot\b"),
+    ("sushi", r"寿司|日料|\bsushi\b|\bjapanese\b"),
+    ("steak", r"牛排|\bsteak"),
+    ("ramen", r"拉面|\bramen\b"),
+    ("bbq", r"烧烤|\bbbq\b|\bbarbecue\b"),
+    ("seafood", r"海鲜|\bseafood\b"),
+    ("chinese", r"中餐|\bchinese\b"),
+    ("coffee", r"咖啡|\bcoffee\b|\bcafe\b"),
+    ("bar", r"酒吧|\bbars?\b"),
+    ("venetian", r"venetian|palazzo|威尼斯人"),
+    ("caesars", r"caesars|凯撒"),
+    ("wynn", r"wynn|encore|永利"),
+    ("mgm", r"\bmgm\b|美高梅"),
+    ("mandalay", r"mandalay|曼德勒"),
+]
+# 与意图路由一致：session code 区分大小写
+SESSION_CODE_RE = re.compile(r"\b[A-Z]{3}\d{3}\b")
+NUMBER_RE = re.compile(r"\d+")
+
+RELATIVE_DAYS = [
+    (2, r"后天|day after tomorrow"),
+    (1, r"明天|明日|\btomorrow\b"),
+    (0, r"今天|今日|今晚|\btoday\b|\btonight\b"),
+]
+
+
+def _compile(patterns):
+    return [(value, re.compile(p, re.IGNORECASE)) for value, p in patterns]
+
+
+_DIETS = _compile(DIET_PATTERNS)
+_WEEKDAYS = _compile(WEEKDAYS)
+_RELATIVE_DAYS = _compile(RELATIVE_DAYS)
+_KEY_TERMS = _compile(KEY_TERMS)
+# 城市名按长度降序匹配，英文名要求完整单词，避免 "la" 之类的误匹配
+_CITIES = [
+    (GAZETTEER_ALIASES.get(name, name), re.compile(
+        re.escape(name) if not name.isascii() else rf"\b{re.escape(name)}\b", re.IGNORECASE
+    ))
+    for name in sorted(set(GAZETTEER) | set(GAZETTEER_ALIASES), key=len, reverse=True)
+]
+
+
+def is_personalized(message: str) -> bool:
+    return bool(PERSONAL_RE.search(message))
+
+
+def extract_context(message: str, domain: Optional[str], today: Optional[date] = None) -> Tuple[str, ...]:
+    """
+    Build the context part of the cache key.
+
+    Returns:
+        (domain, city, date bucket, diet, key terms); the date bucket is the
+        resolved ISO date for relative days and weekdays, today for weather
+        questions without a date, and "any" otherwise; key terms are the
+        session codes, numbers and KEY_TERMS found in the message
+    """
+    today = today or date.today()
+    domain = domain or GENERAL_DOMAIN
+
+    city = next((c for c, pattern in _CITIES if pattern.search(message)), DEFAULT_CITY)
+
+    day = "any"
+    for offset, pattern in _RELATIVE_DAYS:
+        if pattern.search(message):
+            day = (today + timedelta(days=offset)).isoformat()
+            break
+    else:
+        for weekday, pattern in _WEEKDAYS:
+            if pattern.search(message):
+                day = (today + timedelta(days=(weekday - today.weekday()) % 7)).isoformat()
+                break
+        else:
+            if domain == "weather":
+                day = today.isoformat()
+
+    diet = next((d for d, pattern in _DIETS if pattern.search(message)), "any")
+    terms = tuple(
+        sorted(set(SESSION_CODE_RE.findall(message)))
+        + sorted(set(NUMBER_RE.findall(SESSION_CODE_RE.sub(" ", message))))
+        + [term for term, pattern in _KEY_TERMS if pattern.search(message)]
+    )
+    return (domain, city, day, diet, terms)
+
+
+class _Bucket:
+    """Cached prompts of one context with a lazily rebuilt vector matrix."""
+
+    def __init__(self):
+        self.vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: list = []
+
+    def add(self, prompt: str, vector: np.ndarray) -> None:
+        self.vectors[prompt] = vector
+        self._matrix = None
+
+    def remove(self, prompt: str) -> None:
+        if self.vectors.pop(prompt, None) is not None:
+            self._matrix = None
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        if not self.vectors:
+            return None, 0.0
+        if self._matrix is None:
+            self._keys = list(self.vectors)
+            self._matrix = np.stack([self.vectors[k] for k in self._keys])
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        return self._keys[best], float(scores[best])
+
+
+class ResponseCache:
+    """
+    Size-bounded response cache with exact and similarity matching.
+
+    Args:
+        maxsize: Maximum number of cached responses; least recently used are evicted
+        threshold: Minimum cosine similarity of a semantic hit
+        ttls: Time-to-live per domain; GENERAL_DOMAIN is the fallback
+    """
+
+    def __init__(
+        self,
+        maxsize: int = RESPONSE_CACHE_MAX_SIZE,
+        threshold: float = RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+        ttls: Dict[str, float] = RESPONSE_CACHE_TTL_SECONDS,
+    ):
+        self._maxsize = maxsize
+        self._threshold = threshold
+        self._ttls = ttls
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[float, Any]]" = OrderedDict()
+        self._buckets: Dict[Hashable, _Bucket] = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def _delete(self, key: Tuple[Hashable, str]) -> None:
+        self._entries.pop(key, None)
+        bucket = self._buckets.get(key[0])
+        if bucket is not None:
+            bucket.remove(key[1])
+            if not bucket.vectors:
+                del self._buckets[key[0]]
+
+    def _live(self, key: Tuple[Hashable, str], now: float) -> Any:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        if item[0] <= now:
+            self._delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return item[1]
+
+    def get(self, message: str, domain: Optional[str]) -> Optional[Any]:
+        """Return a cached response for the message, or None."""
+        if is_personalized(message):
+            self.skipped += 1
+            return None
+        context = extract_context(message, domain)
+        prompt = normalize_query(message)
+        vector = hashed_vector(tokenize(prompt))
+        now = time.monotonic()
+        with self._lock:
+            value = self._live((context, prompt), now)
+            if value is not None:
+                self.exact_hits += 1
+                return value
+
+            bucket = self._buckets.get(context)
+            if bucket is not None:
+                nearest, score = bucket.nearest(vector)
+                if nearest is not None and score >= self._threshold:
+                    value = self._live((context, nearest), now)
+                    if value is not None:
+                        self.semantic_hits += 1
+                        return value
+            self.misses += 1
+            return None
+
+    def put(self, message: str, domain: Optional[str], response: Any) -> None:
+        if is_personalized(message):
+            return
+        context = extract_context(message, domain)
+        prompt = normalize_query(message)
+        ttl = self._ttls.get(context[0], self._ttls[GENERAL_DOMAIN])
+        vector = hashed_vector(tokenize(prompt))
+        with self._lock:
+            key = (context, prompt)
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            self._buckets.setdefault(context, _Bucket()).add(prompt, vector)
+            while len(self._entries) > self._maxsize:
+                self._delete(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+        }
+
+
+response_cache = ResponseCache()
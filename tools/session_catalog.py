@@ -0,0 +1,146 @@
+"""
+Session catalog - structured re:Invent sessions and venue walking times
+loaded from config/sessions.csv and config/venue_walking_minutes.csv
+"""
+
+import csv
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from config.bedrock_config import (
+    SESSION_CATALOG_PATH,
+    VENUE_WALKING_PATH,
+    DEFAULT_WALKING_MINUTES,
+)
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+_EPOCH = datetime(2000, 1, 1)
+
+
+class Session(NamedTuple):
+    session_id: str
+    title: str
+    session_type: str
+    track: str
+    level: int
+    venue: str
+    start: int  # minutes since 2000-01-01, so comparisons stay integer arithmetic
+    end: int
+
+    @property
+    def start_time(self) -> datetime:
+        return _from_minutes(self.start)
+
+    @property
+    def end_time(self) -> datetime:
+        return _from_minutes(self.end)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "session_id": self.session_id,
+            "title": self.title,
+            "session_type": self.session_type,
+            "track": self.track,
+            "level": self.level,
+            "venue": self.venue,
+            "start": self.start_time.strftime(TIME_FORMAT),
+            "end": self.end_time.strftime(TIME_FORMAT),
+        }
+
+
+def _to_minutes(value: str) -> int:
+    return int((datetime.strptime(value, TIME_FORMAT) - _EPOCH).total_seconds() // 60)
+
+
+def _from_minutes(minutes: int) -> datetime:
+    return _EPOCH + timedelta(minutes=minutes)
+
+
+class WalkingTimes:
+    """
+    Symmetric venue-to-venue walking minutes.
+
+    Args:
+        pairs: (venue_a, venue_b, minutes) entries
+        default_minutes: Used for venue pairs missing from the table
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, str, int]], default_minutes: int):
+        self._minutes: Dict[Tuple[str, str], int] = {}
+        for a, b, minutes in pairs:
+            self._minutes[(a, b)] = minutes
+            self._minutes[(b, a)] = minutes
+        self._default = default_minutes
+
+    @classmethod
+    def load(cls, path: str, default_minutes: int = DEFAULT_WALKING_MINUTES) -> "WalkingTimes":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            pairs = [
+                (row["venue_a"], row["venue_b"], int(row["minutes"]))
+                for row in csv.DictReader(f)
+            ]
+        return cls(pairs, default_minutes)
+
+    def minutes(self, a: str, b: str) -> int:
+        if a == b:
+            return 0
+        return self._minutes.get((a, b), self._default)
+
+
+class SessionCatalog:
+    """In-memory session catalog with lookups by id and track."""
+
+    def __init__(self, sessions: Iterable[Session]):
+        self.sessions: List[Session] = sorted(sessions, key=lambda s: (s.end, s.start))
+        self._by_id: Dict[str, Session] = {s.session_id: s for s in self.sessions}
+        self._by_track: Dict[str, List[Session]] = {}
+        for session in self.sessions:
+            self._by_track.setdefault(session.track.lower(), []).append(session)
+
+    @classmethod
+    def load(cls, path: str) -> "SessionCatalog":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            sessions = [
+                Session(
+                    session_id=row["session_id"].strip().upper(),
+                    title=row["title"],
+                    session_type=row["session_type"],
+                    track=row["track"],
+                    level=int(row["level"]),
+                    venue=row["venue"],
+                    start=_to_minutes(row["start"]),
+                    end=_to_minutes(row["end"]),
+                )
+                for row in csv.DictReader(f)
+            ]
+        return cls(sessions)
+
+    def get(self, session_id: str) -> Optional[Session]:
+        return self._by_id.get(session_id.strip().upper())
+
+    def by_track(self, track: str) -> List[Session]:
+        return self._by_track.get(track.lower(), [])
+
+    @property
+    def tracks(self) -> List[str]:
+        return sorted({s.track for s in self.sessions})
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+
+_catalog: Optional[SessionCatalog] = None
+_walking: Optional[WalkingTimes] = None
+_load_lock = threading.Lock()
+
+
+def get_session_catalog() -> Tuple[SessionCatalog, WalkingTimes]:
+    """Load the configured catalog and walking times once per process."""
+    global _catalog, _walking
+    if _catalog is None:
+        with _load_lock:
+            if _catalog is None:
+                _walking = WalkingTimes.load(VENUE_WALKING_PATH)
+                _catalog = SessionCatalog.load(SESSION_CATALOG_PATH)
+    return _catalog, _walking
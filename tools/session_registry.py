@@ -0,0 +1,195 @@
+"""
+Session registry - keeps one SupervisorAgent per attendee session with bounded memory
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class _SessionEntry:
+    __slots__ = ("session_id", "agent", "lock", "last_used", "pins")
+
+    def __init__(self, session_id: str, agent: Any):
+        self.session_id = session_id
+        self.agent = agent
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        # 正在使用或等待该会话的请求数，大于 0 时不会被驱逐
+        self.pins = 0
+
+
+class SessionRegistry:
+    """
+    Lazily creates agents per session id and evicts them with LRU + idle TTL.
+
+    Entries are pinned under the registry lock while a request uses or waits
+    for them and pinned entries are never evicted, so one session never gets
+    two agents. When every entry is pinned the registry may briefly exceed
+    max_sessions; it shrinks back as soon as those requests finish.
+
+    Args:
+        factory: Callable that builds a new agent for a session id
+        max_sessions: Maximum number of live sessions kept in memory
+        idle_ttl_seconds: Sessions idle for longer than this are evicted
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], Any],
+        max_sessions: int,
+        idle_ttl_seconds: float,
+    ):
+        self._factory = factory
+        self._max_sessions = max_sessions
+        self._idle_ttl = idle_ttl_seconds
+        self._entries: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._evicted = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _evict_locked(self, now: float) -> None:
+        # OrderedDict 按最近使用排序，最旧的在前面
+        for session_id in list(self._entries):
+            entry = self._entries[session_id]
+            expired = now - entry.last_used > self._idle_ttl
+            if not expired and len(self._entries) <= self._max_sessions:
+                break
+            if entry.pins:
+                # 正在处理或等待请求的会话不驱逐
+                continue
+            del self._entries[session_id]
+            self._evicted += 1
+            logger.info("Evicted session %s (expired=%s)", session_id, expired)
+
+    def _pin_locked(self, session_id: str, now: float) -> Optional[_SessionEntry]:
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            entry.pins += 1
+            entry.last_used = now
+            self._entries.move_to_end(session_id)
+        return entry
+
+    def _pin(self, session_id: str) -> _SessionEntry:
+        """Return the session's entry, pinned; release it with _unpin()."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._pin_locked(session_id, now)
+            if entry is not None:
+                return entry
+
+        # Build outside the registry lock so slow agent construction does not
+        # block lookups for other sessions.
+        new_entry = _SessionEntry(session_id, self._factory(session_id))
+
+        with self._lock:
+            entry = self._pin_locked(session_id, now)
+            if entry is None:
+                entry = new_entry
+                entry.pins = 1
+                self._entries[session_id] = entry
+                self._created += 1
+            self._evict_locked(now)
+            return entry
+
+    def _unpin(self, entry: _SessionEntry) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entry.pins -= 1
+            entry.last_used = now
+            # 保持按最近使用排序，驱逐时才能在第一个未过期的会话处停止
+            if self._entries.get(entry.session_id) is entry:
+                self._entries.move_to_end(entry.session_id)
+            # 所有会话都被占用时可能暂时超出上限，释放后补做驱逐
+            if len(self._entries) > self._max_sessions:
+                self._evict_locked(now)
+
+    def get(self, session_id: str) -> Any:
+        """Return the agent for a session, creating it if needed."""
+        entry = self._pin(session_id)
+        self._unpin(entry)
+        return entry.agent
+
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[Any]:
+        """
+        Acquire exclusive use of a session's agent.
+
+        Turns for the same session are serialized because an Agent keeps a
+        single message list and cannot run two invocations at once.
+        """
+        entry = self._pin(session_id)
+        try:
+            with entry.lock:
+                yield entry.agent
+        finally:
+            self._unpin(entry)
+
+    @asynccontextmanager
+    async def session_async(self, session_id: str) -> AsyncIterator[Any]:
+        """Async variant of session() that never blocks the event loop."""
+        entry = await asyncio.to_thread(self._pin, session_id)
+        try:
+            acquire = asyncio.ensure_future(asyncio.to_thread(entry.lock.acquire))
+            try:
+                await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+                # 后台线程最终仍会拿到锁，拿到后立即释放
+                acquire.add_done_callback(lambda _: entry.lock.release())
+                raise
+            try:
+                yield entry.agent
+            finally:
+                entry.lock.release()
+        finally:
+            self._unpin(entry)
+
+    def evict_idle(self) -> None:
+        """Drop sessions whose idle time exceeded the TTL."""
+        with self._lock:
+            self._evict_locked(time.monotonic())
+
+    def _run_eviction(self, interval_seconds: float) -> None:
+        while not self._stop.wait(interval_seconds):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.warning("Session eviction failed: %s", e)
+
+    def start_eviction(self, interval_seconds: float) -> None:
+        """Evict idle sessions every interval_seconds from a background thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run_eviction, args=(interval_seconds,), name="session-eviction", daemon=True
+            )
+            self._thread.start()
+
+    def stop_eviction(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def remove(self, session_id: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        return entry.agent if entry else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active_sessions": len(self._entries),
+            "max_sessions": self._max_sessions,
+            "created": self._created,
+            "evicted": self._evicted,
+        }
@@ -0,0 +1,268 @@
+"""
+Tracing - OpenTelemetry spans from the FastAPI request down to outbound calls
+
+setup_tracing() installs (or extends) the SDK tracer provider with a local
+exporter that appends finished spans to a JSONL file or prints them to
+stdout, so no collector is needed. Strands already emits spans for every
+agent invocation, model call and tool call on the global provider; with
+the request span from TracingMiddleware, the supervisor turn span and
+traceparent injection on outbound HTTP, one request is one trace.
+
+Render a request's waterfall (critical path marked with *):
+    python -m tools.tracing traces.jsonl
+    python -m tools.tracing traces.jsonl --trace-id 4bf92f3577b34da6a3ce929d0e0e4736
+"""
+
+import argparse
+import json
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Sequence, TextIO
+from urllib.parse import urlsplit
+
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from config.bedrock_config import TRACING_EXPORTER, TRACING_FILE_PATH, TRACING_MAX_ATTRIBUTE_CHARS
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+tracer = trace.get_tracer("attendee_guide")
+
+_setup_lock = threading.Lock()
+_processor: Optional[BatchSpanProcessor] = None
+
+
+def _attribute(value: Any) -> Any:
+    if isinstance(value, (bool, int, float)):
+        return value
+    text = value if isinstance(value, str) else json.dumps(list(value), ensure_ascii=False, default=str)
+    return text if len(text) <= TRACING_MAX_ATTRIBUTE_CHARS else text[:TRACING_MAX_ATTRIBUTE_CHARS] + "…"
+
+
+def span_to_dict(span: ReadableSpan) -> Dict[str, Any]:
+    context = span.get_span_context()
+    return {
+        "trace_id": format(context.trace_id, "032x"),
+        "span_id": format(context.span_id, "016x"),
+        "parent_id": format(span.parent.span_id, "016x") if span.parent else None,
+        "name": span.name,
+        "kind": span.kind.name,
+        "start_ns": span.start_time,
+        "end_ns": span.end_time,
+        "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+        "status": span.status.status_code.name,
+        "attributes": {key: _attribute(value) for key, value in (span.attributes or {}).items()},
+        "events": [event.name for event in span.events],
+    }
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Write one JSON object per finished span to a file or stream."""
+
+    def __init__(self, path: Optional[str] = None, stream: Optional[TextIO] = None):
+        self._file = open(path, "a", encoding="utf-8") if path else None
+        self._stream = self._file or stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(json.dumps(span_to_dict(s), ensure_ascii=False) + "\n" for s in spans)
+        with self._lock:
+            self._stream.write(lines)
+            self._stream.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def setup_tracing(exporter: str = TRACING_EXPORTER, path: str = TRACING_FILE_PATH) -> None:
+    """
+    Export spans locally ("file" or "console"); "none" leaves tracing off.
+
+    If a tracer provider is already installed (e.g. by the AWS OpenTelemetry
+    distro), the exporter is added to it instead of replacing it.
+    """
+    global _processor
+    if exporter == "none":
+        return
+    with _setup_lock:
+        if _processor is not None:
+            return
+        span_exporter = JsonLinesSpanExporter(path=path if exporter == "file" else None)
+        _processor = BatchSpanProcessor(span_exporter)
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            provider = TracerProvider()
+            trace.set_tracer_provider(provider)
+        provider.add_span_processor(_processor)
+
+    # 可选：boto3 调用（Bedrock 知识库检索、AgentCore Memory）也生成 span
+    try:
+        from opentelemetry.instrumentation.botocore import BotocoreInstrumentor
+    except ImportError:
+        pass
+    else:
+        BotocoreInstrumentor().instrument()
+    logger.info("Tracing enabled, exporting spans to %s", path if exporter == "file" else "stdout")
+
+
+def shutdown_tracing() -> None:
+    """Export spans still buffered in the batch processor and close the exporter."""
+    global _processor
+    with _setup_lock:
+        processor, _processor = _processor, None
+    if processor is not None:
+        processor.shutdown()
+
+
+def current_trace_id() -> Optional[str]:
+    context = trace.get_current_span().get_span_context()
+    return format(context.trace_id, "032x") if context.is_valid else None
+
+
+def client_span(method: str, url: str):
+    """Span for an outbound HTTP call; use inject_headers() inside it."""
+    parts = urlsplit(url)
+    return tracer.start_as_current_span(
+        f"{method} {parts.netloc}{parts.path}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "http.request.method": method,
+            "server.address": parts.hostname or "",
+            "url.full": f"{parts.scheme}://{parts.netloc}{parts.path}",
+        },
+    )
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add the W3C traceparent of the current span to outgoing headers."""
+    headers = dict(headers or {})
+    propagate.inject(headers)
+    return headers
+
+
+def record_response(span: trace.Span, status_code: int) -> None:
+    span.set_attribute("http.response.status_code", status_code)
+    if status_code >= 500:
+        span.set_status(Status(StatusCode.ERROR))
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: one SERVER span per HTTP request, continuing an incoming
+    traceparent, ended only after the whole (possibly streamed) body is sent.
+    The trace id is returned in the X-Trace-Id response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": scope["method"], "url.path": scope["path"]},
+        ) as span:
+            trace_id = format(span.get_span_context().trace_id, "032x").encode()
+
+            async def traced_send(message):
+                if message["type"] == "http.response.start":
+                    record_response(span, message["status"])
+                    message = {
+                        **message,
+                        "headers": list(message.get("headers", [])) + [(b"x-trace-id", trace_id)],
+                    }
+                await send(message)
+
+            await self.app(scope, receive, traced_send)
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def render_waterfall(spans: List[Dict[str, Any]], width: int = 60) -> str:
+    """
+    Render one trace as an indented waterfall.
+
+    Children are ordered by start time. Spans on the critical path are
+    marked with "*": walking back from a span's end, the child that
+    finished last, then the child that finished before that one started,
+    and so on, recursively.
+    """
+    if not spans:
+        return "(no spans)"
+    ids = {s["span_id"] for s in spans}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children.setdefault(parent, []).append(s)
+    for group in children.values():
+        group.sort(key=lambda s: s["start_ns"])
+
+    start = min(s["start_ns"] for s in spans)
+    total = max(max(s["end_ns"] for s in spans) - start, 1)
+    critical = set()
+
+    def mark_critical(span: Dict[str, Any]) -> None:
+        # 从结束时间往回走：最后结束的子 span，再到它开始之前结束的子 span，依次类推
+        critical.add(span["span_id"])
+        cursor = span["end_ns"]
+        for child in sorted(children.get(span["span_id"], []), key=lambda s: s["end_ns"], reverse=True):
+            if child["end_ns"] <= cursor:
+                mark_critical(child)
+                cursor = child["start_ns"]
+
+    for root in children.get(None, []):
+        mark_critical(root)
+
+    lines = [f"trace {spans[0]['trace_id']}  {total / 1e6:.1f} ms"]
+
+    def walk(span: Dict[str, Any], depth: int) -> None:
+        offset = round((span["start_ns"] - start) / total * width)
+        length = max(1, round((span["end_ns"] - span["start_ns"]) / total * width))
+        bar = " " * offset + "█" * min(length, width - offset)
+        mark = "*" if span["span_id"] in critical else " "
+        error = " !" if span["status"] == "ERROR" else ""
+        name = ("  " * depth + span["name"])[:56]
+        lines.append(
+            f"{mark} {(span['start_ns'] - start) / 1e6:>9.1f} {span['duration_ms']:>9.1f}  "
+            f"{name:<56} |{bar:<{width}}|{error}"
+        )
+        for child in children.get(span["span_id"], []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render a trace waterfall from a JSONL span file")
+    parser.add_argument("path", nargs="?", default=TRACING_FILE_PATH)
+    parser.add_argument("--trace-id", default=None, help="Default: the most recently finished trace")
+    parser.add_argument("--width", type=int, default=60)
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    if not spans:
+        print(f"No spans in {args.path}")
+        return
+    trace_id = args.trace_id or max(spans, key=lambda s: s["end_ns"])["trace_id"]
+    print(render_waterfall([s for s in spans if s["trace_id"] == trace_id], args.width))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Turn executor - runs blocking agent turns off the asyncio event loop
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional
+
+from tools.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class TurnRejectedError(RuntimeError):
+    """Raised when a turn waited too long for a free worker slot."""
+
+
+class TurnExecutor:
+    """
+    Bounded worker pool for synchronous agent turns.
+
+    SupervisorAgent.process_message performs blocking Bedrock, HTTP and
+    AgentCore Memory calls. Running it here keeps the event loop free for
+    health checks and other sessions, while the semaphore caps how many
+    turns run at once and how long a request may queue for a slot.
+
+    Args:
+        max_concurrent_turns: Number of worker threads / in-flight turns
+        queue_timeout_seconds: Max time a request waits for a free slot
+    """
+
+    def __init__(self, max_concurrent_turns: int, queue_timeout_seconds: float):
+        self._max_concurrent = max_concurrent_turns
+        self._queue_timeout = queue_timeout_seconds
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrent_turns, thread_name_prefix="agent-turn"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._rejected = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 延迟创建，保证绑定到 uvicorn 运行中的事件循环
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+        return self._semaphore
+
+    async def _acquire(self) -> None:
+        try:
+            await asyncio.wait_for(self._get_semaphore().acquire(), timeout=self._queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise TurnRejectedError(
+                f"No free agent worker within {self._queue_timeout}s"
+            )
+        self._in_flight += 1
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._get_semaphore().release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold one of the concurrent turn slots.
+
+        Used directly by natively async turns (streaming), which run on the
+        event loop but must still count against the concurrency limit.
+        """
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn(*args, **kwargs) in the worker pool and await its result.
+
+        The slot is held until the worker finishes, not until the caller
+        stops waiting: a turn whose client disconnected keeps running in its
+        thread, and releasing early would let the next turn queue unbounded
+        inside the ThreadPoolExecutor instead of getting TurnRejectedError.
+        """
+        await self._acquire()
+        loop = asyncio.get_running_loop()
+        # Copy contextvars so request-scoped state follows the turn into
+        # the worker thread (run_in_executor does not do this by itself).
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, fn, *args, **kwargs)
+        try:
+            future = self._pool.submit(call)
+        except BaseException:
+            self._release()
+            raise
+
+        def release_slot(_) -> None:
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:
+                # 事件循环已关闭（进程退出中），无需再归还
+                pass
+
+        # 取消 await 只会取消尚未开始的任务；已在运行的任务结束后才归还名额
+        future.add_done_callback(release_slot)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True) -> None:
+        logger.info("Shutting down agent turn executor")
+        self._pool.shutdown(wait=wait)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent_turns": self._max_concurrent,
+            "in_flight": self._in_flight,
+            "rejected": self._rejected,
+        }